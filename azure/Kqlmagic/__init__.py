@@ -13,6 +13,6 @@ except: # pylint: disable=bare-except
 
 from .magic_extension import load_ipython_extension, unload_ipython_extension, _register_kqlmagic_magic
 from ._version import __version__
-from .kql_magic import kql, kql_stop
+from .kql_magic import kql, kql_async, kql_stop
 
-__all__ = ['__version__', 'kql', 'kql_stop', 'load_ipython_extension', 'unload_ipython_extension', '_register_kqlmagic_magic']
+__all__ = ['__version__', 'kql', 'kql_async', 'kql_stop', 'load_ipython_extension', 'unload_ipython_extension', '_register_kqlmagic_magic']
@@ -7,6 +7,8 @@
 """An abstract module to acquire tokens from AAD.
 """
 
+from .my_utils import run_in_executor
+
 
 class AadHelper(object):
 
@@ -20,3 +22,8 @@ class AadHelper(object):
     def acquire_token(self):
         """Acquire tokens from AAD."""
         raise NotImplementedError(self.__class__.__name__ + ".acquire_token")
+
+
+    async def acquire_token_async(self):
+        """Acquire tokens from AAD, without blocking the event loop."""
+        return await run_in_executor(self.acquire_token)
@@ -6,7 +6,6 @@
 
 from typing import Any, Union, Dict, List
 import hashlib
-import json
 import os
 import shutil
 
@@ -14,6 +13,7 @@ import shutil
 from .constants import Constants
 from .my_utils import get_valid_filename_with_spaces, adjust_path, convert_to_common_path_obj, json_dumps 
 from .kql_response import KqlQueryResponse, KqlSchemaResponse
+from .kql_frames_parser import KqlFramesParser
 from .ipython_api import IPythonAPI
 from .kql_client import KqlClient
 from .kql_engine import KqlEngine
@@ -152,27 +152,29 @@ class CacheClient(KqlClient):
 
         file_path = self._get_file_path(query, database_at_cluster, cache_folder=options.get("use_cache"))
         # collect this inormation, in case bug report will be generated
-        KqlClient.last_query_info = {
-            "request": {
-                "file_path": file_path,
-            },
-            "response": {
-                "status_code": 200,
-            },
+        query_info = self._new_query_info()
+        query_info["request"] = {
+            "file_path": file_path,
+        }
+        query_info["response"] = {
+            "status_code": 200,
         }
         try:
-            str_response = open(file_path, "r").read()
-            json_response = json.loads(str_response)
+            with open(file_path, "rb") as infile:
+                json_response = KqlFramesParser.from_file(infile).parse()
             if query.startswith(".") and json_response.get("tables") is not None:
-                return KqlSchemaResponse(json_response)
+                response = KqlSchemaResponse(json_response)
             else:
                 endpoint_version = self._get_endpoint_version(json_response)
-                return KqlQueryResponse(json_response, endpoint_version)
+                response = KqlQueryResponse(json_response, endpoint_version, json_codec=options.get("json_codec"))
+            self._set_query_info(response, query_info)
+            return response
                 
         except Exception as e:
             # collect this inormation, in case bug report will be generated
-            self.last_query_info["response"]["status_code"] = 400  # pylint: disable=unsupported-assignment-operation, unsubscriptable-object
-            self.last_query_info["response"]["error"] = str(e)  # pylint: disable=unsupported-assignment-operation, unsubscriptable-object
+            query_info["response"]["status_code"] = 400
+            query_info["response"]["error"] = str(e)
+            self._set_query_info(e, query_info)
             raise e
 
 
@@ -204,7 +206,7 @@ class CacheClient(KqlClient):
             cluster_friendly_name = engine.get_cluster_friendly_name()
             file_path = self._get_file_path(query, f"{database_friendly_name}_at_{cluster_friendly_name}", cache_folder=options.get("cache"))
         outfile = open(file_path, "w")
-        outfile.write(json_dumps(result.json_response))
+        outfile.write(json_dumps(result.json_response, codec=options.get("json_codec")))
         outfile.flush()
         outfile.close()
         return file_path
@@ -0,0 +1,120 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+"""Process wide cache of cluster metadata (database names, pretty names, validation status).
+
+Entries are keyed by a hash of the cluster and the connection credentials, so all the engines of the same
+cluster and principal share them. Entries expire after cluster_metadata_cache_ttl seconds, and optionally
+are persisted to a file, to be reused after kernel restart.
+"""
+
+from typing import Any, Dict
+import os
+import json
+import time
+import threading
+
+
+from .constants import Constants
+from .my_utils import adjust_path, json_dumps
+from .ipython_api import IPythonAPI
+from .log import logger
+
+
+class ClusterMetadataCache(object):
+
+    FOLDER_NAME = "metadata_cache"
+    FILE_NAME = "cluster_metadata.json"
+
+    _lock = threading.RLock()
+    _entries:Dict[str,Dict[str,Any]] = {}
+    _loaded_file_path:str = None
+
+
+    @classmethod
+    def get(cls, key:str, item:str, **options)->Any:
+        "returns cached item value, or None if not cached or expired"
+        ttl = options.get("cluster_metadata_cache_ttl") or 0
+        if ttl <= 0:
+            return None
+        with cls._lock:
+            cls._load(**options)
+            entry = cls._entries.get(key, {}).get(item)
+            if entry is not None and entry["timestamp"] + ttl > time.time():
+                logger().debug(f"ClusterMetadataCache::get - hit - item: {item}")
+                return entry["value"]
+        return None
+
+
+    @classmethod
+    def set(cls, key:str, item:str, value:Any, **options)->None:
+        if (options.get("cluster_metadata_cache_ttl") or 0) <= 0:
+            return
+        with cls._lock:
+            cls._load(**options)
+            cls._entries.setdefault(key, {})[item] = {"value": value, "timestamp": time.time()}
+            cls._save(**options)
+
+
+    @classmethod
+    def invalidate(cls, key:str, item:str=None, **options)->None:
+        with cls._lock:
+            if item is None:
+                cls._entries.pop(key, None)
+            else:
+                cls._entries.get(key, {}).pop(item, None)
+            cls._save(**options)
+
+
+    @classmethod
+    def clear(cls)->None:
+        "clears the in memory cache, persisted file is reloaded on next access"
+        with cls._lock:
+            cls._entries = {}
+            cls._loaded_file_path = None
+
+
+    @classmethod
+    def _get_file_path(cls, **options)->str:
+        if not options.get("cluster_metadata_cache_persist"):
+            return None
+        folder_name = f"{Constants.MAGIC_CLASS_NAME_LOWER}/{cls.FOLDER_NAME}"
+        if options.get("temp_folder_location") == "user_dir":
+            # app that has a free/tree build server, are not supporting directories athat starts with a dot
+            folder_name = f".{folder_name}"
+        root_path = IPythonAPI.get_ipython_root_path(**options)
+        return adjust_path(f"{root_path}/{folder_name}/{cls.FILE_NAME}")
+
+
+    @classmethod
+    def _load(cls, **options)->None:
+        file_path = cls._get_file_path(**options)
+        if file_path is None or file_path == cls._loaded_file_path:
+            return
+        cls._loaded_file_path = file_path
+        try:
+            if os.path.exists(file_path):
+                with open(file_path, "r") as f:
+                    persisted_entries = json.load(f)
+                # in memory entries are more recent
+                cls._entries = {**persisted_entries, **cls._entries}
+        except: # pylint: disable=bare-except
+            logger().debug(f"ClusterMetadataCache::_load - failed to load file: {file_path}")
+
+
+    @classmethod
+    def _save(cls, **options)->None:
+        file_path = cls._get_file_path(**options)
+        if file_path is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(temp_file_path, "w") as f:
+                f.write(json_dumps(cls._entries))
+            os.replace(temp_file_path, file_path)
+        except: # pylint: disable=bare-except
+            logger().debug(f"ClusterMetadataCache::_save - failed to save file: {file_path}")
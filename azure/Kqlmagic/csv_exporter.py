@@ -0,0 +1,129 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+"""Csv exporter of query results.
+
+Rows are written in chunks, straight from the table rows as returned. Each column of a chunk is formatted by a formatter
+selected once by the column type, and only the chunk is held in memory, so any number of rows is exported at constant memory.
+Values are formatted as their json encoding: datetime in iso format, timespan as '[d.]hh:mm:ss[.fffffff]', decimal as float.
+"""
+
+from typing import Any, Callable, Iterator, List, TextIO
+import csv
+import io
+import gzip
+
+
+from .kql_decoders import KqlValueDecoder
+from .my_utils import timedelta_to_timespan
+
+
+_MISSING = object()
+
+
+class CsvExporter(object):
+    """Writes rows of a KqlResponseTable to a csv stream, chunk by chunk."""
+
+    DEFAULT_CHUNK_SIZE = 10000
+
+    def __init__(self, data_table, field_names:List[str], rows_count:int=None, chunk_size:int=None)->None:
+        self.data_table = data_table
+        self.field_names = field_names
+        self.rows_count = data_table.rows_count if rows_count is None else min(rows_count, data_table.rows_count)
+        self.chunk_size = max(1, chunk_size or self.DEFAULT_CHUNK_SIZE)
+        # per column formatter, None if raw values are written as is
+        self._formatters = [self._get_column_formatter(idx) for idx in range(data_table.columns_count)]
+
+
+    def _get_column_formatter(self, col_index:int)->Callable[[list],list]:
+        data_table = self.data_table
+        col_type = data_table.columns_type[col_index].lower()
+        decoder = data_table.decoder
+
+        if col_type == "datetime":
+            return self._memoized_formatter(lambda value: decoder.decode_datetime(value).isoformat())
+
+        elif col_type == "timespan":
+            return self._memoized_formatter(lambda value: timedelta_to_timespan(decoder.decode_timespan(value), minimal=True))
+
+        elif col_type == "decimal":
+            return lambda values: [float(value) if value is not None else None for value in values]
+
+        elif col_type == "dynamic":
+            to_object = data_table.to_object
+            # objects and arrays are written as python repr, same as the converted values
+            return lambda values: [to_object(value) if value.__class__ is str else value for value in values]
+
+        converter = data_table.get_column_converter(col_index)
+        if converter is not None:
+            return lambda values: [converter(value) for value in values]
+        return None
+
+
+    @staticmethod
+    def _memoized_formatter(format_value:Callable[[Any],str])->Callable[[list],list]:
+        "returns a formatter that memoizes formatted strings, up to a bound, exported results repeat values heavily"
+        memo = {}
+        memo_max_size = KqlValueDecoder.MEMO_MAX_SIZE
+
+        def formatter(values:list)->list:
+            result = []
+            append = result.append
+            for value in values:
+                formatted = memo.get(value, _MISSING)
+                if formatted is _MISSING:
+                    formatted = None if value is None else format_value(value)
+                    if len(memo) < memo_max_size:
+                        memo[value] = formatted
+                append(formatted)
+            return result
+
+        return formatter
+
+
+    def iter_chunks(self)->Iterator[List[tuple]]:
+        "yields chunks of rows, each row a tuple of formatted values"
+        rows = self.data_table.rows
+        formatters = self._formatters
+        columns_range = range(len(formatters))
+        for start in range(0, self.rows_count, self.chunk_size):
+            chunk = rows[start:min(start + self.chunk_size, self.rows_count)]
+            columns = []
+            for idx in columns_range:
+                values = [row[idx] for row in chunk]
+                formatter = formatters[idx]
+                columns.append(values if formatter is None else formatter(values))
+            yield list(zip(*columns))
+
+
+    def write(self, stream:TextIO, **kwargs)->int:
+        """writes header and rows to a text stream, opened with newline='', returns number of rows written.
+        kwargs are passed on to csv.writer"""
+        # a chunk is written to the stream at once
+        buffer = io.StringIO(newline="")
+        writer = csv.writer(buffer, **kwargs)
+        writer.writerow(self.field_names)
+        count = 0
+        for chunk in self.iter_chunks():
+            writer.writerows(chunk)
+            count += len(chunk)
+            stream.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate(0)
+        stream.write(buffer.getvalue())
+        return count
+
+
+    @staticmethod
+    def open_file(filename:str, encoding:str="utf-8", compression:str=None)->TextIO:
+        "opens a text file for csv writing, gzip compressed if compression is 'gzip', or if compression is not specified and filename ends with '.gz'"
+        if compression is None:
+            compression = "gzip" if filename.lower().endswith(".gz") else None
+        if compression == "gzip":
+            return gzip.open(filename, "wt", newline="", encoding=encoding)
+        elif compression:
+            raise ValueError(f"csv compression '{compression}' is not supported, only 'gzip' is supported")
+        return open(filename, "w", newline="", encoding=encoding)
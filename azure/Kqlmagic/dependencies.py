@@ -70,12 +70,15 @@ class Dependencies(object):
         ('dateutil.parser', 'python-dateutil', MANDATORY_TAG, "won't be able handle datetime properly", 'dateutil'),
         ('traitlets', 'traitlets', MANDATORY_TAG, "won't be able to use execute Kqlmagic", VERSION_IN_MODULE),
 
-        ('prettytable', 'prettytable', OPTIONAL_TAG, "won't be able to display tables", VERSION_IN_MODULE),
+        # tables are rendered by Kqlmagic html table renderer, prettytable is not used
+        # ('prettytable', 'prettytable', OPTIONAL_TAG, "won't be able to display tables", VERSION_IN_MODULE),
         # ('tabulate', 'tabulate', OPTIONAL_TAG, "won't be able to display tables", VERSION_IN_MODULE),
         ('requests', 'requests', OPTIONAL_TAG, "will use urllib, that might have ssl and or proxies restrictions", VERSION_IN_MODULE),
         ('msal', 'msal', OPTIONAL_TAG, "won't be able to authenticate using msal authentication modes, and Kqlmagic sso will be disabled", VERSION_IN_MODULE),
         ('azure.identity', 'azure-identity', OPTIONAL_TAG, "Some authentication options won't be available", VERSION_IN_MODULE),
         ('pandas', 'pandas', OPTIONAL_TAG, "won't be able to use dataframes", VERSION_IN_MODULE),
+        ('polars', 'polars', OPTIONAL_TAG, "won't be able to use polars dataframes", VERSION_IN_MODULE),
+        ('pyarrow', 'pyarrow', OPTIONAL_TAG, "won't be able to convert results to arrow tables, and dataframes will be built from rows", VERSION_IN_MODULE),
         ('IPython', 'ipython', OPTIONAL_TAG, "won't be to execute as an jupyter magic", VERSION_IN_MODULE),
         ('ipykernel', 'ipykernel', OPTIONAL_TAG, "won't be to execute as an jupyter magic on some jupyter variants", VERSION_IN_MODULE),
         ('pygments', 'pygments', OPTIONAL_TAG, "json objects won't be decorated with colors", VERSION_IN_MODULE),
@@ -61,6 +61,13 @@ class DictDbStorage(object):
         return db_key
 
 
+    def _db_gc_if_due(self)->None:
+        "runs the db garbage collector, if gc_ttl_in_secs passed since last run"
+        if self.gc_ttl_in_secs > 0 and (self.last_clear_time + timedelta(seconds=self.gc_ttl_in_secs)) < datetime.utcnow():
+            self.last_clear_time = datetime.utcnow()
+            self._db_gc()
+
+
     def _db_gc(self)->None:
         """db garbage collector. remove old entries"""
 
@@ -100,14 +107,23 @@ class DictDbStorage(object):
             self.db[self.db_key] = {'data': state_encrypted, 'timestamp': datetime.utcnow()}
 
 
+    def get_version(self)->Any:
+        """returns the version (save time) of the cache state in db, without decrypting it, None if not exist"""
+
+        self._db_gc_if_due()
+        if self.db_key_conflict:
+            return
+        state_encrypted = self.db.get(self.db_key)
+        if state_encrypted:
+            return state_encrypted.get("timestamp")
+
+
     def restore(self)->str:
         """restore cache state from db"""
 
         logger().debug(f"DictDbStorage::restore(self) -> str")
         
-        if self.gc_ttl_in_secs > 0 and (self.last_clear_time + timedelta(seconds=self.gc_ttl_in_secs)) < datetime.utcnow():
-            self.last_clear_time = datetime.utcnow()
-            self._db_gc()
+        self._db_gc_if_due()
 
         if self.db_key_conflict:
             return
@@ -5,6 +5,8 @@
 # --------------------------------------------------------------------------
 
 import os
+import time
+import html
 import base64
 import uuid
 # import webbrowser
@@ -87,7 +89,7 @@ class FormattedJsonList(list):
 
     def __repr__(self):
         if len(self.item) > 0 and type(self.item[0]).__name__ == 'KqlRow':
-            _list = [kql_row.row for kql_row in self.item]
+            _list = [dict(kql_row.row) for kql_row in self.item]
         else:
             _list = self.item
         return FormattedJsonDict({self.key: _list}).__repr__()
@@ -151,7 +153,7 @@ class JSONList(list):
 
     def _repr_json_(self):
         if len(self) > 0 and type(self.item[0]).__name__ == "KqlRow":
-            _list = [kql_row.row for kql_row in self.item]
+            _list = [dict(kql_row.row) for kql_row in self.item]
         else:
             _list = self.item
         return JSONDict({self.key: _list})._repr_json_()
@@ -857,3 +859,53 @@ class Display(object):
     @staticmethod
     def showDangerMessage(msg, display_handler_name=None, **options):
         Display._showMessage(Display.getDangerMessageHtml(msg))
+
+
+class ProgressiveDisplay(object):
+    """Shows in place the progress of a query with progressive results: the received rows count, the reported progress,
+    and a preview of the last received rows. Updates are throttled, and the display is cleared on close."""
+
+    MIN_UPDATE_INTERVAL_IN_SECS = 1.0
+    PREVIEW_ROWS_COUNT = 10
+
+    def __init__(self, **options):
+        self.options = options
+        self._display_handle = None
+        self._last_update_time = 0.0
+        self._progress = None
+
+
+    def update(self, table:dict, progress:float=None)->None:
+        "called with the assembled DataTable frame, after each fragment or progress frame"
+        if progress is not None:
+            self._progress = progress
+        now = time.time()
+        if now - self._last_update_time < self.MIN_UPDATE_INTERVAL_IN_SECS or display is None:
+            return
+        self._last_update_time = now
+        html_obj = HTML(Display.toHtml(body=self.get_html_body(table, self._progress, self.PREVIEW_ROWS_COUNT)))
+        if self._display_handle is None:
+            self._display_handle = display(html_obj, display_id=True)
+        else:
+            self._display_handle.update(html_obj)
+
+
+    def close(self)->None:
+        if self._display_handle is not None:
+            self._display_handle.update(HTML(""))
+            self._display_handle = None
+
+
+    @staticmethod
+    def get_html_body(table:dict, progress:float=None, preview_rows_count:int=10)->str:
+        rows = table.get("Rows") or []
+        progress_str = f", progress: {progress:.0f}%" if isinstance(progress, (int, float)) else ""
+        message_body = Display.getInfoMessageHtml(f"{table.get('TableName')}: {len(rows)} records received{progress_str}")["body"]
+
+        columns = table.get("Columns") or []
+        header_str = "".join([f"<th>{html.escape(str(c.get('ColumnName')))}</th>" for c in columns])
+        rows_str = "".join([
+            "<tr>" + "".join([f"<td>{html.escape(str(v))}</td>" for v in row]) + "</tr>"
+            for row in rows[-preview_rows_count:]
+        ])
+        return f"{message_body}<table><thead><tr>{header_str}</tr></thead><tbody>{rows_str}</tbody></table>"
@@ -4,12 +4,12 @@
 # license information.
 # --------------------------------------------------------------------------
 
-from typing import Union, Dict
+from typing import Any, Union, Dict, Tuple
 import uuid
 import json
 
 
-from .my_utils import json_dumps 
+from .my_utils import json_dumps, json_loads, run_in_executor
 from .constants import Constants, ConnStrKeys, Cloud, Schema
 from .kql_response import KqlQueryResponse, KqlSchemaResponse, KqlError
 # from .my_aad_helper import _MyAadHelper, ConnKeysKCSB
@@ -145,6 +145,50 @@ class DraftClient(KqlClient):
             If response from draft contains exceptions.
         """
 
+        def _execute_attempt(client_request_id:str, query_info:dict)->Union[KqlQueryResponse, KqlSchemaResponse]:
+            authorization = self._aad_helper.acquire_token() if self._aad_helper is not None else None
+            api_url, is_metadata, request_headers, request_payload = self._create_request(id, query, client_request_id, authorization, query_info, **options)
+
+            if is_metadata:
+                response = self._http_client.get(api_url, headers=request_headers, timeout=options.get("timeout"))
+            else:
+                response = self._http_client.post(api_url, headers=request_headers, json=request_payload, timeout=options.get("timeout"))
+            return self._handle_response(response, is_metadata, accept_partial_results, query_info=query_info, json_codec=options.get("json_codec"))
+
+        client_request_id = self._create_client_request_id(**options)
+        return self._execute_with_retry(_execute_attempt, self._data_source, client_request_id, **options)
+
+
+    async def execute_async(self, id:str, query:str, accept_partial_results:bool=False, **options)->Union[KqlQueryResponse, KqlSchemaResponse]:
+        """ Execute a simple query or a metadata query, without blocking the event loop.
+        Same as execute, but returns an awaitable.
+        """
+        async def _execute_attempt(client_request_id:str, query_info:dict)->Union[KqlQueryResponse, KqlSchemaResponse]:
+            authorization = await self._aad_helper.acquire_token_async() if self._aad_helper is not None else None
+            api_url, is_metadata, request_headers, request_payload = self._create_request(id, query, client_request_id, authorization, query_info, **options)
+
+            if is_metadata:
+                response = await self._http_client.get_async(api_url, headers=request_headers, timeout=options.get("timeout"))
+            else:
+                response = await self._http_client.post_async(api_url, headers=request_headers, json=request_payload, timeout=options.get("timeout"))
+            return await run_in_executor(self._handle_response, response, is_metadata, accept_partial_results, query_info=query_info, json_codec=options.get("json_codec"))
+
+        client_request_id = self._create_client_request_id(**options)
+        return await self._execute_with_retry_async(_execute_attempt, self._data_source, client_request_id, **options)
+
+
+    def _create_client_request_id(self, **options)->str:
+        client_request_id = f"{Constants.MAGIC_CLASS_NAME}.execute"
+        client_request_id_tag = options.get("request_id_tag")
+        if client_request_id_tag is not None:
+            client_request_id = f"{client_request_id};{client_request_id_tag};{str(uuid.uuid4())}/{self._session_guid}/AzureMonitor"
+        else:
+            client_request_id = f"{client_request_id};{str(uuid.uuid4())}/{self._session_guid}/AzureMonitor"
+        return client_request_id
+
+
+    def _create_request(self, id:str, query:str, client_request_id:str, authorization:str=None, query_info:dict=None, **options)->Tuple[str,bool,Dict[str,str],Dict[str,Any]]:
+
         #
         # create API url
         #
@@ -170,13 +214,6 @@ class DraftClient(KqlClient):
         
         client_version = f"{Constants.MAGIC_CLASS_NAME}.Python.Client:{self._WEB_CLIENT_VERSION}"        
 
-        client_request_id = f"{Constants.MAGIC_CLASS_NAME}.execute"
-        client_request_id_tag = options.get("request_id_tag")
-        if client_request_id_tag is not None:
-            client_request_id = f"{client_request_id};{client_request_id_tag};{str(uuid.uuid4())}/{self._session_guid}/AzureMonitor"
-        else:
-            client_request_id = f"{client_request_id};{str(uuid.uuid4())}/{self._session_guid}/AzureMonitor"
-
         app = f'{Constants.MAGIC_CLASS_NAME};{options.get("notebook_app")}'
         app_tag = options.get("request_app_tag")
         if app_tag is not None:
@@ -197,8 +234,8 @@ class DraftClient(KqlClient):
         if user_tag is not None:
             request_headers["x-ms-user"] = user_tag
 
-        if self._aad_helper is not None:
-            request_headers["Authorization"] = self._aad_helper.acquire_token()
+        if authorization is not None:
+            request_headers["Authorization"] = authorization
         elif self._appkey is not None:
             request_headers["x-api-key"] = self._appkey
 
@@ -221,17 +258,16 @@ class DraftClient(KqlClient):
             log_request_headers["Authorization"] = "..." 
 
         # collect this inormation, in case bug report will be generated
-        KqlClient.last_query_info = {
-            "request": {
-                "endpoint": api_url,
-                "headers": log_request_headers,
-                "timeout": options.get("timeout"),
-            }
+        query_info = query_info if query_info is not None else {}
+        query_info["request"] = {
+            "endpoint": api_url,
+            "headers": log_request_headers,
+            "timeout": options.get("timeout"),
         }
 
+        request_payload = None
         if is_metadata:
             logger().debug(f"DraftClient::execute - GET request - url: {api_url}, headers: {log_request_headers}, timeout: {options.get('timeout')}")
-            response = self._http_client.get(api_url, headers=request_headers, timeout=options.get("timeout"))
         else:
             request_payload = {
                 "query": query
@@ -251,16 +287,19 @@ class DraftClient(KqlClient):
             logger().debug(f"DraftClient::execute - POST request - url: {api_url}, headers: {log_request_headers}, payload: {request_payload}, timeout: {options.get('timeout')}")
 
             # collect this inormation, in case bug report will be generated
-            self.last_query_info["request"]["payload"] = request_payload  # pylint: disable=unsupported-assignment-operation, unsubscriptable-object
+            query_info["request"]["payload"] = request_payload
+
+        return api_url, is_metadata, request_headers, request_payload
 
-            response = self._http_client.post(api_url, headers=request_headers, json=request_payload, timeout=options.get("timeout"))
 
+    def _handle_response(self, response, is_metadata:bool, accept_partial_results:bool=False, query_info:dict=None, json_codec:str=None)->Union[KqlQueryResponse, KqlSchemaResponse]:
         logger().debug(f"DraftClient::execute - response - status: {response.status_code}, headers: {response.headers}, payload: {response.text}")
         #
         # handle response
         #
         # collect this inormation, in case bug report will be generated
-        self.last_query_info["response"] = {  # pylint: disable=unsupported-assignment-operation
+        query_info = query_info if query_info is not None else {}
+        query_info["response"] = {
             "status_code": response.status_code
         }
 
@@ -270,15 +309,15 @@ class DraftClient(KqlClient):
             except: # pylint: disable=bare-except
                 parsed_error = response.text
             # collect this inormation, in case bug report will be generated
-            self.last_query_info["response"]["error"] = parsed_error  # pylint: disable=unsupported-assignment-operation, unsubscriptable-object
+            query_info["response"]["error"] = parsed_error
             raise KqlError(response.text, response)
 
-        json_response = response.json()
+        json_response = json_loads(response.content, codec=json_codec)
 
         if is_metadata:
             kql_response = KqlSchemaResponse(json_response)
         else:
-            kql_response = KqlQueryResponse(json_response)
+            kql_response = KqlQueryResponse(json_response, json_codec=json_codec)
 
         if kql_response.has_exceptions() and not accept_partial_results:
             try:
@@ -8,6 +8,8 @@ from typing import Any, Dict
 import os
 import uuid
 import base64
+import hashlib
+import threading
 
 
 from .dependencies import Dependencies
@@ -26,6 +28,11 @@ class FernetCrypto(object):
     password_policy = None
     password_tests = None
 
+    # process level, in memory only, cache of derived keys, to avoid key stretching on each store instantiation
+    # key: (password hash, salt, length, iterations, algorithm)
+    _derived_keys:Dict[tuple,bytes] = {}
+    _derived_keys_lock = threading.Lock()
+
     @classmethod
     def set_dependencies(cls)->str:
         if not cls._are_dependencies_set:
@@ -94,12 +101,24 @@ class FernetCrypto(object):
         algorithm = options.get(CryptoParam.ALGORITHM, self.hashes.SHA256())
         backend = options.get(CryptoParam.BACKEND, self.default_backend()) # pylint: disable=not-callable
 
+        # random password or salt derive a unique key, no point to cache it
+        is_cacheable = options.get(CryptoParam.PASSWORD) is not None and options.get(CryptoParam.SALT) is not None
+        if is_cacheable:
+            derived_key_id = (hashlib.sha256(password_as_bytes).digest(), salt_bytes, length, iterations, algorithm.name)
+            key = self._derived_keys.get(derived_key_id)
+            if key is not None:
+                return key
+
         kdf = self.PBKDF2HMAC(algorithm=algorithm, length=length, salt=salt_bytes, iterations=iterations, backend=backend) # pylint: disable=not-callable
         key = kdf.derive(password_as_bytes)
 
         # PBKDF2 instances can only be used once
         kdf = self.PBKDF2HMAC(algorithm=algorithm, length=length, salt=salt_bytes, iterations=iterations, backend=backend) # pylint: disable=not-callable
         kdf.verify(password_as_bytes, key)
+
+        if is_cacheable:
+            with self._derived_keys_lock:
+                self._derived_keys[derived_key_id] = key
         return key
 
 
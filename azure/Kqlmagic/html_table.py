@@ -0,0 +1,251 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+"""Html table renderer of query results.
+
+Only the first page of rows is rendered to the output html, other pages are rendered on demand, when selected by the table pager:
+- 'kernel' - the page is rendered by the kernel (jupyter notebook only)
+- 'files' - pages are written to script files, and loaded from the local temp files server
+- 'inline' - pages are embedded in the output html as inert templates, and are parsed by the browser only when selected.
+Only pages of the first INLINE_MAX_ROWS rows are written to files or embedded, so the rendering cost and output size are bounded
+"""
+
+from typing import Any, Dict, Iterator, List
+import html
+import uuid
+import random
+import weakref
+
+
+from .display import Display
+from .my_utils import json_dumps
+from .log import logger
+
+
+class HtmlTable(object):
+    """Renders rows of a result as an html table, page by page.
+    Cells are converted to escaped html strings row by row, only for the rendered rows."""
+
+    DEFAULT_PAGE_SIZE = 100
+
+    # maximum number of rows, of all pages, embedded in the output html by the inline pages source
+    INLINE_MAX_ROWS = 1000
+
+    # table tag attributes by style, same as prettytable's styles
+    STYLES_ATTRIBUTES = {
+        "DEFAULT": ' border="1"',
+        "MSWORD_FRIENDLY": ' border="1" frame="vsides" rules="cols"',
+        "PLAIN_COLUMNS": '',
+    }
+
+    # rendered tables, by table id of each rendering, to render pages requested by the kernel pager. Tables are kept alive by their result
+    _tables = weakref.WeakValueDictionary()
+
+    def __init__(self, columns_name:List[str], rows:list, rows_count:int=None, page_size:int=None, style:str=None)->None:
+        self.id = self._new_id()
+        self._is_rendered = False
+        self.columns_name = columns_name
+        self.rows = rows
+        self.rows_count = len(rows) if rows_count is None else min(rows_count, len(rows))
+        self.page_size = max(1, page_size or self.DEFAULT_PAGE_SIZE)
+        self.style = (style or "DEFAULT").upper()
+
+
+    @staticmethod
+    def _new_id()->str:
+        return f"kql_table_{uuid.uuid4().hex}"
+
+
+    def is_same_layout(self, rows:list, rows_count:int=None, page_size:int=None, style:str=None)->bool:
+        "returns True if the table renders the same rows, pages and style, so it can be rendered again"
+        return (
+            rows is self.rows
+            and (len(rows) if rows_count is None else min(rows_count, len(rows))) == self.rows_count
+            and max(1, page_size or self.DEFAULT_PAGE_SIZE) == self.page_size
+            and (style or "DEFAULT").upper() == self.style
+        )
+
+
+    @property
+    def pages_count(self)->int:
+        return max(1, (self.rows_count + self.page_size - 1) // self.page_size)
+
+
+    @staticmethod
+    def _cell_html(value:Any)->str:
+        if isinstance(value, list):
+            value = list(value)
+        elif isinstance(value, dict):
+            value = dict(value)
+        cell = html.escape(str(value), quote=False)
+        # make leading spaces visible
+        text = cell.lstrip(" ")
+        spaces_count = len(cell) - len(text)
+        if spaces_count > 1:
+            cell = "&nbsp;" * spaces_count + text
+        return cell
+
+
+    def iter_rows_html(self, start:int, stop:int)->Iterator[str]:
+        "yields html of rows in range start to stop"
+        cell_html = self._cell_html
+        rows = self.rows
+        for row_index in range(max(0, start), min(stop, self.rows_count)):
+            yield "<tr>" + "".join(f"<td>{cell_html(v)}</td>" for v in rows[row_index]) + "</tr>\n"
+
+
+    def get_page_html(self, page:int)->str:
+        "returns html of the rows of the page"
+        start = page * self.page_size
+        return "".join(self.iter_rows_html(start, start + self.page_size))
+
+
+    def _get_table_attributes(self)->str:
+        if self.style == "RANDOM":
+            return random.choice(list(self.STYLES_ATTRIBUTES.values()))
+        return self.STYLES_ATTRIBUTES.get(self.style, self.STYLES_ATTRIBUTES["DEFAULT"])
+
+
+    def get_html(self, pages_source:str=None, options:Dict[str,Any]=None)->str:
+        """returns html of the table, with its first page, and with a pager if it has more than one page.
+        Each rendering has its own table id, pagers of previous renderings keep working while the table is alive"""
+        options = options or {}
+        if self._is_rendered:
+            self.id = self._new_id()
+        self._is_rendered = True
+        head = "".join(f"<th>{html.escape(str(name), quote=False)}</th>" for name in self.columns_name)
+        parts = [
+            f'<div id="{self.id}">',
+            f'<table{self._get_table_attributes()}>\n<thead>\n<tr>{head}</tr>\n</thead>\n<tbody id="{self.id}_body">\n',
+            self.get_page_html(0),
+            '</tbody>\n</table>\n',
+        ]
+        if self.pages_count > 1:
+            pages_source = pages_source or self.get_pages_source(options)
+            logger().debug(f"HtmlTable::get_html - table {self.id}, {self.rows_count} rows, {self.pages_count} pages, pages source: {pages_source}")
+            urls = None
+            pages_count = self.pages_count
+            if pages_source == "kernel":
+                HtmlTable._tables[self.id] = self
+            elif pages_source == "files":
+                # written files are bounded, next pages are not available
+                pages_count = min(pages_count, self._max_embedded_pages_count())
+                urls = self._write_pages_files(pages_count, options)
+            else:
+                # output size is bounded, next pages are not available
+                pages_count = min(pages_count, self._max_embedded_pages_count())
+                parts.extend(f'<template id="{self.id}_page_{page}">{self.get_page_html(page)}</template>\n' for page in range(1, pages_count))
+            parts.append(self._get_pager_html(pages_source, pages_count, urls))
+        parts.append('</div>')
+        return "".join(parts)
+
+
+    @staticmethod
+    def get_pages_source(options:Dict[str,Any])->str:
+        "returns the source of the next pages, 'kernel', 'files' or 'inline'"
+        if options.get("notebook_app") == "jupyternotebook" and not options.get("popup_window"):
+            return "kernel"
+        elif options.get("temp_files_server_address") is not None and (Display.showfiles_url_base_path or "").startswith("http"):
+            return "files"
+        return "inline"
+
+
+    def _max_embedded_pages_count(self)->int:
+        "returns number of pages of the first INLINE_MAX_ROWS rows, pages that are rendered with the table if not rendered by the kernel"
+        return max(1, self.INLINE_MAX_ROWS // self.page_size)
+
+
+    def _write_pages_files(self, pages_count:int, options:Dict[str,Any])->List[str]:
+        "writes each page, except the first, of the first pages_count pages, to a script file, returns urls of pages files (first page url is None)"
+        urls = [None]
+        for page in range(1, pages_count):
+            script = f'(window.kqlmagic_html_table_pages = window.kqlmagic_html_table_pages || {{}})["{self.id}_{page}"] = {json_dumps(self.get_page_html(page))};'
+            file_path = Display._html_to_file_path(script, f"{self.id}_{page}", file_ext="js", **options)
+            urls.append(Display._get_file_path_url(file_path, options=options))
+        return urls
+
+
+    @classmethod
+    def print_page(cls, table_id:str, page:int)->None:
+        "prints html of the page of a rendered table, invoked by the kernel pager"
+        table = cls._tables.get(table_id)
+        if table is not None:
+            print(table.get_page_html(page), end="")
+        else:
+            print('<tr><td colspan="100%">page is not available, the result was released, rerun the cell</td></tr>', end="")
+
+
+    def _get_pager_html(self, pages_source:str, pages_count:int, urls:List[str]=None)->str:
+        table_var = f"window.{self.id}"
+        last_row = min(self.page_size, self.rows_count)
+        paged_rows_count = min(pages_count * self.page_size, self.rows_count)
+        note = ""
+        if paged_rows_count < self.rows_count:
+            note = f'<span style="font-style:italic;">only the first {paged_rows_count} rows are available in the pager, use to_dataframe() to view all rows</span>'
+        return f"""<div style="padding-top:4px;">
+            <button onclick="{table_var}.show({table_var}.page - 1)">&lt;</button>
+            <span id="{self.id}_info" style="padding:0px 6px 0px 6px;">rows 1-{last_row} of {self.rows_count}</span>
+            <button onclick="{table_var}.show({table_var}.page + 1)">&gt;</button>
+            {note}
+        </div>
+        <script>
+        {table_var} = {{
+            page: 0,
+            pages_count: {pages_count},
+            page_size: {self.page_size},
+            rows_count: {self.rows_count},
+            source: "{pages_source}",
+            urls: {json_dumps(urls)},
+            cache: {{}},
+            show: function(page) {{
+                if (page < 0 || page >= this.pages_count) {{
+                    return;
+                }}
+                var self = this;
+                var info = document.getElementById("{self.id}_info");
+                if (!(0 in self.cache)) {{
+                    self.cache[0] = document.getElementById("{self.id}_body").innerHTML;
+                }}
+                var loaded = function(rows_html) {{
+                    self.cache[page] = rows_html;
+                    document.getElementById("{self.id}_body").innerHTML = rows_html;
+                    self.page = page;
+                    info.textContent = "rows " + (page * self.page_size + 1) + "-" + Math.min((page + 1) * self.page_size, self.rows_count) + " of " + self.rows_count;
+                }};
+                var failed = function() {{
+                    info.textContent = "page " + (page + 1) + " is not available";
+                }};
+                if (page in self.cache) {{
+                    loaded(self.cache[page]);
+                }} else if (self.source == "files") {{
+                    var script = document.createElement("script");
+                    script.src = self.urls[page];
+                    script.onload = function() {{
+                        var pages = window.kqlmagic_html_table_pages || {{}};
+                        var key = "{self.id}_" + page;
+                        (key in pages) ? loaded(pages[key]) : failed();
+                    }};
+                    script.onerror = failed;
+                    document.head.appendChild(script);
+                }} else if (self.source == "kernel") {{
+                    try {{
+                        // a large page may be printed in more than one stream message
+                        var rows_html = "";
+                        IPython.notebook.kernel.execute(
+                            "from Kqlmagic.html_table import HtmlTable; HtmlTable.print_page('{self.id}', " + page + ")",
+                            {{iopub: {{output: function(msg) {{ msg.content.text ? loaded(rows_html += msg.content.text) : failed(); }}}}}},
+                            {{silent: false, store_history: false}}
+                        );
+                    }} catch(err) {{
+                        failed();
+                    }}
+                }} else {{
+                    var template = document.getElementById("{self.id}_page_" + page);
+                    template ? loaded(template.innerHTML) : failed();
+                }}
+            }}
+        }};
+        </script>"""
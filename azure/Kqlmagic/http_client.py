@@ -7,13 +7,18 @@
 """Simple HTTP Client"""
 import json
 import gzip
-from typing import Dict, Any, Union
+import zlib
+import time
+import threading
+import weakref
+from typing import Dict, Any, Union, List, Tuple, Iterator
 
-from urllib.parse import urlencode
+from urllib.parse import urlencode, urlsplit
 
 from .dependencies import Dependencies
 from .constants import Constants
 from .log import logger
+from .my_utils import json_loads, run_in_executor
 from ._version import __version__
 
 
@@ -39,8 +44,231 @@ class HTTPErrorResponse(object):
             return self._headers
 
 
-        def read(self)-> bytes:
-            return self._text
+        def read(self, amt:int=None)-> bytes:
+            text, self._text = self._text, b""
+            return text
+
+
+class HTTPPooledResponse(object):
+    """Adapts an http.client response, of a pooled connection, to the urllib response interface.
+    Unless streamed, the body is read at once. A streamed body is read by the caller,
+    and the connection is released back to the pool once the body was fully read."""
+
+    def __init__(self, http_response, stream:bool=False, on_done=None)-> None:
+        self._http_response = http_response
+        self._on_done = on_done
+        self._code = http_response.status
+        self._headers = http_response.headers
+        self._text = None
+        if not stream:
+            # body must be fully read, before the connection can be reused by another request
+            self._text = http_response.read()
+            self._done()
+
+
+    def getcode(self)-> int:
+        return self._code
+
+
+    def info(self)-> dict:
+        return self._headers
+
+
+    def read(self, amt:int=None)-> bytes:
+        if self._text is not None:
+            text = self._text
+            self._text = b""
+            return text
+        data = self._http_response.read(amt)
+        if amt is None or not data or self._http_response.isclosed():
+            self._done()
+        return data
+
+
+    def _done(self)-> None:
+        on_done, self._on_done = self._on_done, None
+        if on_done is not None:
+            on_done()
+
+
+class HttpConnectionPool(object):
+    """Process wide pool of persistent (keep-alive) http connections, shared by all HttpClient instances.
+
+    Connections are pooled per (scheme, host, port), the pool size per host is bounded,
+    and connections that were idle longer than the idle timeout are evicted.
+    All https connections are created with one shared ssl context, and new connections
+    to a host resume the last tls session of that host.
+    If requests is installed, each HttpClient keeps its own requests session (connections pool and cookies),
+    created by the pool, and closed by clear().
+    """
+
+    POOL_MAXSIZE = 10
+    IDLE_TIMEOUT_IN_SECS = 60.0
+    MAX_REDIRECTS = 5
+
+    _lock = threading.Lock()
+    _ssl_context = None
+    _tls_sessions: Dict[Tuple[str,str,int],Any] = {}
+    _idle_connections: Dict[Tuple[str,str,int],List[Tuple[float,Any]]] = {}
+    # requests sessions of the http clients, closed by clear()
+    _requests_sessions = weakref.WeakSet()
+
+
+    @classmethod
+    def create_requests_session(cls):
+        "returns a new requests session, with a bounded keep-alive connections pool per host"
+        session = requests_module.Session()
+        adapter = requests_module.adapters.HTTPAdapter(pool_connections=cls.POOL_MAXSIZE, pool_maxsize=cls.POOL_MAXSIZE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        with cls._lock:
+            cls._requests_sessions.add(session)
+        return session
+
+
+    @classmethod
+    def get_ssl_context(cls):
+        if cls._ssl_context is None:
+            import ssl
+            cls._ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLSv1_2)
+            # ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+            # ssl_context.verify_mode = ssl.CERT_REQUIRED
+            # ssl_context.check_hostname = True
+        return cls._ssl_context
+
+
+    @classmethod
+    def is_poolable(cls, url:str)-> bool:
+        "urls that should go via a proxy, are left to urllib"
+        from urllib.request import getproxies, proxy_bypass
+        parts = urlsplit(url)
+        if parts.scheme not in ["http", "https"]:
+            return False
+        proxies = getproxies()
+        return proxies.get(parts.scheme) is None or proxy_bypass(parts.hostname)
+
+
+    @classmethod
+    def request(cls, method:str, url:str, data:bytes=None, headers:dict=None, timeout:float=None, redirects:int=0, stream:bool=False):
+        "executes the request on a pooled connection, and returns the response, fully read unless streamed"
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        headers = {"Connection": "keep-alive", **(headers or {})}
+
+        conn, is_reused = cls._acquire(key, timeout)
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            http_response = conn.getresponse()
+        except OSError as err:
+            conn.close()
+            if not is_reused or isinstance(err, TimeoutError):
+                raise
+            # server closed the idle connection, retry once on a new connection
+            conn, is_reused = cls._create(key, timeout), False
+            conn.request(method, path, body=data, headers=headers)
+            http_response = conn.getresponse()
+
+        try:
+            on_done = lambda: cls._release(key, conn, will_close=http_response.will_close)
+            result = HTTPPooledResponse(http_response, stream=stream, on_done=on_done)
+        except:  # pylint: disable=bare-except
+            conn.close()
+            raise
+
+        location = result.info().get("Location")
+        if result.getcode() in [301, 302, 303, 307, 308] and location and redirects < cls.MAX_REDIRECTS:
+            from urllib.parse import urljoin
+            result.read()
+            if result.getcode() == 303 or (result.getcode() in [301, 302] and method == "POST"):
+                method, data = "GET", None
+            return cls.request(method, urljoin(url, location), data=data, headers=headers, timeout=timeout, redirects=redirects + 1, stream=stream)
+
+        return result
+
+
+    @classmethod
+    def clear(cls)-> None:
+        "closes all idle connections"
+        with cls._lock:
+            for connections in cls._idle_connections.values():
+                for _, conn in connections:
+                    conn.close()
+            cls._idle_connections = {}
+            cls._tls_sessions = {}
+            sessions = list(cls._requests_sessions)
+            cls._requests_sessions = weakref.WeakSet()
+        for session in sessions:
+            session.close()
+
+
+    @classmethod
+    def _acquire(cls, key:Tuple[str,str,int], timeout:float=None)-> Tuple[Any,bool]:
+        now = time.time()
+        with cls._lock:
+            connections = cls._idle_connections.get(key, [])
+            while connections:
+                last_used, conn = connections.pop()
+                if now - last_used < cls.IDLE_TIMEOUT_IN_SECS and conn.sock is not None:
+                    conn.timeout = timeout
+                    conn.sock.settimeout(timeout)
+                    return conn, True
+                conn.close()
+        return cls._create(key, timeout), False
+
+
+    @classmethod
+    def _create(cls, key:Tuple[str,str,int], timeout:float=None):
+        import http.client
+        scheme, host, port = key
+        if scheme == "https":
+            conn = _HTTPSConnection(host, port, timeout=timeout, context=cls.get_ssl_context())
+            conn.tls_session = cls._tls_sessions.get(key)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn
+
+
+    @classmethod
+    def _release(cls, key:Tuple[str,str,int], conn, will_close:bool=False)-> None:
+        if will_close or conn.sock is None:
+            conn.close()
+            return
+
+        tls_session = getattr(conn.sock, "session", None)
+        with cls._lock:
+            if tls_session is not None:
+                cls._tls_sessions[key] = tls_session
+            connections = cls._idle_connections.setdefault(key, [])
+            if len(connections) < cls.POOL_MAXSIZE:
+                connections.append((time.time(), conn))
+                return
+        conn.close()
+
+
+def _create_https_connection_class():
+    import http.client
+
+    class _HTTPSConnection(http.client.HTTPSConnection):
+        """https connection that resumes a previous tls session, to skip a full tls handshake"""
+
+        tls_session = None
+
+        def connect(self)-> None:
+            http.client.HTTPConnection.connect(self)  # pylint: disable=non-parent-init-called
+            server_hostname = self._tunnel_host or self.host
+            try:
+                self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname, session=self.tls_session)
+            except ValueError:
+                # session is not valid for this context anymore
+                self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname)
+
+    return _HTTPSConnection
+
+
+_HTTPSConnection = _create_https_connection_class()
 
 
 class Response(object):
@@ -114,9 +342,28 @@ class Response(object):
                 return None
 
 
-        def json(self)-> Any:
-            """response data object"""
-            return json.loads(self.text)
+        def json(self, codec:str=None)-> Any:
+            """response data object, decoded by the json codec"""
+            return json_loads(self.content, codec=codec)
+
+
+        def iter_content(self, chunk_size: int=1)-> Iterator[bytes]:
+            """iterates over the response data content, in chunks.
+            If the response was streamed, the data is read from the connection chunk by chunk."""
+            if self._content is not None:
+                for idx in range(0, len(self._content), chunk_size):
+                    yield self._content[idx:idx + chunk_size]
+                return
+
+            encoding = self.headers.get('Content-Encoding')
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == 'gzip' else None
+            while True:
+                chunk = self._response.read(chunk_size)
+                if not chunk:
+                    break
+                yield decompressor.decompress(chunk) if decompressor else chunk
+            if decompressor:
+                yield decompressor.flush()
 
 
         def raise_for_status(self)-> None:
@@ -162,7 +409,8 @@ class Response(object):
 
 
 class HttpClient(object):
-    """Simple http client based on urllib"""
+    """Simple http client based on urllib, all instances share the HttpConnectionPool persistent connections.
+    If requests is installed, each instance keeps its own requests session, so cookies are not shared between clients"""
 
     supported_methods = {'DELETE', 'GET', 'PATCH', 'POST', 'PUT', 'HEAD', 'OPTIONS'}
 
@@ -170,6 +418,13 @@ class HttpClient(object):
 
         global requests_module
         self._requests = requests_module
+        self._requests_session = None
+        self._requests_session_last_used: float = 0.0
+        # number of requests, of the session, that are waiting for a response
+        self._requests_in_flight = 0
+        # streamed responses of the session, the session is not closed while any of them is not fully read
+        self._streamed_responses = weakref.WeakSet()
+        self._lock = threading.Lock()
         self._headers: dict = headers or self._default_headers()
         self._timeout: float = timeout
         self._url: str = host
@@ -177,6 +432,44 @@ class HttpClient(object):
             self._url = f"{self._url}/{path}"
 
 
+    def _get_requests_session(self):
+        """returns the requests session of the client, for a new request, that must be released by _release_requests_session.
+        The session is recreated if it was idle longer than the idle timeout, and it is not in use by another request or a streamed response"""
+        with self._lock:
+            now = time.time()
+            session = self._requests_session
+            if (
+                session is not None
+                and now - self._requests_session_last_used > HttpConnectionPool.IDLE_TIMEOUT_IN_SECS
+                and self._requests_in_flight == 0
+                and not self._has_pending_streamed_responses()
+            ):
+                session.close()
+                session = None
+            if session is None:
+                session = self._requests_session = HttpConnectionPool.create_requests_session()
+            self._requests_session_last_used = now
+            self._requests_in_flight += 1
+            return session
+
+
+    def _release_requests_session(self, streamed_response=None)-> None:
+        "releases the session, after the response was received, a streamed response is in use until it is fully read"
+        with self._lock:
+            self._requests_in_flight -= 1
+            self._requests_session_last_used = time.time()
+            if streamed_response is not None:
+                self._streamed_responses.add(streamed_response)
+
+
+    def _has_pending_streamed_responses(self)-> bool:
+        for response in list(self._streamed_responses):
+            raw = getattr(response, "raw", None)
+            if raw is not None and not getattr(response, "_content_consumed", False) and not raw.closed:
+                return True
+        return False
+
+
     def _default_headers(self)-> dict:
         return {
                 # 'User-Agent': f'{Constants.MAGIC_PACKAGE_NAME}/{__version__}',
@@ -236,11 +529,31 @@ class HttpClient(object):
         return response
 
 
+    async def post_async(self, url: str, params: Union[dict,str]=None, data: Union[str,bytes,Any]=None, headers: dict=None, json: Any=None, timeout: float=None, **kwargs)-> Response:
+        """HTTP post, async counterpart of post.
+        The request is executed in the event loop default executor, on the shared pooled connections."""
+
+        return await run_in_executor(self._execute_http_request, url=url, method="POST", params=params, headers=headers, timeout=timeout, data=data, json=json, **kwargs)
+
+
+    async def get_async(self, url: str, params: Union[dict,str]=None, headers: dict=None, timeout: float=None, **kwargs)-> Response:
+        """HTTP get, async counterpart of get."""
+
+        return await run_in_executor(self._execute_http_request, url=url, method="GET", params=params, headers=headers, timeout=timeout, **kwargs)
+
+
+    async def request_async(self, method: str=None, url: str=None, params: Union[dict,str]=None, headers: dict=None, timeout: float=None, data: Union[str,bytes,Any]=None, json: Any=None, **kwargs)-> Response:
+        """HTTP request, async counterpart of request."""
+
+        return await run_in_executor(self._execute_http_request, url=url, method=method, params=params, headers=headers, timeout=timeout, data=data, json=json, **kwargs)
+
+
     def close(self):  # Not required, but we use it to avoid a warning in unit test
         pass
 
 
-    def _execute_http_request(self, url: str=None, method: str=None, params: Union[dict,str]=None, headers: dict=None, timeout: float=None, data: Union[str,bytes,Any]=None, json: Any=None, **kwargs)-> Response:
+    def _execute_http_request(self, url: str=None, method: str=None, params: Union[dict,str]=None, headers: dict=None, timeout: float=None, data: Union[str,bytes,Any]=None, json: Any=None, stream: bool=False, **kwargs)-> Response:
+        # if stream is set, the response body is not read, it should be consumed by response.iter_content()
         # assert not kwargs, "Our stack shouldn't leak extra kwargs: %s" % kwargs
         try:
             method = self._get_method(method=method, data=data or json)
@@ -251,31 +564,37 @@ class HttpClient(object):
                 url = self._build_url(url=url)
                 logger().debug(f"{method} Request: {url}, params: {params}, payload: {data or json}, headers: {headers}")
                 data: bytes = self._get_data(data=data)
-                response = self._requests.request(method, url, params=params, headers=headers, timeout=timeout, data=data, json=json)
+                session = self._get_requests_session()
+                response = None
+                try:
+                    response = session.request(method, url, params=params, headers=headers, timeout=timeout, data=data, json=json, stream=stream)
+                finally:
+                    self._release_requests_session(streamed_response=response if stream else None)
             else:
-                import urllib.request
-                from urllib.request import Request
-                from urllib.error import HTTPError
-                ssl_context = None
-                if url.lower().startswith("https"):
-                    import ssl
-                    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLSv1_2)
-                    # ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-                    # ssl_context.verify_mode = ssl.CERT_REQUIRED
-                    # ssl_context.check_hostname = True
                 url = self._build_url(url=url, params=params)
                 data: bytes = self._get_data(data=data, json=json)
-                request = Request(url, data=data, headers=headers, method=method)
-                logger().debug(f"{method} Request: {request.get_full_url()}, payload: {request.data}, headers: {request.headers}")
-
-                try:
-                    result = urllib.request.urlopen(request, timeout=timeout, context=ssl_context)
-                except HTTPError as err:
-                    result = HTTPErrorResponse(err)
+                if HttpConnectionPool.is_poolable(url):
+                    logger().debug(f"{method} Request: {url}, payload: {data}, headers: {headers}")
+                    result = HttpConnectionPool.request(method, url, data=data, headers=headers, timeout=timeout, stream=stream)
+                else:
+                    import urllib.request
+                    from urllib.request import Request
+                    from urllib.error import HTTPError
+                    ssl_context = HttpConnectionPool.get_ssl_context() if url.lower().startswith("https") else None
+                    request = Request(url, data=data, headers=headers, method=method)
+                    logger().debug(f"{method} Request: {request.get_full_url()}, payload: {request.data}, headers: {request.headers}")
+
+                    try:
+                        result = urllib.request.urlopen(request, timeout=timeout, context=ssl_context)
+                    except HTTPError as err:
+                        result = HTTPErrorResponse(err)
 
                 response = Response(url, result)
 
-            logger().debug(f"{method} Response: {response.status_code} {response.content}")
+            if stream:
+                logger().debug(f"{method} Response: {response.status_code} (streamed)")
+            else:
+                logger().debug(f"{method} Response: {response.status_code} {response.content}")
             return response
 
         except Exception as err:
@@ -4,17 +4,22 @@
 # license information.
 # --------------------------------------------------------------------------
 
-from typing import Union
+from typing import Any, Union, Callable, Awaitable
 import uuid
+import time
+import asyncio
 
-from .kql_response import KqlQueryResponse, KqlSchemaResponse
+from .kql_response import KqlQueryResponse, KqlSchemaResponse, KqlQueryResponseStream
 from .aad_helper import AadHelper
 from .http_client import HttpClient
+from .my_utils import run_in_executor
+from .retry_policy import RetryContext
 
 
 class KqlClient(object):
 
-    # collect this information, in case bug report will be generated
+    # collect this information, in case bug report will be generated.
+    # info of the last submitted request, the info of each request is set as query_info of its response or error
     last_query_info:dict = None
 
     _aad_helper:AadHelper
@@ -30,3 +35,74 @@ class KqlClient(object):
 
     def execute(self, id:str, query:str, accept_partial_results:bool=False, **options)->Union[KqlQueryResponse, KqlSchemaResponse]:
         raise NotImplementedError(self.__class__.__name__ + ".execute")
+
+
+    def execute_stream(self, id:str, query:str, accept_partial_results:bool=False, **options)->Union[KqlQueryResponse, KqlQueryResponseStream]:
+        "same as execute, but rows might be streamed, if supported by the client. By default, the response is not streamed"
+        return self.execute(id, query, accept_partial_results=accept_partial_results, **options)
+
+
+    async def execute_async(self, id:str, query:str, accept_partial_results:bool=False, **options)->Union[KqlQueryResponse, KqlSchemaResponse]:
+        "same as execute, but returns an awaitable. By default, execute is run in the event loop default executor"
+        return await run_in_executor(self.execute, id, query, accept_partial_results=accept_partial_results, **options)
+
+
+    @staticmethod
+    def _new_query_info()->dict:
+        "returns a new request info dict, filled by the attempt, in case bug report will be generated"
+        query_info = {}
+        KqlClient.last_query_info = query_info
+        return query_info
+
+
+    @staticmethod
+    def _set_query_info(obj:Any, query_info:dict)->None:
+        "sets the request info as query_info of a response or an error"
+        try:
+            obj.query_info = query_info
+        except AttributeError:
+            pass
+
+
+    def _execute_with_retry(self, execute_attempt:Callable[[str,dict],Any], url:str, client_request_id:str, is_idempotent:bool=True, **options)->Any:
+        """Executes attempts of a request, until it succeeds, or the failure is not retryable.
+        execute_attempt is called with the client request id of the attempt, and a new request info dict, to be filled by the attempt.
+        The retry counters are set as retry_info of the response, and the request info of the last attempt as query_info of the response or error."""
+        retry = RetryContext(url, client_request_id, is_idempotent=is_idempotent, **options)
+        while True:
+            retry.check_circuit()
+            query_info = self._new_query_info()
+            try:
+                response = execute_attempt(retry.client_request_id, query_info)
+            except Exception as error:
+                delay = retry.on_failure(error)
+                if delay is None:
+                    self._set_query_info(error, query_info)
+                    raise
+                time.sleep(delay)
+            else:
+                retry.on_success()
+                response.retry_info = retry.info
+                self._set_query_info(response, query_info)
+                return response
+
+
+    async def _execute_with_retry_async(self, execute_attempt:Callable[[str,dict],Awaitable], url:str, client_request_id:str, is_idempotent:bool=True, **options)->Any:
+        "same as _execute_with_retry, but execute_attempt is a coroutine function"
+        retry = RetryContext(url, client_request_id, is_idempotent=is_idempotent, **options)
+        while True:
+            retry.check_circuit()
+            query_info = self._new_query_info()
+            try:
+                response = await execute_attempt(retry.client_request_id, query_info)
+            except Exception as error:
+                delay = retry.on_failure(error)
+                if delay is None:
+                    self._set_query_info(error, query_info)
+                    raise
+                await asyncio.sleep(delay)
+            else:
+                retry.on_success()
+                response.retry_info = retry.info
+                self._set_query_info(response, query_info)
+                return response
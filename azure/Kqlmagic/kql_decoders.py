@@ -0,0 +1,169 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+"""Decoders of kql datetime and timespan values.
+
+Kusto returns datetime values as 'yyyy-MM-ddTHH:mm:ss[.fffffff]Z' and timespan values as '[-][d.]hh:mm:ss[.fffffff]',
+both are decoded by a fast path, other formats fallback to dateutil and to a regex.
+Telemetry results repeat values heavily (timestamps, bin() values), a decoder memoizes decoded strings, up to a bound.
+"""
+
+from typing import Any, Dict
+from datetime import datetime, timedelta
+import re
+
+
+import dateutil.parser
+import dateutil.tz
+
+
+# Regex for TimeSpan
+_TIMESPAN_PATTERN = re.compile(r"(-?)((?P<d>[0-9]*).)?(?P<h>[0-9]{2}):(?P<m>[0-9]{2}):(?P<s>[0-9]{2}(\.[0-9]+)?$)")
+
+# python >= 3.7
+_FROMISOFORMAT = getattr(datetime, "fromisoformat", None)
+
+# same tzinfo as dateutil.parser.isoparse returns for 'Z'
+_TZ_UTC = dateutil.tz.tzutc()
+
+_MISSING = object()
+
+
+class KqlValueDecoder(object):
+    """Decodes datetime and timespan values, with a bounded memo of decoded strings.
+    Decoded values are immutable, so they can be shared by all cells with same string."""
+
+    MEMO_MAX_SIZE = 10000
+
+    def __init__(self, memo_max_size:int=None)->None:
+        self.memo_max_size = self.MEMO_MAX_SIZE if memo_max_size is None else memo_max_size
+        self._datetime_memo:Dict[str,datetime] = {}
+        self._timespan_memo:Dict[str,timedelta] = {}
+        self._timespan_ns_memo:Dict[str,int] = {}
+
+
+    def decode_datetime(self, value:Any)->datetime:
+        if value.__class__ is not str:
+            return self.parse_datetime(value)
+        memo = self._datetime_memo
+        result = memo.get(value, _MISSING)
+        if result is _MISSING:
+            result = self.parse_datetime(value)
+            if len(memo) < self.memo_max_size:
+                memo[value] = result
+        return result
+
+
+    def decode_timespan(self, value:Any)->timedelta:
+        if value.__class__ is not str:
+            return self.parse_timespan(value)
+        memo = self._timespan_memo
+        result = memo.get(value, _MISSING)
+        if result is _MISSING:
+            result = self.parse_timespan(value)
+            if len(memo) < self.memo_max_size:
+                memo[value] = result
+        return result
+
+
+    def decode_timespan_ns(self, value:Any)->int:
+        if value.__class__ is not str:
+            return self.parse_timespan_ns(value)
+        memo = self._timespan_ns_memo
+        result = memo.get(value, _MISSING)
+        if result is _MISSING:
+            result = self.parse_timespan_ns(value)
+            if len(memo) < self.memo_max_size:
+                memo[value] = result
+        return result
+
+
+    @staticmethod
+    def parse_datetime(value:Any)->datetime:
+        """Converts a string/int to a datetime."""
+        if value is None:
+            return None
+
+        if isinstance(value, int):
+            return dateutil.parser.parse(str(value))
+
+        # fast path for 'yyyy-MM-ddTHH:mm:ss[.fffffff]Z'
+        if _FROMISOFORMAT is not None and len(value) >= 20 and value[-1] == "Z" and value[10] == "T":
+            if len(value) == 20:
+                iso_value = value[:19]
+            elif value[19] == ".":
+                # fromisoformat (before python 3.11) accepts only 3 or 6 fraction digits, isoparse truncates to microseconds
+                iso_value = value[:20] + value[20:-1][:6].ljust(6, "0")
+            else:
+                iso_value = None
+            if iso_value is not None:
+                try:
+                    return _FROMISOFORMAT(iso_value).replace(tzinfo=_TZ_UTC)
+                except ValueError:
+                    pass
+
+        return dateutil.parser.isoparse(value)
+
+
+    @staticmethod
+    def parse_timespan(value:Any)->timedelta:
+        """Converts a string/int/float to a timedelta."""
+        if value is None:
+            return None
+
+        if isinstance(value, (int, float)):
+            return timedelta(microseconds=(float(value) / 10))
+
+        # fast path for '[-][d.]hh:mm:ss[.fffffff]'
+        try:
+            factor = 1
+            time_str = value
+            if time_str[0] == "-":
+                factor = -1
+                time_str = time_str[1:]
+            days = 0
+            dot_idx = time_str.find(".")
+            if 0 <= dot_idx < time_str.find(":"):
+                days = int(time_str[:dot_idx])
+                time_str = time_str[dot_idx + 1:]
+            hours, minutes, seconds = time_str.split(":")
+            if len(hours) == 2 and len(minutes) == 2 and seconds[:2].isdigit() and (len(seconds) == 2 or seconds[2] == "."):
+                return factor * timedelta(days=days, hours=int(hours), minutes=int(minutes), seconds=float(seconds))
+        except (ValueError, IndexError):
+            pass
+
+        match = _TIMESPAN_PATTERN.match(value)
+
+        if match:
+            if match.group(1) == "-":
+                factor = -1
+            else:
+                factor = 1
+            return factor * timedelta(
+                days=int(match.group("d") or 0), hours=int(match.group("h")), minutes=int(match.group("m")), seconds=float(match.group("s"))
+            )
+        else:
+            raise ValueError(f"Timespan value '{value}' cannot be decoded")
+
+
+    @staticmethod
+    def parse_timespan_ns(value:Any)->int:
+        """Converts a string/int/float to an integer number of nanoseconds, without loss of the 100ns ticks."""
+        if value is None:
+            return None
+
+        if isinstance(value, (int, float)):
+            # ticks of 100ns
+            return int(round(value * 100))
+
+        match = _TIMESPAN_PATTERN.match(value)
+        if match is None:
+            raise ValueError(f"Timespan value '{value}' cannot be decoded")
+
+        (seconds, _, fraction) = match.group("s").partition(".")
+        total_seconds = ((int(match.group("d") or 0) * 24 + int(match.group("h"))) * 60 + int(match.group("m"))) * 60 + int(seconds)
+        ns = total_seconds * 1000000000 + int(fraction[:9].ljust(9, "0"))
+        return -ns if match.group(1) == "-" else ns
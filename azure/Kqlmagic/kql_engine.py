@@ -8,16 +8,19 @@ from typing import Any, List, Dict, Union, Tuple
 import re
 import itertools
 import getpass
+import hashlib
+import json
 
 
 from .engine import Engine
 from .kql_response import KqlQueryResponse, KqlSchemaResponse
-from .kql_proxy import KqlResponse
+from .kql_proxy import KqlResponse, KqlStreamResponse
 from .kql_client import KqlClient
 from .constants import ConnStrKeys, Schema
 from .exceptions import KqlEngineError
 from .my_utils import get_valid_name, adjust_path
 from .parser import Parser
+from .cluster_metadata_cache import ClusterMetadataCache
 from .log import logger
 
 
@@ -224,20 +227,54 @@ class KqlEngine(Engine):
             return KqlResponse(response, **options)
 
 
+    def execute_stream(self, query:str, user_namespace:Dict[str,Any]=None, database:str=None, **options)->KqlStreamResponse:
+        "same as execute, but returns a response that yields the rows in batches, streamed while read, if supported by the client"
+        if query.strip():
+            client = self.get_client()
+            if not client:
+                raise KqlEngineError("Client is not defined.")
+            response = client.execute_stream(database or self.get_client_database_name(), query, accept_partial_results=False, **options)
+            return KqlStreamResponse(response, **options)
+
+
+    async def client_execute_async(self, query:str, user_namespace:Dict[str,Any]=None, database:str=None, **options)->Union[KqlQueryResponse, KqlSchemaResponse]:
+        if query.strip():
+            client = self.get_client()
+            if not client:
+                raise KqlEngineError("Client is not defined.")
+            return await client.execute_async(database or self.get_client_database_name(), query, accept_partial_results=False, **options)
+
+
+    async def execute_async(self, query:str, user_namespace:Dict[str,Any]=None, database:str=None, **options)->KqlResponse:
+        "same as execute, but returns an awaitable, that doesn't block the event loop"
+        if query.strip():
+            response = await self.client_execute_async(query, user_namespace, database, **options)
+            return KqlResponse(response, **options)
+
+
     def validate(self, **options)->None:
         if not self.options.get("validate_connection_string_done") and options.get("validate_connection_string"):
-            query = "range c from 1 to 10 step 1 | count"
-            kql_response = self.execute(query, **options)
-            table = kql_response.tables[0]
-            if table.rowcount() != 1 or table.colcount() != 1 or [r for r in table.fetchall()][0][0] != 10:
-                raise KqlEngineError("Client failed to validate connection.")
+            cache_key = self._get_metadata_cache_key()
+            if not ClusterMetadataCache.get(cache_key, "validated", **options):
+                query = "range c from 1 to 10 step 1 | count"
+                kql_response = self.execute(query, **options)
+                table = kql_response.tables[0]
+                if table.rowcount() != 1 or table.colcount() != 1 or [r for r in table.fetchall()][0][0] != 10:
+                    raise KqlEngineError("Client failed to validate connection.")
+                ClusterMetadataCache.set(cache_key, "validated", True, **options)
             self.options["validate_connection_string_done"] = True
         
 
     def validate_database_name(self, **options)->None:
         if not self.options.get("validate_database_name_done"):
             try:
-                database_name_list, databases_by_pretty_name = self._get_databases_by_pretty_name(**options)
+                cache_key = self._get_metadata_cache_key()
+                databases = ClusterMetadataCache.get(cache_key, "databases", **options)
+                # cached list might be stale, and miss a recently created database
+                if databases is None or self.database_name not in itertools.chain(*databases):
+                    databases = self._get_databases_by_pretty_name(**options)
+                    ClusterMetadataCache.set(cache_key, "databases", databases, **options)
+                database_name_list, databases_by_pretty_name = databases
                 if self.database_name not in database_name_list:
                     if self.database_name in databases_by_pretty_name:
                         self.client_database_name = databases_by_pretty_name[self.database_name]
@@ -255,6 +292,13 @@ class KqlEngine(Engine):
         raise NotImplementedError(f"_get_databases_by_pretty_name not implemented for this engine.")
 
 
+    def _get_metadata_cache_key(self)->str:
+        "identifies the cluster and the credentials used to access it, secrets are hashed"
+        conn_kv = {key: f"{value}" for key, value in self._parsed_conn.items() if key not in self._EXCLUDE_FROM_URL_KEYS}
+        key_str = json.dumps([self._URI_SCHEMA_NAME, sorted(conn_kv.items())])
+        return hashlib.sha256(key_str.encode()).hexdigest()
+
+
     _CREDENTIAL_KEYS = {
         ConnStrKeys.TENANT,
         ConnStrKeys.AAD_URL,
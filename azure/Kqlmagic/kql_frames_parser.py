@@ -0,0 +1,226 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+"""Incremental parser of kusto v2 query responses.
+
+A v2 response is a json array of frames (DataSetHeader, TableHeader, TableFragment,
+TableProgress, TableCompletion, DataTable, DataSetCompletion). The parser reads
+the response body in chunks, and emits the frames, and the rows of the table frames,
+as soon as they are decoded, without keeping the full body in memory.
+Progressive responses (results_progressive_enabled) are assembled to DataTable frames.
+"""
+
+from typing import Any, Iterable, Iterator, Tuple, Callable, Union
+import json
+import codecs
+
+
+class FrameEvent(object):
+    ROWS_START = "rows_start"  # value is the frame, rows will follow
+    ROW = "row"                # value is a row of the last started frame
+    FRAME = "frame"            # value is a complete frame (rows that were emitted as ROW events are not included)
+
+
+class KqlFramesParser(object):
+    """ Pull parser over chunks of a json response body """
+
+    CHUNK_SIZE = 64 * 1024
+    _WHITESPACE = " \t\n\r"
+
+    def __init__(self, chunks:Iterable[bytes])->None:
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+
+    @classmethod
+    def from_file(cls, file_obj, chunk_size:int=None):
+        "creates parser that reads a binary file object in chunks"
+        chunk_size = chunk_size or cls.CHUNK_SIZE
+        return cls(iter(lambda: file_obj.read(chunk_size), b""))
+
+
+    def parse(self, on_progress:Callable[[dict,Any],None]=None)->Any:
+        """Returns the parsed response.
+        A v2 frames array is built frame by frame, any other json value is parsed as a whole.
+        on_progress is called while progressive tables are received, see frames()"""
+        result = self.iter_parse(on_progress=on_progress)
+        return list(result) if isinstance(result, Iterator) else result
+
+
+    def iter_parse(self, on_progress:Callable[[dict,Any],None]=None)->Union[Iterator[dict],Any]:
+        """Same as parse, but a v2 frames array is returned as an iterator of frames, that are parsed while consumed,
+        so frames are stored by the consumer as soon as they are parsed. Any other json value is parsed as a whole"""
+        if self._peek() == "[":
+            return self.frames(on_progress=on_progress)
+        result = self._next_value()
+        self._expect_end()
+        return result
+
+
+    def frames(self, on_progress:Callable[[dict,Any],None]=None)->Iterator[dict]:
+        """yields complete frames, including their rows.
+        Progressive tables (TableHeader, TableFragment, TableProgress and TableCompletion frames) are assembled
+        to DataTable frames, that are yielded on TableCompletion. While assembled, on_progress is called with
+        the DataTable frame and the reported progress (None after a fragment)"""
+        rows = None
+        # progressive tables by TableId
+        tables = {}
+        for kind, value in self.events():
+            if kind == FrameEvent.ROW:
+                rows.append(value)
+
+            elif kind == FrameEvent.ROWS_START:
+                table = tables.get(value.get("TableId")) if value.get("FrameType") == "TableFragment" else None
+                if table is None:
+                    rows = value["Rows"] = []
+                elif value.get("TableFragmentType") == "DataReplace":
+                    rows = table["Rows"] = []
+                else:
+                    rows = table["Rows"]
+
+            else:
+                rows = None
+                frame_type = value.get("FrameType")
+                if frame_type == "TableHeader":
+                    tables[value.get("TableId")] = {
+                        "FrameType": "DataTable",
+                        "TableId": value.get("TableId"),
+                        "TableKind": value.get("TableKind"),
+                        "TableName": value.get("TableName"),
+                        "Columns": value.get("Columns"),
+                        "Rows": [],
+                    }
+                elif frame_type in ["TableFragment", "TableProgress"] and value.get("TableId") in tables:
+                    if on_progress is not None:
+                        on_progress(tables[value.get("TableId")], value.get("TableProgress"))
+                elif frame_type == "TableCompletion" and value.get("TableId") in tables:
+                    yield tables.pop(value.get("TableId"))
+                else:
+                    yield value
+
+
+    def events(self)->Iterator[Tuple[str,Any]]:
+        """yields (FrameEvent, value) tuples, rows are yielded one by one as they are decoded.
+        The rest of the data is consumed after the last frame"""
+        self._expect("[")
+        while True:
+            c = self._peek()
+            if c == "]":
+                self._pos += 1
+                self._expect_end()
+                return
+            elif c == ",":
+                self._pos += 1
+            elif c == "{":
+                yield from self._frame_events()
+            else:
+                raise ValueError(f"invalid frames array, unexpected character '{c}'")
+
+
+    def _frame_events(self)->Iterator[Tuple[str,Any]]:
+        self._expect("{")
+        frame = {}
+        while True:
+            c = self._peek()
+            if c == "}":
+                self._pos += 1
+                break
+            elif c == ",":
+                self._pos += 1
+                continue
+
+            key = self._next_value()
+            self._expect(":")
+            if key == "Rows" and self._peek() == "[":
+                self._pos += 1
+                yield (FrameEvent.ROWS_START, frame)
+                while True:
+                    c = self._peek()
+                    if c == "]":
+                        self._pos += 1
+                        break
+                    elif c == ",":
+                        self._pos += 1
+                    else:
+                        yield (FrameEvent.ROW, self._next_value())
+            else:
+                frame[key] = self._next_value()
+
+        yield (FrameEvent.FRAME, frame)
+
+
+    def _fill(self, min_size:int=1)->bool:
+        "reads chunks until at least min_size unconsumed characters are buffered, returns False on end of data"
+        if self._eof:
+            return False
+        parts = [self._buffer[self._pos:]]
+        size = len(parts[0])
+        while size < min_size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                parts.append(self._text_decoder.decode(b"", final=True))
+                self._eof = True
+                break
+            text = self._text_decoder.decode(chunk)
+            parts.append(text)
+            size += len(text)
+        self._buffer = "".join(parts)
+        self._pos = 0
+        return size > 0
+
+
+    def _peek(self)->str:
+        "skips whitespaces and returns next character, without consuming it"
+        while True:
+            buffer = self._buffer
+            pos = self._pos
+            end = len(buffer)
+            while pos < end and buffer[pos] in self._WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < end:
+                return buffer[pos]
+            if not self._fill():
+                raise ValueError("unexpected end of response data")
+
+
+    def _expect(self, char:str)->None:
+        c = self._peek()
+        if c != char:
+            raise ValueError(f"invalid response data, expected '{char}', found '{c}'")
+        self._pos += 1
+
+
+    def _expect_end(self)->None:
+        "consumes the rest of the data, to release the underlying connection, only whitespaces are expected"
+        while True:
+            if self._buffer[self._pos:].strip(self._WHITESPACE):
+                raise ValueError("invalid response data, unexpected data after end of response")
+            self._pos = len(self._buffer)
+            if not self._fill():
+                return
+
+
+    def _next_value(self)->Any:
+        self._peek()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+                # a number at the end of the buffer might be truncated
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # value is incomplete, at least double the buffered data before retry, to keep it linear
+            pending = len(self._buffer) - self._pos
+            if not self._fill(min_size=max(2 * pending, 1)):
+                raise ValueError("unexpected end of response data")
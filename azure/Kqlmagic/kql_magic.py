@@ -4,7 +4,7 @@
 # license information.
 # --------------------------------------------------------------------------
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 
 # must be one of the fist to be executed, as it contains the information what is installed
@@ -26,6 +26,7 @@ from .ipython_api import IPythonAPI
 from .kql_magic_core import Kqlmagic_core
 from .constants import Constants, Cloud
 from .palette import Palettes, Palette
+from .my_utils import JsonCodec
 from .os_dependent_api import OsDependentAPI
 
 
@@ -77,7 +78,8 @@ class Kqlmagic(Magics, Configurable):
         ["DEFAULT", "MSWORD_FRIENDLY", "PLAIN_COLUMNS", "RANDOM"],
         default_value="DEFAULT",
         config=True,
-        help="""Set the table printing style to any of prettytable's defined styles.\n
+        help="""Set the html table style, same as prettytable's defined styles: DEFAULT (bordered), MSWORD_FRIENDLY (vertical lines only),
+        PLAIN_COLUMNS (no border), RANDOM (any of the other styles).\n
         Abbreviation: 'ptst'"""
     )
 
@@ -96,10 +98,19 @@ class Kqlmagic(Magics, Configurable):
         Abbreviation: 'dl'""",
     )
 
+    table_page_size = Int(
+        default_value=100,
+        config=True,
+        help="""Set the number of rows in a page of the html table (prettytable table_package). Only the first page is rendered to the cell output,
+        other pages are rendered on demand, when selected by the table pager. If pages can't be fetched from the kernel or from the
+        local files server, pages of the first 1000 rows are embedded in the cell output.\n
+        Abbreviation: 'tps'""",
+    )
+
     auto_dataframe = Bool(
         default_value=False, 
         config=Dependencies.is_installed("pandas"), 
-        help="""Return Pandas dataframe instead of regular result sets.\n
+        help="""Return dataframe instead of regular result sets (pandas, polars or arrow, as specified by dataframe_package option).\n
         Abbreviation: 'ad'"""
     )
 
@@ -247,6 +258,22 @@ class Kqlmagic(Magics, Configurable):
         Abbreviation: 'to' or 'wait'"""
     )
 
+    parallel_sections = Bool(
+        default_value=False, 
+        config=True, 
+        help="""Submit the independent queries of a multi-query cell concurrently. Results are still displayed and assigned in cell order.\n
+        A query that references a variable assigned by a previous query in the cell, is not submitted concurrently.
+        A command, a management command or a connection switch, ends the concurrent submission.\n
+        Abbreviation: 'parallel'"""
+    )
+
+    parallel_sections_max_workers = Int(
+        default_value=8, 
+        config=True, 
+        help="""Maximum number of queries, of a multi-query cell, that are executed concurrently, when parallel_sections is set.\n
+        Abbreviation: 'psmw'"""
+    )
+
     enum_list = ["None"] 
     default_value = "None"
     if dependencies.is_installed("plotly"):
@@ -645,6 +672,49 @@ class Kqlmagic(Magics, Configurable):
         Abbreviation: 'maxage'"""
     )
 
+    request_max_retries = Int(
+        default_value=3, 
+        config=True, 
+        help=f"""Maximum number of retries of a request that was throttled (429), or failed because service was unavailable (502, 503, 504) or a transient network error.\n
+        Only queries and read-only control commands (.show) are retried, other control commands are not retried, as they might have been executed.\n
+        Retries are delayed as specified by Retry-After response header, or by a jittered exponential backoff.
+        If set to 0, requests are not retried.\n
+        Abbreviation: 'retries'"""
+    )
+
+    request_retry_max_delay = Int(
+        default_value=60, 
+        config=True, 
+        help=f"""Maximum delay, in seconds, before a request retry.\n
+        Abbreviation: 'retrymaxdelay'"""
+    )
+
+    json_codec = Enum(
+        JsonCodec.CODEC_NAMES,
+        default_value="auto",
+        config=True,
+        help="""Set the json codec used to decode and encode json data (e.g. dynamic values, cached results, csv export).\n
+        'auto' decodes by orjson or ujson if installed, and encodes by json (python standard library), so encoded output is not modified.\n
+        'orjson' and 'ujson' are used to decode and encode, encoded output is compact and NaN is encoded as null.\n
+        A codec that is not installed is replaced by json (python standard library)."""
+    )
+
+    cluster_metadata_cache_ttl = Int(
+        default_value=3600, 
+        config=True, 
+        help=f"""Time to live, in seconds, of cached cluster metadata (database names, pretty names and connection validation), shared by all connections to the same cluster with same credentials.\n
+        A database that is missing in the cached database names, refreshes them.
+        If set to 0, cluster metadata is not cached.\n
+        Abbreviation: 'cmcttl'"""
+    )
+
+    cluster_metadata_cache_persist = Bool(
+        default_value=False, 
+        config=True, 
+        help=f"""Persist cached cluster metadata to a file, to be reused after kernel restart. The file does not contain credentials.\n
+        Abbreviation: 'cmcpersist'"""
+    )
+
     # TODO: utilize using fig.show show(comfig=..) instead of offline.iplot
     plotly_config = _Dict(
         default_value=None,
@@ -661,6 +731,48 @@ class Kqlmagic(Magics, Configurable):
         Abbreviation: 'dtd'"""
     )
 
+    dataframe_package = Enum(
+        ["pandas", "polars", "arrow"],
+        default_value="pandas",
+        config=True,
+        help=f"""Set the package of the dataframe returned by auto_dataframe, result_var and columns_to_local_vars, and displayed by 'pandas' table_package.\n
+        'polars' returns a polars DataFrame, 'arrow' returns a pyarrow Table.\n
+        Abbreviation: 'dfp'"""
+    )
+
+    memory_budget = Bool(
+        default_value=False,
+        config=True,
+        help=f"""Reduce memory held by query results, the table rows are kept once and other representations are built on demand.\n
+        The raw json response is released after the result is created (unless keep_raw_json is set), converted cell values are not memoized,
+        dataframes (pandas, polars, arrow) are not kept by the result, and the request payload is not kept for bug report.\n
+        Result memory usage can be inspected by the result memory_usage() method.\n
+        Abbreviation: 'mb'"""
+    )
+
+    progressive_results = Bool(
+        default_value=False,
+        config=True,
+        help=f"""Request progressive results (sets results_progressive_enabled query property), for Azure Data Explorer queries.
+        While the results are received, the received records count, the reported progress, and the last received records are displayed in place.\n
+        Abbreviation: 'prog'"""
+    )
+
+    stream = Bool(
+        default_value=False,
+        config=False,
+        help=f"""Return a streamed response instead of a result set. Rows are decoded while the response is read, and are yielded in batches
+        by its iter_batches(batch_size, arrow=False) method, as lists of tuples or as pyarrow RecordBatches, nothing is kept once consumed.
+        The response is not displayed nor cached, and can be consumed once. Rows of Azure Data Explorer queries are streamed, other responses are read before.\n"""
+    )
+
+    keep_raw_json = Bool(
+        default_value=False,
+        config=True,
+        help=f"""Keep the raw json response, accessible by the result raw_json property, when memory_budget is set.\n
+        Abbreviation: 'krj'"""
+    )
+
     plotly_layout = _Dict(
         default_value=None, 
         config=Dependencies.is_installed("plotly"), 
@@ -962,6 +1074,25 @@ class Kqlmagic(Magics, Configurable):
         
 
 def kql(text:str='', options:Dict[str,Any]=None, query_properties:Dict[str,Any]=None, vars:Dict[str,str]=None, connection_string:str=None, global_ns=None, local_ns=None):
+    _kql_start(global_ns=global_ns, local_ns=local_ns)
+    return _kql_execute(text, options=options, query_properties=query_properties, vars=vars, connection_string=connection_string)
+
+
+async def kql_async(text:str='', options:Dict[str,Any]=None, query_properties:Dict[str,Any]=None, vars:Dict[str,str]=None, connection_string:str=None, global_ns=None, local_ns=None):
+    """Same as kql, but returns an awaitable. 
+    The queries are executed by the engine without blocking the event loop, so many queries can be awaited concurrently."""
+    _kql_start(global_ns=global_ns, local_ns=local_ns)
+    line, cell = _get_line_and_cell(text)
+    return await kql_core_obj.execute_async(
+        line, 
+        cell,
+        override_vars=vars,
+        override_options=options, 
+        override_query_properties=query_properties, 
+        override_connection=connection_string)
+
+
+def _kql_start(global_ns=None, local_ns=None)->None:
     global kql_core_obj, is_non_magic_kql_on, kql_core_count
 
     if not is_non_magic_kql_on:
@@ -982,12 +1113,16 @@ def kql(text:str='', options:Dict[str,Any]=None, query_properties:Dict[str,Any]=
             kql_core_count += 1
         is_non_magic_kql_on = True
 
+
+def _get_line_and_cell(text:str)->Tuple[str,str]:
     if text.find("\n"):
-        line = ""
-        cell = text
+        return "", text
     else:
-        line = text
-        cell = None
+        return text, None
+
+
+def _kql_execute(text:str='', options:Dict[str,Any]=None, query_properties:Dict[str,Any]=None, vars:Dict[str,str]=None, connection_string:str=None):
+    line, cell = _get_line_and_cell(text)
 
     return kql_core_obj.execute(
         line, 
@@ -14,7 +14,10 @@ import urllib.parse
 import urllib.request
 import traceback
 import uuid
-from typing import Any, Union, Dict, List
+import re
+import asyncio
+import concurrent.futures
+from typing import Any, Union, Dict, List, Iterator, Tuple
 
 
 from traitlets.config.configurable import Configurable
@@ -36,9 +39,10 @@ from .results import ResultSet
 from .connection import Connection
 from .parser import Parser
 from .parameterizer import Parameterizer
-from .display import Display
+from .display import Display, ProgressiveDisplay
 from .database_html import Database_html
 from .help_html import Help_html
+from .kql_engine import KqlEngine
 from .kusto_engine import KustoEngine
 from .aria_engine import AriaEngine
 from .ai_engine import AppinsightsEngine
@@ -48,9 +52,12 @@ from .palette import Palettes, Palette
 from .cache_engine import CacheEngine
 from .cache_client import CacheClient
 from .kql_response import KqlError
+from .kql_proxy import KqlResponse
 from .my_files_server_management import FilesServerManagement
 from .bug_report import bug_info
-from .kql_client import KqlClient
+from .http_client import HttpConnectionPool
+from .retry_policy import CircuitBreaker
+from .cluster_metadata_cache import ClusterMetadataCache
 from .exceptions import KqlEngineError
 from .python_command import execute_python_command
 from .activate_kernel_command import ActivateKernelCommand
@@ -225,7 +232,9 @@ class Kqlmagic_core(object):
     def stop(self)->None:
         # TODO: need to graceful close
         # print("STOP")
-        pass
+        HttpConnectionPool.clear()
+        CircuitBreaker.clear()
+        ClusterMetadataCache.clear()
 
 
     def _start(self)->None:
@@ -725,7 +734,8 @@ class Kqlmagic_core(object):
 
 
     def execute(self, line:str, cell:str=None, local_ns:Dict[str,Any]=None,
-                override_vars:Dict[str,str]=None, override_options:Dict[str,Any]=None, override_query_properties:Dict[str,Any]=None, override_connection:str=None, override_result_set:ResultSet=None):
+                override_vars:Dict[str,str]=None, override_options:Dict[str,Any]=None, override_query_properties:Dict[str,Any]=None, override_connection:str=None, override_result_set:ResultSet=None,
+                submitted_sections:Dict[int,Dict[str,Any]]=None):
         """Query Kusto or ApplicationInsights using kusto query language (kql). Repository specified by a connect string.
 
         Magic Syntax::
@@ -846,9 +856,17 @@ class Kqlmagic_core(object):
         try:
             user_ns = self._set_user_ns(local_ns)
 
-            parsed_queries = Parser.parse(line, cell, self.default_options, _ENGINES, user_ns)
-            logger().debug(f"Kqlmagic_core::execute - parsed_queries: {parsed_queries}")
+            parsed_queries = self._parse_queries(line, cell, user_ns, override_options, override_query_properties, override_connection)
             result = None
+
+            if submitted_sections is not None:
+                # executed by execute_async, a submitted section is used only if its engine and query are the same
+                for (idx, submitted) in submitted_sections.items():
+                    if idx < len(parsed_queries):
+                        parsed_queries[idx]["parallel_submitted"] = submitted
+            elif override_result_set is None and len(parsed_queries) > 1 and parsed_queries[0]["options"].get("parallel_sections"):
+                self._submit_parallel_sections(parsed_queries, user_ns, override_vars=override_vars)
+
             for parsed in parsed_queries:
                 modified_options = {}
                 user_ns = self._set_user_ns(local_ns)
@@ -856,14 +874,6 @@ class Kqlmagic_core(object):
                 parsed["cell"] = cell
                 popup_text = None
 
-                if type(override_options) is dict:
-                    override_options = Parser.validate_override("override_options", self.default_options, **override_options)
-                    parsed["options"] = {**parsed["options"], **override_options}
-                if type(override_query_properties) is dict:
-                    override_query_properties = Parser.validate_override("override_query_properties", self.default_options, **override_query_properties)
-                    parsed["options"]["query_properties"] = {**parsed["options"]["query_properties"], **override_query_properties}
-                if type(override_connection) is str:
-                    parsed["connection_string"] = override_connection
                 options = parsed["options"]
                 command = parsed["command"].get("command")
 
@@ -872,7 +882,7 @@ class Kqlmagic_core(object):
 
                 if command is None or command == "submit":
                     result = self._execute_query(parsed, user_ns, result_set=override_result_set, override_vars=override_vars)
-                    self.last_execution["query"] = KqlClient.last_query_info
+                    self.last_execution["query"] = parsed.get("query_info")
                     if type(result) == ResultSet:
                         # can't just return result as is, it fails when used with table package pandas_show_schema 
                         # it will first show the result, and will suppres show by result._repr_html
@@ -1047,7 +1057,7 @@ class Kqlmagic_core(object):
         except Exception as e:
             exception = e.exception if isinstance(e, ShortError) else e  # pylint: disable=no-member
             if command is None or command == "submit":
-                self.last_execution["query"] = KqlClient.last_query_info
+                self.last_execution["query"] = (parsed.get("query_info") if parsed else None) or getattr(exception, "query_info", None)
             self.last_execution["error"] = str(exception)
             self.last_execution["traceback"] = traceback.format_exc().splitlines()
             logger().debug(f"Kqlmagic_core::execute - failed - command: {command} param: {param}")
@@ -1064,6 +1074,57 @@ class Kqlmagic_core(object):
             self.execution_depth -= 1
 
 
+    def _parse_queries(self, line:str, cell:str, user_ns:Dict[str,Any], override_options:Dict[str,Any]=None, override_query_properties:Dict[str,Any]=None, override_connection:str=None)->List[Dict[str,Any]]:
+        parsed_queries = Parser.parse(line, cell, self.default_options, _ENGINES, user_ns)
+        logger().debug(f"Kqlmagic_core::execute - parsed_queries: {parsed_queries}")
+
+        if type(override_options) is dict:
+            override_options = Parser.validate_override("override_options", self.default_options, **override_options)
+        if type(override_query_properties) is dict:
+            override_query_properties = Parser.validate_override("override_query_properties", self.default_options, **override_query_properties)
+        for parsed in parsed_queries:
+            if type(override_options) is dict:
+                parsed["options"] = {**parsed["options"], **override_options}
+            if type(override_query_properties) is dict:
+                parsed["options"]["query_properties"] = {**parsed["options"]["query_properties"], **override_query_properties}
+            if type(override_connection) is str:
+                parsed["connection_string"] = override_connection
+        return parsed_queries
+
+
+    async def execute_async(self, line:str, cell:str=None, local_ns:Dict[str,Any]=None,
+                            override_vars:Dict[str,str]=None, override_options:Dict[str,Any]=None, override_query_properties:Dict[str,Any]=None, override_connection:str=None):
+        """Same as execute, but the independent queries of the cell are executed by engine.execute_async, without blocking the event loop.
+        The queries are submitted and awaited first, then the cell is executed by execute, with the awaited responses.
+        The magic state (connection, last result, user namespace, display) is modified only by execute, that is not awaited,
+        so concurrent awaited executions don't interleave their state."""
+        sections = []
+        try:
+            user_ns = self._set_user_ns(local_ns or {})
+            parsed_queries = self._parse_queries(line, cell, user_ns, override_options, override_query_properties, override_connection)
+            sections = list(self._get_independent_sections(parsed_queries, user_ns, override_vars=override_vars))
+        except: # pylint: disable=bare-except
+            # errors are reported by execute
+            pass
+
+        submitted_sections = {idx: {"engine": engine, "query": parametrized_query} for (idx, engine, parametrized_query) in sections}
+        if sections:
+            responses = await asyncio.gather(
+                *[self._execute_section_async(submitted_sections[idx], user_ns.copy(), **parsed_queries[idx]["options"]) for (idx, _, _) in sections],
+                return_exceptions=True
+            )
+            for ((idx, _, _), response) in zip(sections, responses):
+                future = concurrent.futures.Future()
+                if isinstance(response, BaseException):
+                    future.set_exception(response)
+                else:
+                    future.set_result(response)
+                submitted_sections[idx]["future"] = future
+
+        return self.execute(line, cell, local_ns=local_ns, override_vars=override_vars, override_options=override_options,
+                            override_query_properties=override_query_properties, override_connection=override_connection, submitted_sections=submitted_sections)
+
+
     def _set_user_ns(self, local_ns:Dict[str,Any])->Dict[str,Any]:
         if self.shell is not None:
             user_ns = self.shell.user_ns.copy()
@@ -1315,6 +1376,93 @@ Each option can be set as follow:<br>
                 IPythonAPI.try_kernel_execute("""try {IPython.notebook.kernel.execute("NOTEBOOK_URL = '" + window.location + "'");} catch(err) {;}""", **options)
 
 
+    def _submit_parallel_sections(self, parsed_queries:List[Dict[str,Any]], user_ns:Dict[str,Any], override_vars:Dict[str,str]=None)->None:
+        """Submits the independent queries of a multi-query cell to a bounded thread pool.
+        The sections are still executed in cell order by _execute_query, but a submitted query waits for its
+        submitted result, instead of executing it, so results are displayed and assigned in cell order.
+        Only independent queries are submitted, see _get_independent_sections."""
+
+        max_workers = max(1, parsed_queries[0]["options"].get("parallel_sections_max_workers") or 1)
+        executor = None
+        for (idx, engine, parametrized_query) in self._get_independent_sections(parsed_queries, user_ns, override_vars=override_vars):
+            parsed = parsed_queries[idx]
+            executor = executor or concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+            submitted = {"engine": engine, "query": parametrized_query}
+            submitted["future"] = executor.submit(self._execute_section, submitted, user_ns.copy(), **parsed["options"])
+            parsed["parallel_submitted"] = submitted
+            logger().debug(f"Kqlmagic_core::_submit_parallel_sections - submitted query: {parametrized_query}")
+
+        if executor is not None:
+            # submitted queries continue to run, the pool threads exit when done
+            executor.shutdown(wait=False)
+
+
+    @staticmethod
+    def _execute_section(submitted:Dict[str,Any], user_ns:Dict[str,Any], **options)->KqlResponse:
+        "executes the query of a submitted section, its execution start and end times are kept by the submitted section"
+        submitted["start_time"] = time.time()
+        try:
+            return submitted["engine"].execute(submitted["query"], user_ns, **options)
+        finally:
+            submitted["end_time"] = time.time()
+
+
+    @staticmethod
+    async def _execute_section_async(submitted:Dict[str,Any], user_ns:Dict[str,Any], **options)->KqlResponse:
+        "same as _execute_section, but executed by engine.execute_async"
+        submitted["start_time"] = time.time()
+        try:
+            return await submitted["engine"].execute_async(submitted["query"], user_ns, **options)
+        finally:
+            submitted["end_time"] = time.time()
+
+
+    def _get_independent_sections(self, parsed_queries:List[Dict[str,Any]], user_ns:Dict[str,Any], override_vars:Dict[str,str]=None)->Iterator[Tuple[int,KqlEngine,str]]:
+        """Yields (index, engine, parametrized query) of the independent queries of a cell, that can be executed before their turn.
+        A query is independent if it uses the connection of the first query, and doesn't reference a variable
+        assigned by a previous query in the cell. A non query section (command), a management command, 
+        a connection switch, or columns_to_local_vars, ends the independent queries.
+        Streamed and progressive queries are not yielded, they are executed in their turn, as they are consumed or displayed while executed."""
+
+        first_connection_string = None
+        assigned_vars = set()
+        for (idx, parsed) in enumerate(parsed_queries):
+            options = parsed["options"]
+            query = parsed.get("query", "").strip()
+            command = parsed["command"].get("command")
+            connection_string = parsed.get("connection_string")
+            if (command not in [None, "submit"] or query.startswith(".")
+                or (first_connection_string is not None and connection_string != first_connection_string)):
+                break
+            if not query:
+                continue
+
+            first_connection_string = connection_string
+            is_executed_in_turn = options.get("stream") or options.get("progressive_results")
+            if not is_executed_in_turn and not any(re.search(rf"\b{re.escape(var)}\b", query) for var in assigned_vars):
+                try:
+                    # connection is set, and validated, in order, on the calling thread, to keep interactive authentication sequential
+                    engine = Connection.get_engine(connection_string, user_ns, **options)
+                    engine.validate_database_name(**options)
+                    if options.get("validate_connection_string"):
+                        engine.validate(**options)
+                    Parser.validate_query_properties(engine._URI_SCHEMA_NAME, options.get("query_properties"))
+                    params_vars = options.get("params_dict") or user_ns
+                    parametrized_query = Parameterizer(query).apply(params_vars, override_vars=override_vars, **options).query
+                except:  # pylint: disable=bare-except
+                    # error will be raised when the section is executed
+                    break
+
+                yield (idx, engine, parametrized_query)
+
+            if options.get("columns_to_local_vars"):
+                break
+            assigned_vars.update(["_", "_kql_last_result_"])
+            assigned_vars.update(
+                options.get(name) for name in ["result_var", "assign_var", "cursor_var", "last_raw_result_var"] if options.get(name) is not None
+            )
+
+
     def _execute_query(self, parsed:Dict[str,Any], user_ns:Dict[str,Any], result_set:ResultSet=None, override_vars=None)->ResultSet:
         query = parsed.get("query", "").strip()
         options = parsed.get("options", {})
@@ -1398,9 +1546,33 @@ Each option can be set as follow:<br>
             params_vars = parametrized_query_obj.parameters if result_set is not None else options.get("params_dict") or user_ns
             parametrized_query_obj.apply(params_vars, override_vars=override_vars,  **options)
             parametrized_query = parametrized_query_obj.query
+            submitted = parsed.pop("parallel_submitted", None)
+            if options.get("stream") and result_set is None:
+                # streamed results are consumed by the caller, they are not displayed, cached, nor kept
+                stream_result = engine.execute_stream(parametrized_query, user_ns, **options)
+                if options.get("result_var"):
+                    self.shell_user_ns.update({options.get("result_var"): stream_result})
+                    user_ns.update({options.get("result_var"): stream_result})
+                    return None
+                return stream_result
+            progressive_display = None
+            submitted_end_time = None
+            if options.get("progressive_results") and not suppress_results and submitted is None:
+                # shows progress in place, until the result is shown
+                progressive_display = ProgressiveDisplay(**options)
             try:
-                raw_query_result = engine.execute(parametrized_query, user_ns, **options)
+                if submitted is not None and submitted.get("engine") is engine and submitted.get("query") == parametrized_query:
+                    raw_query_result = submitted.get("future").result()
+                    # executed before its turn
+                    start_time = submitted.get("start_time", start_time)
+                    submitted_end_time = submitted.get("end_time")
+                elif progressive_display is not None:
+                    raw_query_result = engine.execute(parametrized_query, user_ns, on_progress=progressive_display.update, **options)
+                else:
+                    raw_query_result = engine.execute(parametrized_query, user_ns, **options)
+                parsed["query_info"] = raw_query_result.query_info
             except KqlError as err:
+                parsed["query_info"] = err.query_info
                 try:
                     parsed_error = json.loads(err.message)
                     message = f"query execution error:\n{json_dumps(parsed_error, indent=4, sort_keys=True)}" 
@@ -1410,8 +1582,11 @@ Each option can be set as follow:<br>
                 return None
             except Exception as e:
                 raise e
+            finally:
+                if progressive_display is not None:
+                    progressive_display.close()
 
-            end_time = time.time()
+            end_time = submitted_end_time or time.time()
 
             save_as_file_path = None
             if options.get("save_as") is not None:
@@ -1455,6 +1630,9 @@ Each option can be set as follow:<br>
                 if options.get("show_query_time"):
                     minutes, seconds = divmod(end_time - start_time, 60)
                     saved_result.feedback_info.append("Done ({:0>2}:{:06.3f}): {} records".format(int(minutes), seconds, saved_result.records_count))
+                retry_info = raw_query_result.retry_info
+                if retry_info.get("retries"):
+                    saved_result.feedback_info.append(f"Request retried {retry_info.get('retries')} times ({retry_info.get('throttled')} throttled), after {retry_info.get('last_error')}")
 
             if options.get("columns_to_local_vars"):
                 # Instead of returning values, set variables directly in the
@@ -1463,14 +1641,15 @@ Each option can be set as follow:<br>
                 if options.get("feedback"):
                     saved_result.feedback_info.append("Returning raw data to local variables")
 
-                self.shell_user_ns.update(saved_result.to_dict())
-                user_ns.update(saved_result.to_dict())
+                columns_dict = saved_result._to_columns_dict()
+                self.shell_user_ns.update(columns_dict)
+                user_ns.update(columns_dict)
                 result = None
 
             if options.get("auto_dataframe"):
                 if options.get("feedback"):
-                    saved_result.feedback_info.append("Returning data converted to pandas dataframe")
-                result = saved_result.to_dataframe()
+                    saved_result.feedback_info.append(f"Returning data converted to {options.get('dataframe_package') or 'pandas'} dataframe")
+                result = saved_result.to_frame()
 
             if options.get("result_var") and result_set is None:
                 result_var = options.get("result_var")
@@ -1504,11 +1683,16 @@ Each option can be set as follow:<br>
                 else:
                     saved_result.display_info = True
 
-            if result_set is None:
-                saved_result._create_fork_results()
-            else:
+            if result_set is not None:
+                # fork results of other tables are created on demand, by fork_result()
                 saved_result._update_fork_results()
 
+            if options.get("memory_budget"):
+                saved_result._release_memory()
+                # request payload contains the query, that is kept by the result
+                if raw_query_result.query_info is not None:
+                    raw_query_result.query_info.get("request", {}).pop("payload", None)
+
             # Return results into the default ipython _ variable
             if options.get("assign_var") is not None:
                 assign_var = options.get("assign_var")
@@ -4,9 +4,9 @@
 # license information.
 # --------------------------------------------------------------------------
 
-import json
-from datetime import datetime
+import re
 import collections
+from datetime import datetime, timedelta, timezone
 
 try:
     collectionsAbc = collections.abc
@@ -14,59 +14,71 @@ except AttributeError:
     collectionsAbc = collections
 
 
-import dateutil.parser
-
-
 from .dependencies import Dependencies
+from .kql_response import KqlResponseTable, KqlResult
+from .kql_decoders import KqlValueDecoder
+from .my_utils import json_loads, json_dumps
+from .log import logger
 
 
-class KqlRow(collectionsAbc.Iterator):
+class KqlRow(collectionsAbc.Sequence):
+    """ Row of a result table, a view over the table's row, enables both index and column name access.
+    The row holds no values and no schema, values are converted on access by the table, and column names are resolved
+    by the table's column mappings, shared by all its rows """
 
-    def __init__(self, row, col_num, **options):
-        self.options = options
-        self.row = row
-        self.column_index = 0
-        self.columns_count = col_num
+    __slots__ = ("_table", "_row_index", "_column_indexes")
 
+    def __init__(self, table, row_index:int, column_indexes:list=None):
+        self._table = table
+        self._row_index = row_index
+        # None - all table columns
+        self._column_indexes = column_indexes
 
-    def __iter__(self):
-        self.column_index = 0
-        return self
 
+    @property
+    def row(self):
+        " returns the row as a mapping of column names to values "
+        return KqlResult(self._table, self._row_index, self._column_indexes)
 
-    def __next__(self):
-        if self.column_index >= self.columns_count:
-            raise StopIteration
-        val = self.__getitem__(self.column_index)
-        self.column_index = self.column_index + 1
-        return val
+
+    def __iter__(self):
+        get_value = self._table.get_value
+        row_index = self._row_index
+        for col_index in (self._column_indexes if self._column_indexes is not None else range(self._table.columns_count)):
+            yield get_value(row_index, col_index)
 
 
     def __getitem__(self, key):
         if isinstance(key, slice):
-            s = self.row[key]
-            return KqlRow(s, len(s), **self.options)
+            column_indexes = self._column_indexes if self._column_indexes is not None else range(self._table.columns_count)
+            return KqlRow(self._table, self._row_index, list(column_indexes[key]))
+        elif isinstance(key, int):
+            col_index = key if self._column_indexes is None else self._column_indexes[key]
         else:
-            return self.row[key]
+            col_index = self._table.column2index_mapping[key]
+            if self._column_indexes is not None and col_index not in self._column_indexes:
+                raise KeyError(key)
+        return self._table.get_value(self._row_index, col_index)
 
 
     def __len__(self):
-        return self.columns_count
+        return self._table.columns_count if self._column_indexes is None else len(self._column_indexes)
 
 
     def __eq__(self, other):
-        if len(other) != self.columns_count:
+        if len(other) != len(self):
             return False
-        for i in range(self.columns_count):
-            s = self.__getitem__(i)
-            o = other[i]
+        for s, o in zip(self, other):
             if o != s:
                 return False
         return True
 
 
+    __hash__ = None
+
+
     def __str__(self):
-        return ", ".join(str(self.__getitem__(i)) for i in range(self.columns_count))
+        return ", ".join(str(v) for v in self)
 
 
     def __repr__(self):
@@ -86,15 +98,15 @@ class KqlRowsIter(collectionsAbc.Iterator):
 
     def __iter__(self):
         self.row_index = 0
-        self.iter_all_iter = self.table.iter_all()
         return self
 
 
     def __next__(self):
         if self.row_index >= self.rows_count:
             raise StopIteration
+        row = KqlRow(self.table, self.row_index)
         self.row_index = self.row_index + 1
-        return KqlRow(self.iter_all_iter.__next__(), self.col_num, **self.options)
+        return row
 
 
     def __len__(self):
@@ -107,15 +119,77 @@ class KqlResponse(object):
     def __init__(self, response, **options):
         self.json_response = response.json_response
         self.options = options
-        self.completion_query_info = response.completion_query_info_results
-        self.completion_query_resource_consumption = response.completion_query_resource_consumption_results
+        self._response = response
         self.dataSetCompletion = response.dataSetCompletion_results
-        self.tables = [
-            KqlTableResponse(
-                t, 
-                response.extended_properties.get(t.id, {}),
-                **options) 
-            for t in response.primary_results]
+        self.retry_info = response.retry_info or {}
+        self.query_info = response.query_info
+        self.tables = [KqlTableResponse(t, None, **options) for t in response.primary_results]
+        for table in self.tables:
+            table._response = response
+
+
+    # computed on first access, and memoized by the response
+    @property
+    def completion_query_info(self):
+        return self._response.completion_query_info_results
+
+
+    @property
+    def completion_query_resource_consumption(self):
+        return self._response.completion_query_resource_consumption_results
+
+
+    @property
+    def extended_properties(self):
+        return self._response.extended_properties
+
+
+class KqlStreamResponse(object):
+    """Streamed query response.
+    Rows of a primary result table are yielded in batches while the response is read, each batch is converted on its own,
+    and nothing is kept once consumed. The response can be consumed once."""
+
+    DEFAULT_BATCH_SIZE = 10000
+
+    # Object constructor
+    def __init__(self, response, **options):
+        self.options = options
+        self._response = response
+        self.retry_info = response.retry_info or {}
+        self.query_info = response.query_info
+        # shared by the batches, memoizes repeated datetime and timespan values
+        self._decoder = KqlValueDecoder()
+        self.columns_name = None
+        self.columns_type = None
+        self.records_count = 0
+
+
+    def iter_batches(self, batch_size:int=None, arrow:bool=False, fork_table_id:int=0):
+        """yields batches of rows of the primary result table fork_table_id, other tables are skipped.
+        A batch is a list of rows, each row a tuple of converted values, or a pyarrow.RecordBatch if arrow is True"""
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        for (table_id, table, rows) in self._response.iter_row_batches(batch_size):
+            if table_id == fork_table_id:
+                self.columns_name = table.columns_name
+                self.columns_type = table.columns_type
+                self.records_count += len(rows)
+                yield KqlTableResponse.rows_to_batch(table, rows, arrow=arrow, decoder=self._decoder, options=self.options)
+
+
+    def __iter__(self):
+        for batch in self.iter_batches():
+            yield from batch
+
+
+    @property
+    def dataSetCompletion(self):
+        return self._response.dataSetCompletion
+
+
+    def __repr__(self):
+        # a not streamed response can be iterated more than once
+        state = "consumed" if getattr(self._response, "is_consumed", False) else "started" if getattr(self._response, "is_started", False) else "not consumed"
+        return f"<{self.__class__.__name__} ({state}), use iter_batches() to get the rows>"
 
 
 class KqlTableResponse(object):
@@ -123,8 +197,12 @@ class KqlTableResponse(object):
     def __init__(self, data_table, extended_properties:dict, **options):
         self.options = options
         self._extended_properties = extended_properties
+        # set by KqlResponse, if extended_properties is None, they are taken from the response on first access
+        self._response = None
         self.data_table = data_table
         self.columns_count = self.data_table.columns_count
+        if options.get("memory_budget"):
+            self.data_table.memoize_converted_values = False
 
 
     def fetchall(self):
@@ -162,6 +240,8 @@ class KqlTableResponse(object):
     @property
     def extended_properties(self):
         " returns properties as specified in ExtendedProperties table"
+        if self._extended_properties is None:
+            self._extended_properties = self._response.extended_properties.get(self.data_table.id, {}) if self._response is not None else {}
         return self._extended_properties
 
 
@@ -181,12 +261,322 @@ class KqlTableResponse(object):
         return self.data_table.rows_count > 0
 
 
-    def to_dataframe(self, raise_errors=True, options=None):
-        """Returns Pandas data frame."""
-        
+    def iter_batches(self, batch_size:int, arrow:bool=False, options=None):
+        """yields batches of the table rows, converted batch by batch, converted values are not kept.
+        A batch is a list of rows, each row a tuple of converted values, or a pyarrow.RecordBatch if arrow is True"""
+        data_table = self.data_table
+        rows_count = data_table.rows_count
+        for start in range(0, rows_count, batch_size):
+            rows = data_table.rows[start:min(start + batch_size, rows_count)]
+            yield self.rows_to_batch(data_table, rows, arrow=arrow, decoder=data_table.decoder, options=options or self.options)
+
+
+    @classmethod
+    def rows_to_batch(cls, table, rows:list, arrow:bool=False, decoder=None, options=None):
+        "converts raw rows, of a table schema, to a list of tuples of converted values, or to a pyarrow.RecordBatch"
+        batch_table = KqlResponseTable(table.id, {"Columns": table.columns, "Rows": rows}, decoder=decoder, json_codec=table.json_codec)
+        batch_table.memoize_converted_values = False
+        if arrow:
+            arrow_table = cls(batch_table, {}).to_arrow(options=options)
+            return arrow_table.combine_chunks().to_batches()[0]
+        else:
+            return list(zip(*[batch_table.get_column(idx) for idx in range(batch_table.columns_count)]))
+
+
+    def get_rows_window(self, start:int, stop:int):
+        """returns a table response of the table rows in range start to stop, sharing the table decoder.
+        Its conversions (dataframe, polars, arrow) convert only the window rows"""
+        data_table = self.data_table
+        rows = data_table.rows[max(0, start):min(stop, data_table.rows_count)]
+        window_table = KqlResponseTable(data_table.id, {"Columns": data_table.columns, "Rows": rows}, decoder=data_table.decoder, json_codec=data_table.json_codec)
+        window_table.memoize_converted_values = False
+        return self.__class__(window_table, self.extended_properties, **self.options)
+
+
+    def to_arrow(self, options=None, dynamic_to_str=None):
+        """Returns pyarrow Table, built column by column from the table values."""
+
+        options = options or {}
+        pyarrow = Dependencies.get_module("pyarrow")
+        if dynamic_to_str is None:
+            dynamic_to_str = options.get("dynamic_to_dataframe") == "str"
+        arrays = [self._to_arrow_array(pyarrow, idx, dynamic_to_str) for idx in range(self.data_table.columns_count)]
+        return pyarrow.Table.from_arrays(arrays, names=list(self.data_table.columns_name))
+
+
+    # range of timestamp[ns] values
+    _MIN_NS_DATETIME = datetime(1677, 9, 22, tzinfo=timezone.utc)
+    _MAX_NS_DATETIME = datetime(2262, 4, 11, tzinfo=timezone.utc)
+
+    def _to_arrow_array(self, pyarrow, idx, dynamic_to_str):
+        data_table = self.data_table
+        col_type = data_table.columns_type[idx].lower()
+        arrow_type = self._get_arrow_type(pyarrow, col_type)
+
+        if col_type == "datetime":
+            raw_values = data_table.get_raw_column(idx)
+            try:
+                # vectorized iso8601 parsing
+                return pyarrow.array(raw_values, type=pyarrow.large_string()).cast(arrow_type)
+            except pyarrow.ArrowException:
+                # values without zone, invalid or out of timestamp[ns] range
+                values = [self._to_ns_datetime(data_table.decoder, value) for value in raw_values]
+                return pyarrow.array(values, type=pyarrow.int64()).cast(arrow_type)
+
+        elif col_type == "timespan":
+            # parsed straight to nanoseconds, ticks are kept
+            raw_values = data_table.get_raw_column(idx)
+            pandas = Dependencies.get_module("pandas", dont_throw=True)
+            ns_series = self._to_timespan_ns_series(pandas, raw_values) if pandas is not None else None
+            if ns_series is not None:
+                return pyarrow.array(ns_series, type=pyarrow.int64(), from_pandas=True).cast(arrow_type)
+            return pyarrow.array(self._to_timespan_ns_list(data_table.decoder, raw_values), type=pyarrow.int64()).cast(arrow_type)
+
+        elif col_type == "decimal":
+            try:
+                # decimal128 precision and scale are inferred from values
+                return pyarrow.array(data_table.get_column(idx))
+            except pyarrow.ArrowException:
+                # more than 38 digits
+                return pyarrow.array([self._dynamic_to_str(value) for value in data_table.get_raw_column(idx)], type=pyarrow.large_string())
+
+        elif col_type == "dynamic":
+            if not dynamic_to_str:
+                try:
+                    # objects to struct, arrays to list
+                    return pyarrow.array(data_table.get_column(idx))
+                except pyarrow.ArrowException:
+                    # mixed types, kept as json strings
+                    pass
+            codec = self.options.get("json_codec")
+            values = [value if value is None or isinstance(value, str) else json_dumps(value, codec=codec) for value in data_table.get_raw_column(idx)]
+            return pyarrow.array(values, type=pyarrow.large_string())
+
+        values = data_table.get_raw_column(idx)
+        if arrow_type is None:
+            return pyarrow.array(values)
+        try:
+            return pyarrow.array(values, type=arrow_type)
+        except pyarrow.ArrowException:
+            if pyarrow.types.is_floating(arrow_type):
+                # 'NaN', 'Infinity' and '-Infinity' are returned as strings
+                return pyarrow.array([float(value) if isinstance(value, str) else value for value in values], type=arrow_type)
+            return pyarrow.array(values)
+
+
+    # kql timespan '[-][d.]hh:mm:ss[.fffffff]'
+    _TIMESPAN_PATTERN = r"^(?P<sign>-)?(?:(?P<d>[0-9]{1,9})\.)?(?P<h>[0-9]{2}):(?P<m>[0-9]{2}):(?P<s>[0-9]{2})(?:\.(?P<f>[0-9]{1,9}))?$"
+
+    # timespans of up to this number of hours (and minutes and seconds), fit in int64 nanoseconds
+    _MAX_INT64_TIMESPAN_HOURS = 2562046
+
+    @classmethod
+    def _to_timespan_ns_series(cls, pandas, raw_values):
+        """vectorized conversion of kql timespan strings to nanoseconds, returns a nullable Int64 series.
+        Returns None if any value is not in kql timespan format (e.g. ticks), or is out of int64 range"""
+        series = pandas.Series(raw_values, dtype="string")
+        notna = series.notna()
+        parts = series.str.extract(cls._TIMESPAN_PATTERN)
+        if (parts["s"].notna() != notna).any():
+            return None
+        hours = parts["d"].fillna("0").astype("int64") * 24 + parts["h"].fillna("0").astype("int64")
+        if (hours > cls._MAX_INT64_TIMESPAN_HOURS).any():
+            return None
+        seconds = (hours * 60 + parts["m"].fillna("0").astype("int64")) * 60 + parts["s"].fillna("0").astype("int64")
+        ns = seconds * 1000000000 + parts["f"].fillna("").str.pad(9, side="right", fillchar="0").astype("int64")
+        ns = ns.where(parts["sign"].isna(), -ns)
+        return ns.astype("Int64").mask(~notna)
+
+
+    @classmethod
+    def _to_timespan_ns_polars_series(cls, polars, col_name, raw_values):
+        "same as _to_timespan_ns_series, returns a polars Int64 series, or None"
+        try:
+            series = polars.Series(col_name, raw_values, dtype=polars.String)
+        except: # pylint: disable=bare-except
+            # not string values
+            return None
+        parts = series.str.extract_groups(cls._TIMESPAN_PATTERN).struct.unnest()
+        if (parts["s"].is_null() != series.is_null()).any():
+            return None
+        to_int = lambda name: parts[name].fill_null("0").cast(polars.Int64)
+        hours = to_int("d") * 24 + to_int("h")
+        if (hours > cls._MAX_INT64_TIMESPAN_HOURS).any():
+            return None
+        seconds = (hours * 60 + to_int("m")) * 60 + to_int("s")
+        ns = seconds * 1000000000 + parts["f"].fill_null("").str.pad_end(9, "0").cast(polars.Int64)
+        ns = polars.select(
+            polars.when(series.is_null()).then(None).when(parts["sign"].is_null()).then(ns).otherwise(-ns).alias(col_name)
+        ).to_series()
+        return ns
+
+
+    @classmethod
+    def _to_timespan_ns_list(cls, decoder, raw_values):
+        "converts values one by one by the table decoder, memoized, None if out of int64 range"
+        decode_timespan_ns = decoder.decode_timespan_ns
+        return [cls._to_int64(decode_timespan_ns(value)) for value in raw_values]
+
+
+    _EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+    # fraction digits beyond microseconds
+    _SUB_MICROSECONDS_PATTERN = re.compile(r"\.[0-9]{6}([0-9]{1,3})")
+
+    _MIN_INT64 = -(2 ** 63)
+    _MAX_INT64 = 2 ** 63 - 1
+
+    @classmethod
+    def _to_ns_datetime(cls, decoder, value):
+        "returns nanoseconds since epoch, at full precision, None if the value is invalid or out of timestamp[ns] range"
+        if value is None:
+            return None
+        try:
+            decoded = decoder.decode_datetime(value)
+        except (ValueError, OverflowError):
+            return None
+        if decoded.tzinfo is None:
+            decoded = decoded.replace(tzinfo=timezone.utc)
+        if not cls._MIN_NS_DATETIME <= decoded <= cls._MAX_NS_DATETIME:
+            return None
+        ns = (decoded - cls._EPOCH) // timedelta(microseconds=1) * 1000
+        if isinstance(value, str):
+            # decoded datetime is truncated to microseconds, fraction digits beyond are added
+            match = cls._SUB_MICROSECONDS_PATTERN.search(value)
+            if match is not None:
+                ns += int(match.group(1).ljust(3, "0"))
+        return ns
+
+
+    @classmethod
+    def _to_int64(cls, value):
+        "returns None if the value is out of int64 range"
+        return value if value is None or cls._MIN_INT64 <= value <= cls._MAX_INT64 else None
+
+
+    @staticmethod
+    def _get_arrow_type(pyarrow, col_type):
+        return {
+            "bool": pyarrow.bool_(),
+            "uint8": pyarrow.int64(),
+            "int16": pyarrow.int64(),
+            "uint16": pyarrow.int64(),
+            "int": pyarrow.int64(),
+            "uint": pyarrow.int64(),
+            "long": pyarrow.int64(),
+            "ulong": pyarrow.int64(),
+            "float": pyarrow.float64(),
+            "real": pyarrow.float64(),
+            "string": pyarrow.large_string(),
+            "datetime": pyarrow.timestamp("ns", tz="UTC"),
+            "guid": pyarrow.large_string(),
+            "timespan": pyarrow.duration("ns"),
+            # Support V1
+            "int32": pyarrow.int32(),
+            "int64": pyarrow.int64(),
+            "double": pyarrow.float64(),
+        }.get(col_type)
+
+
+    def to_polars(self, options=None):
+        """Returns Polars data frame.
+        If pyarrow is installed, it is built from the arrow table, otherwise from the table columns"""
+
+        options = options or {}
+        polars = Dependencies.get_module("polars")
+        pyarrow = Dependencies.get_module("pyarrow", dont_throw=True)
+        if pyarrow is not None:
+            try:
+                return polars.from_arrow(self.to_arrow(options=options))
+            except pyarrow.ArrowException as e:
+                logger().debug(f"KqlTableResponse::to_polars - failed to convert via arrow, fallback to columns: {e}")
+
+        dynamic_to_str = options.get("dynamic_to_dataframe") == "str"
+        return polars.DataFrame([self._to_polars_series(polars, idx, dynamic_to_str) for idx in range(self.data_table.columns_count)])
+
+
+    def _to_polars_series(self, polars, idx, dynamic_to_str):
+        data_table = self.data_table
+        col_name = data_table.columns_name[idx]
+        col_type = data_table.columns_type[idx].lower()
+
+        if col_type == "datetime":
+            values = [self._to_ns_datetime(data_table.decoder, value) for value in data_table.get_raw_column(idx)]
+            return polars.Series(col_name, values, dtype=polars.Int64).cast(polars.Datetime("ns", "UTC"))
+
+        elif col_type == "timespan":
+            # parsed straight to nanoseconds, ticks are kept
+            raw_values = data_table.get_raw_column(idx)
+            ns_series = self._to_timespan_ns_polars_series(polars, col_name, raw_values)
+            if ns_series is None:
+                ns_series = polars.Series(col_name, self._to_timespan_ns_list(data_table.decoder, raw_values), dtype=polars.Int64)
+            return ns_series.cast(polars.Duration("ns"))
+
+        elif col_type == "dynamic":
+            codec = self.options.get("json_codec")
+            values = [value if value is None or isinstance(value, str) else json_dumps(value, codec=codec) for value in data_table.get_raw_column(idx)]
+            series = polars.Series(col_name, values, dtype=polars.String)
+            if not dynamic_to_str:
+                try:
+                    # objects to struct, arrays to list, schema is inferred from all values
+                    series = series.str.json_decode(infer_schema_length=None)
+                except: # pylint: disable=bare-except
+                    # mixed types, kept as json strings
+                    pass
+            return series
+
+        values = data_table.get_column(idx)
+        if col_type in ["real", "float", "double"]:
+            # 'NaN', 'Infinity' and '-Infinity' are returned as strings
+            values = [float(value) if isinstance(value, str) else value for value in values]
+        try:
+            return polars.Series(col_name, values)
+        except: # pylint: disable=bare-except
+            return polars.Series(col_name, values, dtype=polars.Object)
+
+
+    def to_dataframe(self, raise_errors=True, options=None, types_mapper=None):
+        """Returns Pandas data frame.
+        If pyarrow is installed, it is built from the arrow table, types_mapper is passed to pyarrow.Table.to_pandas()"""
+
         options = options or {}
         pandas = Dependencies.get_module("pandas")
+        pyarrow = Dependencies.get_module("pyarrow", dont_throw=True)
+        if pyarrow is not None:
+            try:
+                return self._to_dataframe_from_arrow(pyarrow, options, types_mapper)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError, OverflowError, ValueError) as e:
+                # conversion error (e.g. ulong above int64, invalid or mixed type values), rows conversion is done as before, other errors are raised
+                logger().debug(f"KqlTableResponse::to_dataframe - failed to convert via arrow, fallback to rows: {e}")
+
+        return self._to_dataframe_from_rows(pandas, raise_errors, options)
+
+
+    def _to_dataframe_from_arrow(self, pyarrow, options, types_mapper):
+        # dynamic columns are converted later, same as from rows
+        table = self.to_arrow(options=options, dynamic_to_str=True)
+        for (idx, arrow_type) in enumerate(table.schema.types):
+            # same as from rows, decimal to float64
+            if pyarrow.types.is_decimal(arrow_type):
+                table = table.set_column(idx, table.schema.names[idx], table.column(idx).cast(pyarrow.float64()))
+
+        frame = table.to_pandas(types_mapper=types_mapper)
+
+        for (idx, col_name) in enumerate(self.data_table.columns_name):
+            col_type = self.data_table.columns_type[idx].lower()
+            if col_type == "dynamic":
+                if options.get("dynamic_to_dataframe") == "str":
+                    frame[col_name] = [self._dynamic_to_str(value) for value in self.data_table.get_raw_column(idx)]
+                else:
+                    # memoized by the table, if already converted
+                    frame[col_name] = self.data_table.get_column(idx)
+            elif col_type != "string" and types_mapper is None and self.KQL_TO_DATAFRAME_DATA_TYPES.get(col_type) == "object" and frame[col_name].dtype != object:
+                # same dtype as from rows (e.g. guid), string dtype is inferred by pandas, same as from rows
+                frame[col_name] = frame[col_name].astype(object)
+        return frame
 
+
+    def _to_dataframe_from_rows(self, pandas, raise_errors, options):
         if self.data_table.columns_count == 0 or self.data_table.rows_count == 0:
             # return pandas.DataFrame()
             pass
@@ -197,14 +587,17 @@ class KqlTableResponse(object):
             col_type = self.data_table.columns_type[idx].lower()
 
             if col_type == "timespan":
-                frame[col_name] = pandas.to_timedelta(
-                    frame[col_name].apply(lambda t: t.replace(".", " days ") if type(t) is str and "." in t.split(":")[0] else t)
-                )
+                # parsed straight to nanoseconds, ticks and sign of negative days are kept
+                # (pandas parses '-d.hh:mm:ss' as -d days plus hh:mm:ss, and mixed fraction lengths inaccurately)
+                raw_values = self.data_table.get_raw_column(idx) if len(frame) == self.data_table.rows_count else [None if pandas.isna(value) else value for value in frame[col_name]]
+                ns_series = self._to_timespan_ns_series(pandas, raw_values)
+                if ns_series is None:
+                    ns_series = pandas.Series(self._to_timespan_ns_list(self.data_table.decoder, raw_values), dtype=object)
+                ns_series.index = frame.index
+                frame[col_name] = pandas.to_timedelta(ns_series, unit="ns")
 
             elif col_type == "datetime":
-                frame[col_name] = pandas.to_datetime(
-                    frame[col_name].apply(lambda d: d if self._is_valid_datetime(d) else None)
-                )
+                frame[col_name] = self._to_datetime_series(pandas, frame[col_name])
 
             elif col_type == "string":
                 # frame[col_name] = frame[col_name].apply(lambda x: json_dumps(x) if type(x) == str else x)
@@ -213,6 +606,9 @@ class KqlTableResponse(object):
             elif col_type == "dynamic":
                 if options.get("dynamic_to_dataframe") == "str":
                     frame[col_name] = frame[col_name].apply(lambda x: self._dynamic_to_str(x))
+                elif len(frame) == self.data_table.rows_count:
+                    # memoized by the table, if already converted
+                    frame[col_name] = self.data_table.get_column(idx)
                 else:
                     frame[col_name] = frame[col_name].apply(lambda x: self._dynamic_to_object(x))
 
@@ -220,35 +616,35 @@ class KqlTableResponse(object):
                 pandas_type = self.KQL_TO_DATAFRAME_DATA_TYPES[col_type]
                 # NA type promotion
                 if pandas_type == "int64" or pandas_type == "int32":
-                    for i in range(0, len(frame[col_name])):
-                        if frame[col_name][i] is None or str(frame[col_name][i]) == "nan":
-                            pandas_type = "float64"
-                            break
+                    if frame[col_name].isna().any():
+                        pandas_type = "float64"
                 elif pandas_type == "bool":
-                    for i in range(0, len(frame[col_name])):
-                        if frame[col_name][i] is None or str(frame[col_name][i]) == "nan":
-                            pandas_type = "object"
-                            break
+                    if frame[col_name].isna().any():
+                        pandas_type = "object"
                 frame[col_name] = frame[col_name].astype(pandas_type, errors="raise" if raise_errors else "ignore")
         return frame
 
 
-    def _is_valid_datetime(self, d:str)->bool:
-        # max diff in seconds from 9223372036 from 1970-01-01T00:00:00Z
-        MAX_DIFF_FROM_EPOCH_IN_SECS = 9223372036  # 2**63/1000000000
-        START_EPOCH_DATETIME = dateutil.parser.isoparse('1970-01-01T00:00:00Z')
-        try:
-            d = dateutil.parser.isoparse(d) if type(d) == str else d
-            return isinstance(d, datetime) and abs((d - START_EPOCH_DATETIME).total_seconds()) < MAX_DIFF_FROM_EPOCH_IN_SECS
+    _is_pandas_iso8601_format_supported = None
 
-        except: # pylint: disable=bare-except
-            return False
+    @classmethod
+    def _to_datetime_series(cls, pandas, series):
+        "vectorized conversion of iso8601 strings, invalid and out of bounds values are converted to NaT"
+        if cls._is_pandas_iso8601_format_supported is None:
+            try:
+                cls._is_pandas_iso8601_format_supported = int(pandas.__version__.split(".")[0]) >= 2
+            except: # pylint: disable=bare-except
+                cls._is_pandas_iso8601_format_supported = False
+        if cls._is_pandas_iso8601_format_supported:
+            return pandas.to_datetime(series, errors="coerce", format="ISO8601")
+        else:
+            # older versions infer the iso8601 fast path
+            return pandas.to_datetime(series, errors="coerce")
 
 
-    @staticmethod
-    def _dynamic_to_object(value):
+    def _dynamic_to_object(self, value):
         try:
-            return json.loads(value) if value and isinstance(value, str) else value
+            return json_loads(value, codec=self.options.get("json_codec")) if value and isinstance(value, str) else value
         except Exception:
             return value
 
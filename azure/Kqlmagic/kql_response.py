@@ -4,17 +4,15 @@
 # license information.
 # --------------------------------------------------------------------------
 
-from datetime import timedelta
-import re
-import json
+from typing import Dict, Iterator, List, Tuple
 from decimal import Decimal
 import collections
 
 
-import dateutil.parser
-
-
 from .constants import ExtendedPropertiesKeys
+from .my_utils import json_loads, json_dumps, get_deep_size
+from .kql_decoders import KqlValueDecoder
+from .kql_frames_parser import KqlFramesParser, FrameEvent
 
 
 try:
@@ -24,41 +22,64 @@ except AttributeError:
 
 
 
-# Regex for TimeSpan
-_TIMESPAN_PATTERN = re.compile(r"(-?)((?P<d>[0-9]*).)?(?P<h>[0-9]{2}):(?P<m>[0-9]{2}):(?P<s>[0-9]{2}(\.[0-9]+)?$)")
+class KqlResult(collectionsAbc.Mapping):
+    """ Row view over a KqlResponseTable, enables both index and key access to rows in result.
+    Values are converted on access, and memoized by the table, the row itself holds no values """
 
+    __slots__ = ("_table", "_row_index", "_column_indexes")
 
-class KqlResult(dict):
-    """ Simple wrapper around dictionary, to enable both index and key access to rows in result """
+    def __init__(self, table, row_index:int, column_indexes:list=None):
+        self._table = table
+        self._row_index = row_index
+        # None - all table columns
+        self._column_indexes = column_indexes
 
-    def __init__(self, index2column_mapping, *args, **kwargs):
-        super(KqlResult, self).__init__(*args)
-        # TODO: this is not optimal, if client will not access all fields.
-        # In that case, we are having unnecessary perf hit to convert Timestamp, even if client don't use it.
-        # In this case, it would be better for KqlResult to extend list class. In this case,
-        # KqlResultIter.index2column_mapping should be reversed, e.g. column2index_mapping.
-        self.index2column_mapping = index2column_mapping
+
+    @property
+    def index2column_mapping(self):
+        if self._column_indexes is None:
+            return self._table.index2column_mapping
+        return [self._table.index2column_mapping[idx] for idx in self._column_indexes]
 
 
     def __getitem__(self, key):
         if isinstance(key, slice):
-            start = min(key.start or 0, len(self))
-            end = min(key.stop or len(self), len(self))
-            mapping = self.index2column_mapping[start:end]
-            dic = dict([(c, dict.__getitem__(self, c)) for c in mapping])
-            return KqlResult(mapping, dic)
+            column_indexes = self._column_indexes if self._column_indexes is not None else range(self._table.columns_count)
+            return KqlResult(self._table, self._row_index, list(column_indexes[key]))
         elif isinstance(key, int):
-            val = dict.__getitem__(self, self.index2column_mapping[key])
+            col_index = key if self._column_indexes is None else self._column_indexes[key]
         else:
-            val = dict.__getitem__(self, key)
-        return val
+            col_index = self._table.column2index_mapping[key]
+            if self._column_indexes is not None and col_index not in self._column_indexes:
+                raise KeyError(key)
+        return self._table.get_value(self._row_index, col_index)
+
+
+    def __iter__(self):
+        return iter(self.index2column_mapping)
+
+
+    def __len__(self):
+        return self._table.columns_count if self._column_indexes is None else len(self._column_indexes)
+
+
+    def __repr__(self):
+        return dict(self).__repr__()
+
+
+# marks a cell that was not converted yet
+_NOT_CONVERTED = object()
 
 
 class KqlResponseTable(collectionsAbc.Iterator):
-    """ Iterator over returned rows """
+    """ Iterator over returned rows.
+    Rows are kept as returned, as a list of raw values per row. Converter of each column is selected once from the schema,
+    and cells are converted on first access, and memoized per column """
 
-    def __init__(self, id, response_table):
+    def __init__(self, id, response_table, decoder:KqlValueDecoder=None, json_codec:str=None):
         self.id = id
+        # codec of dynamic values
+        self.json_codec = json_codec
         self.rows = response_table["Rows"]
         self.columns = response_table["Columns"]
         self.index2column_mapping = []
@@ -67,23 +88,96 @@ class KqlResponseTable(collectionsAbc.Iterator):
             self.index2column_mapping.append(c["ColumnName"])
             ctype = c["ColumnType"] if "ColumnType" in c else c["DataType"]
             self.index2type_mapping.append(ctype)
+        self.column2index_mapping = {name: idx for idx, name in enumerate(self.index2column_mapping)}
         self.row_index = 0
         self._rows_count = sum([1 for r in self.rows if isinstance(r,list)])  # len(self.rows)
         # Here we keep converter functions for each type that we need to take special care (e.g. convert)
 
+        # shared by row and dataframe conversions of the table, memoizes repeated values
+        self.decoder = decoder or KqlValueDecoder()
+
         # index MUST be lowercase !!!
         self.converters_lambda_mappings = {
-            "datetime": self.to_datetime,
-            "timespan": self.to_timedelta,
+            "datetime": self.decoder.decode_datetime,
+            "timespan": self.decoder.decode_timespan,
             "decimal": self.to_decimal,
             "dynamic": self.to_object,
         }
+        # per column converter, None if column values are not converted
+        self._converters = [self._get_column_converter(idx) for idx in range(self.columns_count)]
+        # per column memoized converted values, created on first access to column
+        self._converted_columns = [None] * self.columns_count
+        # if False, converted values are not memoized (memory budget mode)
+        self.memoize_converted_values = True
+
+
+    def _get_column_converter(self, col_index:int):
+        data_type = self.index2type_mapping[col_index].lower()
+        if data_type in self.converters_lambda_mappings:
+            return self.converters_lambda_mappings[data_type]
+        elif self.rows_count == 1 and self.columns_count == 1 and self.index2column_mapping[col_index] == "DatabaseSchema" and data_type == "string":
+            return self.to_object
+        return None
+
+
+    def get_column_converter(self, col_index:int):
+        "returns converter of the column values, None if the column values are not converted"
+        return self._converters[col_index]
+
+
+    def get_value(self, row_index:int, col_index:int):
+        "returns converted value of a cell"
+        converter = self._converters[col_index]
+        if converter is None:
+            return self.rows[row_index][col_index]
+        if not self.memoize_converted_values:
+            return converter(self.rows[row_index][col_index])
+        column = self._converted_columns[col_index]
+        if column is None:
+            column = self._converted_columns[col_index] = [_NOT_CONVERTED] * self._rows_count
+        value = column[row_index]
+        if value is _NOT_CONVERTED:
+            value = column[row_index] = converter(self.rows[row_index][col_index])
+        return value
+
+
+    def get_column(self, col_index:int)->list:
+        "returns converted values of a column"
+        rows = self.rows
+        converter = self._converters[col_index]
+        if converter is None:
+            return self.get_raw_column(col_index)
+        if not self.memoize_converted_values:
+            return [converter(rows[row_index][col_index]) for row_index in range(self._rows_count)]
+        column = self._converted_columns[col_index]
+        if column is None:
+            column = self._converted_columns[col_index] = [converter(rows[row_index][col_index]) for row_index in range(self._rows_count)]
+        elif _NOT_CONVERTED in column:
+            for row_index, value in enumerate(column):
+                if value is _NOT_CONVERTED:
+                    column[row_index] = converter(rows[row_index][col_index])
+        return column
+
+
+    def get_memory_usage(self, seen:set=None)->Dict[str,int]:
+        "returns approximate memory, in bytes, held by the table rows, memoized converted values, and decoder memo"
+        seen = set() if seen is None else seen
+        return {
+            "rows": get_deep_size(self.rows, seen),
+            "converted_values": get_deep_size(self._converted_columns, seen),
+            "decoder_memo": get_deep_size(self.decoder._datetime_memo, seen) + get_deep_size(self.decoder._timespan_memo, seen),
+        }
 
 
-    @staticmethod
-    def to_object(value):
+    def get_raw_column(self, col_index:int)->list:
+        "returns values of a column, as returned"
+        rows = self.rows
+        return [rows[row_index][col_index] for row_index in range(self._rows_count)]
+
+
+    def to_object(self, value):
         try:
-            return json.loads(value) if value and isinstance(value, str) else value
+            return json_loads(value, codec=self.json_codec) if value and isinstance(value, str) else value
         except Exception:
             return value
 
@@ -91,13 +185,7 @@ class KqlResponseTable(collectionsAbc.Iterator):
     @staticmethod
     def to_datetime(value):
         """Converts a string/int to a datetime."""
-        if value is None:
-            return None
-
-        if isinstance(value, int):
-            return dateutil.parser.parse(str(value))
-
-        return dateutil.parser.isoparse(value)
+        return KqlValueDecoder.parse_datetime(value)
 
 
     @staticmethod
@@ -113,24 +201,7 @@ class KqlResponseTable(collectionsAbc.Iterator):
     @staticmethod
     def to_timedelta(value):
         """Converts a string/int/float to a timedelta."""
-        if value is None:
-            return None
-
-        if isinstance(value, (int, float)):
-            return timedelta(microseconds=(float(value) / 10))
-
-        match = _TIMESPAN_PATTERN.match(value)
-
-        if match:
-            if match.group(1) == "-":
-                factor = -1
-            else:
-                factor = 1
-            return factor * timedelta(
-                days=int(match.group("d") or 0), hours=int(match.group("h")), minutes=int(match.group("m")), seconds=float(match.group("s"))
-            )
-        else:
-            raise ValueError(f"Timespan value '{value}' cannot be decoded")
+        return KqlValueDecoder.parse_timespan(value)
 
 
     def __iter__(self):
@@ -141,18 +212,9 @@ class KqlResponseTable(collectionsAbc.Iterator):
     def __next__(self):
         if self.row_index >= self.rows_count:
             raise StopIteration
-        row = self.rows[self.row_index]
-        result_dict = {}
-        for index, value in enumerate(row):
-            data_type = self.index2type_mapping[index].lower()
-            column_name = self.index2column_mapping[index]
-            if data_type in self.converters_lambda_mappings:
-                value = self.converters_lambda_mappings[data_type](value)
-            elif self.rows_count == 1 and self.columns_count == 1 and column_name == "DatabaseSchema" and data_type == "string":
-                value = self.to_object(value)
-            result_dict[column_name] = value
+        row = KqlResult(self, self.row_index)
         self.row_index = self.row_index + 1
-        return KqlResult(self.index2column_mapping, result_dict)
+        return row
 
 
     @property
@@ -195,6 +257,9 @@ class KqlSchemaResponse(object):
     def __init__(self, json_response):
         self.json_response = json_response
         self.table = json_response["tables"]
+        # set by the client, if the request was executed with retries
+        self.retry_info:dict = None
+        self.query_info:dict = None
 
 
     def has_exceptions(self):
@@ -210,31 +275,64 @@ class KqlQueryResponse(object):
 
     # TODO: add support to get additional infromation from response, like execution time
 
-    def __init__(self, json_response, endpoint_version="v1"):
+    def __init__(self, json_response, endpoint_version="v1", json_codec:str=None):
+        """json_response is a v1 response, or v2 frames, a list or an iterator of frames (see KqlFramesParser.iter_parse).
+        Frames of an iterator are stored as they are parsed. json_codec decodes dynamic values"""
         self.json_response = json_response
-        self.endpoint_version = "v1" if not isinstance(self.json_response, list) else endpoint_version
+        self.json_codec = json_codec
+        self.endpoint_version = "v1" if isinstance(self.json_response, dict) else endpoint_version
         self.visualization = None
         self._extended_properties = None
+        self._completion_query_info = None
+        self._completion_query_resource_consumption = None
+        # set by the client, if the request was executed with retries
+        self.retry_info:dict = None
+        self.query_info:dict = None
+
+        # secondary tables by name, each entry a (table, kind) tuple, columns of a table are mapped only if the table is read
+        self._tables_by_name:Dict[str,List[Tuple[dict,str]]] = {}
 
         if self.endpoint_version == "v2":
-            self.all_tables = [t for t in json_response if t["FrameType"] == "DataTable"]
-            self.tables = [t for t in json_response if t["FrameType"] == "DataTable" and t["TableKind"] == "PrimaryResult"]
-            self.primary_results = [KqlResponseTable(t["TableId"], t) for t in self.tables]
-            self.dataSetCompletion = [f for f in json_response if f["FrameType"] == "DataSetCompletion"]
+            self.json_response = []
+            self.all_tables = []
+            self.tables = []
+            self.primary_results = []
+            self.dataSetCompletion = []
+            # single pass over the frames, as they are parsed
+            for frame in json_response:
+                self.json_response.append(frame)
+                frame_type = frame["FrameType"]
+                if frame_type == "DataTable":
+                    self.all_tables.append(frame)
+                    if frame["TableKind"] == "PrimaryResult":
+                        self.tables.append(frame)
+                        self.primary_results.append(KqlResponseTable(frame["TableId"], frame, json_codec=json_codec))
+                    else:
+                        self._add_to_tables_index(frame["TableName"], frame["TableKind"], frame)
+                elif frame_type == "DataSetCompletion":
+                    self.dataSetCompletion.append(frame)
         else:
             self.all_tables = self.json_response["Tables"]
-            tables_num = self.json_response["Tables"].__len__()
-            last_table = self.json_response["Tables"][tables_num - 1]
-            if tables_num < 2:
-                self.tables = []
-            else:
-                self.tables = [self.json_response["Tables"][r[0]] for r in last_table["Rows"] if r[2] == "GenericResult" or r[2] == "PrimaryResult"]
+            tables_num = self.all_tables.__len__()
+            self.tables = []
+            if tables_num > 1:
+                # last table is the table of contents, each row a (ordinal, kind, name, id, pretty name) tuple
+                last_table = self.all_tables[tables_num - 1]
+                for r in last_table["Rows"]:
+                    if r[2] == "GenericResult" or r[2] == "PrimaryResult":
+                        self.tables.append(self.all_tables[r[0]])
+                    else:
+                        self._add_to_tables_index(r[2], r[1], self.all_tables[r[0]])
             if len(self.tables) == 0:
                 self.tables = self.all_tables[:1]
-            self.primary_results = [KqlResponseTable(idx, t) for idx, t in enumerate(self.tables)]
+            self.primary_results = [KqlResponseTable(idx, t, json_codec=json_codec) for idx, t in enumerate(self.tables)]
             self.dataSetCompletion = []
  
 
+    def _add_to_tables_index(self, name:str, kind:str, table:dict)->None:
+        self._tables_by_name.setdefault(name, []).append((table, kind))
+
+
     def _get_endpoint_version(self, json_response):
         try:
             tables_num = json_response["Tables"].__len__()  # pylint: disable=W0612
@@ -248,10 +346,11 @@ class KqlQueryResponse(object):
         if self._extended_properties is None:
             self._extended_properties = {}
             if self.endpoint_version == "v2":
-                for table in self.all_tables:
-                    if table["TableName"] == "@ExtendedProperties" and table["TableKind"] == "QueryProperties":
-                        cols_idx_map = self._map_columns_to_index(table["Columns"])
-                        types = self._get_columns_types(table["Columns"])
+                for table, kind in self._tables_by_name.get("@ExtendedProperties", []):
+                    if kind == "QueryProperties":
+                        columns = table.get("Columns") or []
+                        cols_idx_map = self._map_columns_to_index(columns)
+                        types = self._get_columns_types(columns)
                         key_idx = cols_idx_map.get("Key")
                         table_id_idx = cols_idx_map.get("TableId")
                         value_idx = cols_idx_map.get("Value")
@@ -278,87 +377,74 @@ class KqlQueryResponse(object):
                                 self._extended_properties[table_id] = extended_properties
 
             else:
-                tables_num = self.json_response["Tables"].__len__()
-                if tables_num > 1:
-                    last_table = self.json_response["Tables"][tables_num - 1]
-                    for row in last_table["Rows"]:
-                        if row[2] == "@ExtendedProperties" and row[1] == "QueryProperties":
-                            table = self.json_response["Tables"][row[0]]
-                            table_id = 0
-                            value_idx = 0
-                            extended_properties = {}
-                            for row in table["Rows"]:
-                                value = row[value_idx]
-                                value_obj = self._dynamic_to_object(value)
-                                if type(value_obj) == dict:
-                                    key = list(value_obj.keys())[0]
-                                    if key == ExtendedPropertiesKeys.VISUALIZATION:
-                                        extended_properties[key] = value_obj
-                                    elif key == ExtendedPropertiesKeys.CURSOR:
-                                        extended_properties[key] = str(value_obj.get(ExtendedPropertiesKeys.CURSOR,""))
-                                    else:
-                                        extended_properties[key] = value_obj
-                                    self._extended_properties[table_id] = extended_properties
-                            break
+                for table, kind in self._tables_by_name.get("@ExtendedProperties", []):
+                    if kind == "QueryProperties":
+                        table_id = 0
+                        value_idx = 0
+                        extended_properties = {}
+                        for row in table["Rows"]:
+                            value = row[value_idx]
+                            value_obj = self._dynamic_to_object(value)
+                            if type(value_obj) == dict:
+                                key = list(value_obj.keys())[0]
+                                if key == ExtendedPropertiesKeys.VISUALIZATION:
+                                    extended_properties[key] = value_obj
+                                elif key == ExtendedPropertiesKeys.CURSOR:
+                                    extended_properties[key] = str(value_obj.get(ExtendedPropertiesKeys.CURSOR,""))
+                                else:
+                                    extended_properties[key] = value_obj
+                                self._extended_properties[table_id] = extended_properties
+                        break
         return self._extended_properties
 
 
     @property
     def completion_query_info_results(self):
-        if self.endpoint_version == "v2":
-            for table in self.all_tables:
-                if table["TableName"] == "QueryCompletionInformation":
-                    cols_idx_map = self._map_columns_to_index(table["Columns"])
-                    event_type_name_idx = cols_idx_map.get("EventTypeName")
-                    payload_idx = cols_idx_map.get("Payload")
-                    if event_type_name_idx is not None and payload_idx is not None:
-                        for row in table["Rows"]:
-                            if row[event_type_name_idx] == "QueryInfo":
-                                value = row[payload_idx]
-                                return self._dynamic_to_object(value)
-        else:
-            tables_num = self.json_response["Tables"].__len__()
-            if tables_num > 1:
-                last_table = self.json_response["Tables"][tables_num - 1]
-                for r in last_table["Rows"]:
-                    if r[2] == "QueryStatus":
-                        t = self.json_response["Tables"][r[0]]
-                        for sr in t["Rows"]:
-                            if sr[2] == "Info":
-                                info = {"StatusCode": sr[3], "StatusDescription": sr[4], "Count": sr[5]}
-                                # print(f'Info: {info}')
-                                return info
-        return {}
+        if self._completion_query_info is None:
+            if self.endpoint_version == "v2":
+                self._completion_query_info = self._get_query_completion_payload("QueryInfo")
+            else:
+                self._completion_query_info = {}
+                for sr in self._get_query_status_rows("Info"):
+                    self._completion_query_info = {"StatusCode": sr[3], "StatusDescription": sr[4], "Count": sr[5]}
+                    break
+        return self._completion_query_info
 
 
     @property
     def completion_query_resource_consumption_results(self):
-        if self.endpoint_version == "v2":
-            for table in self.all_tables:
-                if table["TableName"] == "QueryCompletionInformation":
-                    cols_idx_map = self._map_columns_to_index(table["Columns"])
-                    event_type_name_idx = cols_idx_map.get("EventTypeName")
-                    payload_idx = cols_idx_map.get("Payload")
-                    if event_type_name_idx is not None and payload_idx is not None:
-                        for row in table["Rows"]:
-                            if row[event_type_name_idx] == "QueryResourceConsumption":
-                                value = row[payload_idx]
-                                return self._dynamic_to_object(value)
-        else:
-            tables_num = self.json_response["Tables"].__len__()
-            if tables_num > 1:
-                last_table = self.json_response["Tables"][tables_num - 1]
-                for r in last_table["Rows"]:
-                    if r[2] == "QueryStatus":
-                        t = self.json_response["Tables"][r[0]]
-                        for sr in t["Rows"]:
-                            if sr[2] == "Stats":
-                                stats = sr[4]
-                                # print(f'stats: {stats}')
-                                return self._dynamic_to_object(stats)
+        if self._completion_query_resource_consumption is None:
+            if self.endpoint_version == "v2":
+                self._completion_query_resource_consumption = self._get_query_completion_payload("QueryResourceConsumption")
+            else:
+                self._completion_query_resource_consumption = {}
+                for sr in self._get_query_status_rows("Stats"):
+                    self._completion_query_resource_consumption = self._dynamic_to_object(sr[4])
+                    break
+        return self._completion_query_resource_consumption
+
+
+    def _get_query_completion_payload(self, event_type_name:str):
+        "returns payload of first event of event_type_name in the v2 QueryCompletionInformation table"
+        for table, _ in self._tables_by_name.get("QueryCompletionInformation", []):
+            cols_idx_map = self._map_columns_to_index(table.get("Columns") or [])
+            event_type_name_idx = cols_idx_map.get("EventTypeName")
+            payload_idx = cols_idx_map.get("Payload")
+            if event_type_name_idx is not None and payload_idx is not None:
+                for row in table["Rows"]:
+                    if row[event_type_name_idx] == event_type_name:
+                        return self._dynamic_to_object(row[payload_idx])
         return {}
 
 
+    def _get_query_status_rows(self, severity_name:str)->Iterator[list]:
+        "yields rows of severity_name in the v1 QueryStatus table"
+        for table, _ in self._tables_by_name.get("QueryStatus", []):
+            for sr in table["Rows"]:
+                if sr[2] == severity_name:
+                    yield sr
+
+
     @property
     def dataSetCompletion_results(self):
         return self.dataSetCompletion
@@ -374,7 +460,7 @@ class KqlQueryResponse(object):
     def _get_columns_types(self, columns: list):
         map = []
         for col in columns:
-            map.append(col["ColumnType"])
+            map.append(col["ColumnType"] if "ColumnType" in col else col["DataType"])
         return map
 
 
@@ -382,6 +468,13 @@ class KqlQueryResponse(object):
         return self.json_response
 
 
+    def iter_row_batches(self, batch_size:int)->Iterator[Tuple[int,KqlResponseTable,list]]:
+        "yields (primary table index, table, rows) tuples, of batches of rows of the primary result tables"
+        for (idx, table) in enumerate(self.primary_results):
+            for start in range(0, table.rows_count, batch_size):
+                yield (idx, table, table.rows[start:min(start + batch_size, table.rows_count)])
+
+
     def get_table_count(self):
         return len(self.tables)
 
@@ -394,14 +487,99 @@ class KqlQueryResponse(object):
         return self.json_response["Exceptions"]
 
 
-    @staticmethod
-    def _dynamic_to_object(value:str):
+    def _dynamic_to_object(self, value:str):
         try:
-            return json.loads(value) if value and isinstance(value, str) else value if value else None
+            return json_loads(value, codec=self.json_codec) if value and isinstance(value, str) else value if value else None
         except Exception:
             return value
 
 
+class KqlQueryResponseStream(object):
+    """Streamed v2 query response.
+    Rows of the primary result tables are yielded as they are decoded from the response body, and are not kept.
+    Other tables and the DataSetCompletion frame are kept, as they are consumed. The response can be consumed once."""
+
+    def __init__(self, parser:KqlFramesParser, http_response=None, accept_partial_results:bool=False, json_codec:str=None):
+        self._parser = parser
+        self.json_codec = json_codec
+        self._http_response = http_response
+        self.accept_partial_results = accept_partial_results
+        self.endpoint_version = "v2"
+        self.json_response = None
+        # tables, other than primary results, with their rows
+        self.all_tables = []
+        self.dataSetCompletion = []
+        self.is_started = False
+        self.is_consumed = False
+        # set by the client, if the request was executed with retries
+        self.retry_info:dict = None
+        self.query_info:dict = None
+
+
+    def iter_row_batches(self, batch_size:int)->Iterator[Tuple[int,KqlResponseTable,list]]:
+        """yields (primary table index, table, rows) tuples, of batches of rows of the primary result tables.
+        The table has no rows, it describes the schema of the rows. A batch contains rows of a single table"""
+        if self.is_started:
+            raise ValueError("streamed response can be consumed only once")
+        self.is_started = True
+
+        primary_count = 0
+        primary_index = None
+        # primary tables, of progressive responses, by TableId
+        primary_tables = {}
+        table = None
+        value_rows = None
+        batch = []
+        for kind, value in self._parser.events():
+            if kind == FrameEvent.ROW:
+                if table is not None:
+                    batch.append(value)
+                    if len(batch) >= batch_size:
+                        yield (primary_index, table, batch)
+                        batch = []
+                else:
+                    value_rows.append(value)
+
+            elif kind == FrameEvent.ROWS_START:
+                frame_type = value.get("FrameType")
+                if frame_type == "DataTable" and value.get("TableKind") == "PrimaryResult":
+                    primary_index = primary_count
+                    primary_count += 1
+                    table = KqlResponseTable(value.get("TableId"), {**value, "Rows": []}, json_codec=self.json_codec)
+                elif frame_type == "TableFragment" and value.get("TableId") in primary_tables:
+                    if value.get("TableFragmentType") == "DataReplace":
+                        raise ValueError("streamed response can't replace rows that were already yielded, progressive results should not be enabled")
+                    (primary_index, table) = primary_tables[value.get("TableId")]
+                else:
+                    table = None
+                    value_rows = value["Rows"] = []
+                    self.all_tables.append(value)
+
+            else:
+                if batch:
+                    yield (primary_index, table, batch)
+                    batch = []
+                table = None
+                frame_type = value.get("FrameType")
+                if frame_type == "TableHeader" and value.get("TableKind") == "PrimaryResult":
+                    primary_tables[value.get("TableId")] = (primary_count, KqlResponseTable(value.get("TableId"), {**value, "Rows": []}, json_codec=self.json_codec))
+                    primary_count += 1
+                elif frame_type == "DataSetCompletion":
+                    self.dataSetCompletion.append(value)
+
+        self.is_consumed = True
+        if self.has_exceptions() and not self.accept_partial_results:
+            raise KqlError(json_dumps(self.get_exceptions()), self._http_response, self)
+
+
+    def has_exceptions(self):
+        return any(f.get("HasErrors") for f in self.dataSetCompletion)
+
+
+    def get_exceptions(self):
+        return [f.get("OneApiErrors") for f in self.dataSetCompletion if f.get("HasErrors")]
+
+
 class KqlError(Exception):
     """
     Represents error returned from server. Error can contain partial results of the executed query.
@@ -412,6 +590,7 @@ class KqlError(Exception):
         self.message = message
         self.http_response = http_response
         self.kql_response = kql_response
+        self.query_info:dict = None
 
 
     def get_raw_http_response(self):
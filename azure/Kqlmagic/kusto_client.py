@@ -4,19 +4,20 @@
 # license information.
 # --------------------------------------------------------------------------
 
-from typing import Dict
+from typing import Any, Dict, Tuple, Union, Callable
 import re
 import uuid
 import json
 
 
 from .my_aad_helper_msal import _MyAadHelper, ConnKeysKCSB
-from .kql_response import KqlQueryResponse, KqlError
+from .kql_response import KqlQueryResponse, KqlQueryResponseStream, KqlError
+from .kql_frames_parser import KqlFramesParser
 from .constants import Constants, ConnStrKeys, Cloud
 from ._version import __version__
 from .log import logger
 from .exceptions import KqlEngineError
-from .my_utils import json_dumps 
+from .my_utils import json_dumps, run_in_executor
 from .kql_client import KqlClient
 
 
@@ -235,6 +236,69 @@ class KustoClient(KqlClient):
         options["timeout"] : float, optional
             Optional parameter. Network timeout in seconds. Default is no timeout.
         """
+        return self._execute(kusto_database, kusto_query, accept_partial_results=accept_partial_results, **options)
+
+
+    def execute_stream(self, kusto_database:str, kusto_query:str, accept_partial_results:bool=False, **options)->Union[KqlQueryResponse, KqlQueryResponseStream]:
+        """
+        Same as execute, but the rows of the primary result tables of a query are streamed, they are decoded while the returned response is consumed.
+        Only the request is retried. Errors reported by the response are raised at the end of the stream.
+        Management commands are not streamed.
+        """
+        # options include the stream option, set by the -stream flag
+        options.pop("stream", None)
+        return self._execute(kusto_database, kusto_query, accept_partial_results=accept_partial_results, stream=True, **options)
+
+
+    def _execute(self, kusto_database:str, kusto_query:str, accept_partial_results:bool=False, stream:bool=False, **options)->Union[KqlQueryResponse, KqlQueryResponseStream]:
+        def _execute_attempt(client_request_id:str, query_info:dict)->Union[KqlQueryResponse, KqlQueryResponseStream]:
+            authorization = self._aad_helper.acquire_token() if self._aad_helper is not None else None
+            endpoint, endpoint_version, request_headers, request_payload = self._create_request(kusto_database, kusto_query, client_request_id, authorization, query_info, stream=stream, **options)
+
+            # response body is streamed, and parsed incrementally, to avoid holding the raw payload in memory
+            response = self._http_client.post(endpoint, headers=request_headers, json=request_payload, timeout=options.get("timeout"), stream=True)
+            return self._handle_response(response, endpoint_version, accept_partial_results, stream=stream, on_progress=options.get("on_progress"), query_info=query_info, json_codec=options.get("json_codec"))
+
+        client_request_id = self._create_client_request_id(**options)
+        return self._execute_with_retry(_execute_attempt, self._query_endpoint, client_request_id, is_idempotent=self._is_idempotent(kusto_query), **options)
+
+
+    async def execute_async(self, kusto_database:str, kusto_query:str, accept_partial_results:bool=False, **options)->KqlQueryResponse:
+        """ 
+        Execute a simple query or management command, without blocking the event loop.
+        Same as execute, but returns an awaitable.
+        """
+        async def _execute_attempt(client_request_id:str, query_info:dict)->KqlQueryResponse:
+            authorization = await self._aad_helper.acquire_token_async() if self._aad_helper is not None else None
+            endpoint, endpoint_version, request_headers, request_payload = self._create_request(kusto_database, kusto_query, client_request_id, authorization, query_info, **options)
+
+            response = await self._http_client.post_async(endpoint, headers=request_headers, json=request_payload, timeout=options.get("timeout"), stream=True)
+            return await run_in_executor(self._handle_response, response, endpoint_version, accept_partial_results, query_info=query_info, json_codec=options.get("json_codec"))
+
+        client_request_id = self._create_client_request_id(**options)
+        return await self._execute_with_retry_async(_execute_attempt, self._query_endpoint, client_request_id, is_idempotent=self._is_idempotent(kusto_query), **options)
+
+
+    @staticmethod
+    def _is_idempotent(kusto_query:str)->bool:
+        "queries and read-only control commands (.show) can be retried, other control commands might modify state"
+        if not kusto_query.startswith("."):
+            return True
+        command = kusto_query.split(None, 1)[0].lower()
+        return command == ".show"
+
+
+    def _create_client_request_id(self, **options)->str:
+        client_request_id = f"{Constants.MAGIC_CLASS_NAME}.execute"
+        client_request_id_tag = options.get("request_id_tag")
+        if client_request_id_tag is not None:
+            client_request_id = f"{client_request_id};{client_request_id_tag};{str(uuid.uuid4())}/{self._session_guid}/AzureDataExplorer"
+        else:
+            client_request_id = f"{client_request_id};{str(uuid.uuid4())}/{self._session_guid}/AzureDataExplorer"
+        return client_request_id
+
+
+    def _create_request(self, kusto_database:str, kusto_query:str, client_request_id:str, authorization:str=None, query_info:dict=None, **options)->Tuple[str,str,Dict[str,str],Dict[str,str]]:
         if kusto_query.startswith("."):
             endpoint_version = self._MGMT_ENDPOINT_VERSION
             endpoint = self._mgmt_endpoint  
@@ -254,13 +318,6 @@ class KustoClient(KqlClient):
 
         client_version = f"{Constants.MAGIC_CLASS_NAME}.Python.Client:{self._WEB_CLIENT_VERSION}"
 
-        client_request_id = f"{Constants.MAGIC_CLASS_NAME}.execute"
-        client_request_id_tag = options.get("request_id_tag")
-        if client_request_id_tag is not None:
-            client_request_id = f"{client_request_id};{client_request_id_tag};{str(uuid.uuid4())}/{self._session_guid}/AzureDataExplorer"
-        else:
-            client_request_id = f"{client_request_id};{str(uuid.uuid4())}/{self._session_guid}/AzureDataExplorer"
-            
         app = f'{Constants.MAGIC_CLASS_NAME};{options.get("notebook_app")}'
         app_tag = options.get("request_app_tag")
         if app_tag is not None:
@@ -281,6 +338,10 @@ class KustoClient(KqlClient):
                 # MS-TDS/T-SQL Differences between Kusto Microsoft SQL Server: https://docs.microsoft.com/en-us/azure/data-explorer/kusto/api/tds/sqlknownissues
                 query_properties["query_language"] = "sql"
 
+        if options.get("progressive_results") and not options.get("stream") and query_properties.get("results_progressive_enabled") is None:
+            # progressive tables are assembled by the frames parser, streamed responses don't support replaced rows
+            query_properties = {**query_properties, "results_progressive_enabled": True}
+
         cache_max_age = options.get("request_cache_max_age")
         if cache_max_age is not None and cache_max_age > 0:
             query_properties["query_results_cache_max_age"] = query_properties.get("query_results_cache_max_age")\
@@ -306,8 +367,8 @@ class KustoClient(KqlClient):
         user_tag = options.get("request_user_tag")
         if user_tag is not None:
             request_headers["x-ms-user"] = user_tag
-        if self._aad_helper is not None:
-            request_headers["Authorization"] = self._aad_helper.acquire_token()
+        if authorization is not None:
+            request_headers["Authorization"] = authorization
             request_headers["Fed"] = "True"
 
         cache_max_age = options.get("request_cache_max_age")
@@ -330,25 +391,27 @@ class KustoClient(KqlClient):
         logger().debug(f"KustoClient::execute - POST request - url: {endpoint}, headers: {log_request_headers}, payload: {request_payload}, timeout: {options.get('timeout')}")
 
         # collect this information, in case bug report will be generated
-        KqlClient.last_query_info = {
-            "request": {
+        if query_info is not None:
+            query_info["request"] = {
                 "endpoint": endpoint,
                 "headers": log_request_headers,
                 "payload": request_payload,
                 "timeout": options.get("timeout"),
             }
-        }
 
-        response = self._http_client.post(endpoint, headers=request_headers, json=request_payload, timeout=options.get("timeout"))
+        return endpoint, endpoint_version, request_headers, request_payload
 
-        logger().debug(f"KustoClient::execute - response - status: {response.status_code}, headers: {response.headers}, payload: {response.text}")
+
+    def _handle_response(self, response, endpoint_version:str, accept_partial_results:bool=False, stream:bool=False, on_progress:Callable[[dict,Any],None]=None, query_info:dict=None, json_codec:str=None)->Union[KqlQueryResponse, KqlQueryResponseStream]:
+        logger().debug(f"KustoClient::execute - response - status: {response.status_code}, headers: {response.headers}")
 
         # print("response status code: ", response.status_code)
         # print("response", response)
         # print("response text", response.text)
 
         # collect this information, in case bug report will be generated
-        self.last_query_info["response"] = {  # pylint: disable=unsupported-assignment-operation
+        query_info = query_info if query_info is not None else {}
+        query_info["response"] = {
             "status_code": response.status_code
         }
 
@@ -358,10 +421,16 @@ class KustoClient(KqlClient):
             except: # pylint: disable=bare-except
                 parsed_error = response.text
             # collect this information, in case bug report will be generated
-            self.last_query_info["response"]["error"] = parsed_error  # pylint: disable=unsupported-assignment-operation, unsubscriptable-object
+            query_info["response"]["error"] = parsed_error
             raise KqlError(response.text, response)
 
-        kql_response = KqlQueryResponse(response.json(), endpoint_version)
+        parser = KqlFramesParser(response.iter_content(chunk_size=KqlFramesParser.CHUNK_SIZE))
+        if stream and endpoint_version == "v2":
+            # frames are parsed while the stream is consumed, errors are raised at the end of the stream
+            return KqlQueryResponseStream(parser, response, accept_partial_results=accept_partial_results, json_codec=json_codec)
+
+        # frames are stored by the response as they are parsed
+        kql_response = KqlQueryResponse(parser.iter_parse(on_progress=on_progress), endpoint_version, json_codec=json_codec)
 
         if kql_response.has_exceptions() and not accept_partial_results:
             try:
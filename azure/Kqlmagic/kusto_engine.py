@@ -145,6 +145,19 @@ class KustoEngine(KqlEngine):
         query = ".show databases"
         kql_response = self.execute(query, database=self.database_name or "NetDefaultDB", **options)
         table = kql_response.tables[0]
-        databases_by_pretty_name = {row['PrettyName']: row['DatabaseName'] for row in table.fetchall() if row['PrettyName']}
-        database_name_list = [row['DatabaseName'] for row in table.fetchall()]
+        database_name_list = []
+        databases_by_pretty_name = {}
+        for row in table.fetchall():
+            database_name_list.append(row['DatabaseName'])
+            if row['PrettyName']:
+                databases_by_pretty_name[row['PrettyName']] = row['DatabaseName']
         return database_name_list, databases_by_pretty_name
+
+
+    def _get_metadata_cache_key(self)->str:
+        if self.client is None:
+            # database engine, created from cluster engine, shares its cluster metadata
+            cluster_engine:KqlEngine = self._get_cluster_engine()
+            if cluster_engine is not None:
+                return cluster_engine._get_metadata_cache_key()
+        return super(KustoEngine, self)._get_metadata_cache_key()
@@ -9,6 +9,7 @@ import json
 import string
 import random
 import threading
+import atexit
 
 
 from .dependencies import Dependencies
@@ -23,6 +24,19 @@ msal = Dependencies.get_module("msal", dont_throw=True)
 
 if msal:
     class MsalTokenCache(msal.SerializableTokenCache):
+        """Token cache persisted in an encrypted store.
+
+        The store is re-read (decrypted and deserialized) only if its version changed since it was last read or written,
+        and modifications are written behind, batched within WRITE_BEHIND_DELAY_IN_SECS.
+        If the store was modified by another writer while modifications are pending, the store state is merged with
+        the pending modifications, before they are read or written, so the other writer modifications are not lost.
+        """
+
+        WRITE_BEHIND_DELAY_IN_SECS = 1.0
+
+        # caches with modifications that were not written yet, flushed at exit
+        _pending_caches = set()
+        _pending_caches_lock = threading.Lock()
 
         @classmethod
         def get_cache(cls, cache_selector_key: str, **options)-> dict:
@@ -39,6 +53,8 @@ if msal:
 
             self._cache_state = super(MsalTokenCache, self).serialize()
             self._store = store
+            self._store_version = None
+            self._is_dirty = False
             self.deserialize(state=state)
 
 
@@ -48,7 +64,7 @@ if msal:
             logger().debug(f"MsalTokenCache find({args}, {kwargs})")
 
             with self._rlock:
-                self.deserialize()
+                self._deserialize_if_changed()
                 result = super(MsalTokenCache, self).find(*args, **kwargs)
                 return result
 
@@ -59,9 +75,77 @@ if msal:
             logger().debug(f"MsalTokenCache modify({args}, {kwargs})")
 
             with self._rlock:
-                self.deserialize()
+                self._deserialize_if_changed()
                 super(MsalTokenCache, self).modify(*args, **kwargs)
-                self.serialize()
+                self._serialize_behind()
+
+
+        def flush(self)->None:
+            '''writes pending modifications to store'''
+
+            with self._rlock:
+                if self._is_dirty:
+                    self.serialize()
+
+
+        @classmethod
+        def _flush_pending_caches(cls)->None:
+            with cls._pending_caches_lock:
+                caches = list(cls._pending_caches)
+            for cache in caches:
+                try:
+                    cache.flush()
+                except: # pylint: disable=bare-except
+                    logger().debug("MsalTokenCache::_flush_pending_caches - failed to flush token cache")
+
+
+        def _serialize_behind(self)->None:
+            "schedules serialize, modifications within the delay are written together"
+            if not self._is_dirty:
+                self._is_dirty = True
+                with self._pending_caches_lock:
+                    self._pending_caches.add(self)
+                timer = threading.Timer(self.WRITE_BEHIND_DELAY_IN_SECS, self.flush)
+                timer.daemon = True
+                timer.start()
+
+
+        def _deserialize_if_changed(self)->None:
+            "re-reads the store only if it was modified by another process or cache since last read or write"
+            version = self._store.get_version()
+            if version is None or version != self._store_version:
+                if self._is_dirty:
+                    self._merge_store_state()
+                else:
+                    self.deserialize()
+
+
+        def _merge_store_state(self)->None:
+            """merges the store state with the pending modifications (three way, the base is the state last read or written).
+            An entry modified, added or removed since last read or write is taken from memory, any other entry from the store"""
+            version = self._store.get_version()
+            cache_state = self._get_cache_state(self._store.restore())
+            if cache_state is None:
+                return
+            base = json.loads(self._cache_state) if self._cache_state else {}
+            ours = json.loads(super(MsalTokenCache, self).serialize())
+            theirs = json.loads(cache_state)
+            merged = {}
+            for section in set(ours) | set(theirs):
+                base_entries = base.get(section) or {}
+                our_entries = ours.get(section) or {}
+                merged_entries = dict(theirs.get(section) or {})
+                for key in set(base_entries) | set(our_entries):
+                    if our_entries.get(key) != base_entries.get(key):
+                        if key in our_entries:
+                            merged_entries[key] = our_entries[key]
+                        else:
+                            merged_entries.pop(key, None)
+                merged[section] = merged_entries
+            super(MsalTokenCache, self).deserialize(json.dumps(merged))
+            # store state is the new base, pending modifications are still written behind
+            self._cache_state = cache_state
+            self._store_version = version
 
 
         def _random_string(self) -> str:
@@ -72,6 +156,14 @@ if msal:
             '''serialize cache'''
 
             with self._rlock:
+                if self._is_dirty:
+                    version = self._store.get_version()
+                    if version is not None and version != self._store_version:
+                        # store was modified by another writer, since last read or write
+                        self._merge_store_state()
+                    self._is_dirty = False
+                    with self._pending_caches_lock:
+                        self._pending_caches.discard(self)
                 new_cache_state = super(MsalTokenCache, self).serialize()
                 if new_cache_state != self._cache_state:
                     self._cache_state = new_cache_state
@@ -85,6 +177,7 @@ if msal:
                     }
                     state = json_dumps(state_obj)
                     self._store.save(state)
+                    self._store_version = self._store.get_version()
                     return state
 
 
@@ -92,19 +185,35 @@ if msal:
             '''deserialize cache'''
 
             with self._rlock:
-                state = state or self._store.restore()
-                if state:
-                    state_obj = json.loads(state)
-                    if (state_obj.get("description") == "kqlmagic"
-                            and state_obj.get("version") == 2
-                            and state_obj.get("package") == "msal"
-                            and state_obj.get("timestamp") < int(datetime.utcnow().timestamp())
-                            and state_obj.get("random_string")
-                            and len(state_obj.get("random_string")) >= 1 
-                            and len(state_obj.get("random_string")) <= 100 
-                            and state_obj.get("cache_state") is not None):
-                        self._cache_state = state_obj.get("cache_state")
-                        super(MsalTokenCache, self).deserialize(self._cache_state)
+                version = None
+                if not state:
+                    # version is read before state, if state is modified in between, it will be re-read next time
+                    version = self._store.get_version()
+                    state = self._store.restore()
+                cache_state = self._get_cache_state(state)
+                if cache_state is not None:
+                    self._cache_state = cache_state
+                    super(MsalTokenCache, self).deserialize(self._cache_state)
+                    # a rejected state is not stamped, so it is validated again next time
+                    self._store_version = version
+
+
+        @staticmethod
+        def _get_cache_state(state:str)->str:
+            "returns the msal cache state of a stored state, None if the stored state is not valid"
+            if state:
+                state_obj = json.loads(state)
+                if (state_obj.get("description") == "kqlmagic"
+                        and state_obj.get("version") == 2
+                        and state_obj.get("package") == "msal"
+                        and state_obj.get("timestamp") <= int(datetime.utcnow().timestamp())
+                        and state_obj.get("random_string")
+                        and len(state_obj.get("random_string")) >= 1 
+                        and len(state_obj.get("random_string")) <= 100 
+                        and state_obj.get("cache_state") is not None):
+                    return state_obj.get("cache_state")
+
+    atexit.register(MsalTokenCache._flush_pending_caches)
 
 else:
     class MsalTokenCache(object):
@@ -11,6 +11,7 @@ import os
 import sys
 from io import StringIO
 import time
+import threading
 from datetime import timedelta, datetime
 from urllib.parse import urlparse
 # import webbrowser
@@ -267,6 +268,105 @@ global_msal_client_app = {}
 global_msal_client_app_sso = {}
 
 
+class _TokenSlot(object):
+    """In memory slot of the current authorization header of a (resource, client_id, authority), and its expiration time.
+
+    While the token is valid, the header is returned without any token cache lookup.
+    A background timer refreshes the token silently, before it expires, but only if the slot was used since the last refresh.
+    A slot is shared by all helpers of same identity (e.g. each connection and each engine of same cluster), so the token
+    is fetched and refreshed once.
+    """
+
+    # msal acquire_token_silent refreshes tokens that expire within 5 minutes
+    REFRESH_BEFORE_EXPIRY_IN_SECS = 4 * 60
+    # same margin as _validate_and_refresh_token
+    MIN_VALIDITY_IN_SECS = 60
+
+    # shared slots per (resource, client_id, authority, username)
+    _slots = {}
+    _slots_lock = threading.Lock()
+
+
+    @classmethod
+    def get_slot(cls, key:tuple, refresh_callback)->"_TokenSlot":
+        "returns the shared slot of the key, created if not exist"
+        with cls._slots_lock:
+            slot = cls._slots.get(key)
+            if slot is None:
+                slot = cls._slots[key] = _TokenSlot(refresh_callback)
+            return slot
+
+
+    def __init__(self, refresh_callback)->None:
+        self._refresh_callback = refresh_callback
+        self._lock = threading.Lock()
+        # serializes token acquisition and background refresh of all helpers that share the slot
+        self.acquire_lock = threading.RLock()
+        self._header:str = None
+        self._expires_at:float = None
+        self._is_used = False
+        self._timer:threading.Timer = None
+
+
+    def get(self)->str:
+        "returns the authorization header if the token is valid for at least MIN_VALIDITY_IN_SECS, otherwise None"
+        header = self._header
+        expires_at = self._expires_at
+        if header is not None and expires_at is not None and time.time() < expires_at - self.MIN_VALIDITY_IN_SECS:
+            self._is_used = True
+            return header
+        return None
+
+
+    def set(self, header:str, expires_at:float, refresh_callback=None)->None:
+        "sets the authorization header, the background refresh is done by refresh_callback, of the helper that set it"
+        with self._lock:
+            if refresh_callback is not None:
+                self._refresh_callback = refresh_callback
+            is_new_expiration = expires_at != self._expires_at
+            self._header = header if expires_at is not None else None
+            self._expires_at = expires_at
+            self._is_used = False
+            if is_new_expiration:
+                # a token with same expiration is not rescheduled, to avoid refresh loops of tokens that can't be refreshed silently
+                self._schedule_refresh()
+
+
+    def clear(self)->None:
+        with self._lock:
+            self._header = None
+            self._expires_at = None
+            self._cancel_refresh()
+
+
+    def _schedule_refresh(self)->None:
+        self._cancel_refresh()
+        if self._expires_at is None:
+            return
+        delay = self._expires_at - self.REFRESH_BEFORE_EXPIRY_IN_SECS - time.time()
+        if delay > 0:
+            self._timer = threading.Timer(delay, self._on_refresh_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+    def _cancel_refresh(self)->None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+    def _on_refresh_timer(self)->None:
+        self._timer = None
+        if not self._is_used:
+            # idle slot, token will be acquired on next use
+            return
+        try:
+            self._refresh_callback()
+        except: # pylint: disable=bare-except
+            logger().debug("_TokenSlot::_on_refresh_timer - background token refresh failed, token will be acquired on next use")
+
+
 class _MyAadHelper(AadHelper):
 
     def __init__(self, kcsb, default_clientid, msal_client_app=None, msal_client_app_sso=None, http_client=None, **options):
@@ -335,6 +435,11 @@ class _MyAadHelper(AadHelper):
 
         self._client_app_key = self._create_client_app_key()
 
+        # fast path, returns the authorization header while the token is valid, shared by helpers of same identity
+        self._token_slot = _TokenSlot.get_slot((self._resource, self._client_id, self._authority_uri, self._username), self._refresh_token_slot)
+        # serializes the slow path with the background refresh, of all helpers that share the slot
+        self._acquire_token_lock = self._token_slot.acquire_lock
+
         self._set_msal_client_app(msal_client_app=msal_client_app, msal_client_app_sso=msal_client_app_sso)
 
 
@@ -378,6 +483,33 @@ class _MyAadHelper(AadHelper):
 
     def acquire_token(self):
         """Acquire tokens from AAD."""
+        header = self._token_slot.get()
+        if header is not None:
+            return header
+
+        with self._acquire_token_lock:
+            # token might be acquired by other helper of same identity, while waiting
+            header = self._token_slot.get()
+            if header is not None:
+                return header
+            return self._acquire_token()
+
+
+    def _refresh_token_slot(self)->None:
+        "refreshes the token slot silently, called from background timer, never runs an interactive flow"
+        with self._acquire_token_lock:
+            if self._current_token is None:
+                return
+            token = self._validate_and_refresh_token(self._current_token)
+            if token is None:
+                return
+            is_new_token = token is not self._current_token
+            self._current_token = token
+            self._token_slot.set(self._create_authorization_header(), self._get_token_expires_at(token, is_new_token=is_new_token), self._refresh_token_slot)
+            logger().debug(f"_MyAadHelper::_refresh_token_slot - token refreshed in background - scopes: '{self._scopes}', client: '{self._client_id}'")
+
+
+    def _acquire_token(self):
         acquire_token_result = None
         previous_token = self._current_token
         try:
@@ -675,7 +807,9 @@ class _MyAadHelper(AadHelper):
             else:
                 logger().debug(f"_MyAadHelper::acquire_token - valid token exist - scopes: '{self._scopes}', username: '{self._username}', client: '{self._client_id}'")
 
-            return self._create_authorization_header()
+            header = self._create_authorization_header()
+            self._token_slot.set(header, self._get_token_expires_at(self._current_token, is_new_token=self._current_token is not previous_token), self._refresh_token_slot)
+            return header
         except Exception as e:
             kwargs = self._get_authentication_error_kwargs()
             raise AuthenticationError(e, **kwargs)
@@ -750,6 +884,32 @@ class _MyAadHelper(AadHelper):
         return expires_on
 
 
+    def _get_token_expires_at(self, token:dict, is_new_token:bool=False)->float:
+        """returns token expiration time in seconds since the epoch, or None if unknown.
+        expires_in is relative to the token acquisition time, so it is used only for a newly acquired token,
+        a token that is returned unchanged while valid (e.g. MSI, try_token) expires at its absolute expiration time"""
+        try:
+            expires_on = token.get(OAuth2TokenFields.EXPIRES_ON)
+            if expires_on is not None:
+                try:
+                    # seconds from 1970, same as claims exp
+                    return float(expires_on)
+                except (TypeError, ValueError):
+                    pass
+            exp = self._get_token_claims(self._get_token_access_token(token)).get("exp")
+            if exp is not None:
+                return float(exp)
+            expires_on = self._get_token_expires_on(token)
+            if expires_on is not None:
+                return dateutil.parser.parse(expires_on).timestamp()
+            expires_in = token.get(TokenResponseFieldsV2.EXPIRES_IN)
+            if is_new_token and expires_in is not None:
+                return time.time() + float(expires_in)
+        except: # pylint: disable=bare-except
+            pass
+        return None
+
+
     def _get_token_not_before(self, token:dict, default_not_before:str=None)->str:
         not_before = default_not_before
         if token.get(OAuth2TokenFields.NOT_BEFORE) is not None:
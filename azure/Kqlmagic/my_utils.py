@@ -9,11 +9,15 @@
 
 import re
 import os
+import sys
 import ast
 import json
+import asyncio
+import functools
+import collections.abc
 from decimal import Decimal
 import datetime
-from typing import Any, Union, Generator, List, Dict, Tuple
+from typing import Any, Union, Generator, List, Dict, Tuple, Callable
 
 
 from .constants import Constants
@@ -163,6 +167,9 @@ def json_defaults(obj):
         return float(obj)
     elif isinstance(obj, bytes):
         return obj.decode("utf-8")
+    elif isinstance(obj, collections.abc.Mapping):
+        # result row views
+        return dict(obj)
     else:
         error_message = f"unknown type: {type(obj)}, class name: {obj.__class__.__name__}"
         # this print is not for debug
@@ -170,8 +177,102 @@ def json_defaults(obj):
     raise TypeError(error_message)
 
 
-def json_dumps(_dict:Dict[str,Any], **kwargs)->str:
-    return json.dumps(_dict, default=json_defaults, **kwargs)
+class JsonCodec(object):
+    """Json codecs, resolved per call by codec name: orjson, ujson or json (stdlib).
+    'auto' (default) decodes by orjson or ujson if installed, and encodes by json (stdlib), so encoded output is same as json (stdlib).
+    orjson and ujson encode only if selected explicitly (compact output, NaN is encoded as null).
+    Values that a fast codec rejects (e.g. NaN literals, integers above 64 bits) fallback to json (stdlib)."""
+
+    CODEC_NAMES = ["auto", "orjson", "ujson", "json"]
+    DEFAULT_CODEC_NAME = "auto"
+
+    # (name, loads, dumps) of fast codecs, by codec name, loads/dumps are None if json (stdlib) is used.
+    # entries are immutable, so concurrent calls with different codecs don't interfere
+    _codecs:Dict[str,Tuple[str,Callable,Callable]] = {}
+
+
+    @staticmethod
+    def _load_codec(codec_name:str)->Tuple[str,Callable,Callable]:
+        "returns (name, loads, dumps) of the codec, a codec that is not installed resolves to json (stdlib)"
+        names = ["orjson", "ujson"] if codec_name == "auto" else [codec_name]
+        for name in names:
+            if name == "orjson":
+                try:
+                    import orjson
+                    option = orjson.OPT_NON_STR_KEYS
+                    return (name, orjson.loads, lambda obj, sort_keys=False: orjson.dumps(
+                        obj, default=json_defaults, option=option | orjson.OPT_SORT_KEYS if sort_keys else option).decode("utf-8"))
+                except ImportError:
+                    pass
+            elif name == "ujson":
+                try:
+                    import ujson
+                    return (name, ujson.loads, lambda obj, sort_keys=False: ujson.dumps(obj, default=json_defaults, sort_keys=sort_keys, ensure_ascii=False))
+                except (ImportError, TypeError):
+                    pass
+        return ("json", None, None)
+
+
+    @classmethod
+    def get_codec(cls, codec_name:str=None)->Tuple[str,Callable,Callable]:
+        codec_name = codec_name or cls.DEFAULT_CODEC_NAME
+        codec = cls._codecs.get(codec_name)
+        if codec is None:
+            codec = cls._codecs[codec_name] = cls._load_codec(codec_name)
+        return codec
+
+
+    @classmethod
+    def loads(cls, s:Union[str,bytes], codec_name:str=None)->Any:
+        _loads = cls.get_codec(codec_name)[1]
+        if _loads is not None:
+            try:
+                return _loads(s)
+            except (ValueError, OverflowError):
+                pass
+        return json.loads(s)
+
+
+    @classmethod
+    def dumps(cls, obj:Any, codec_name:str=None, **kwargs)->str:
+        "fast codec is used only if selected explicitly, and for compact output, formatting (e.g. indent) is done by json (stdlib)"
+        codec_name = codec_name or cls.DEFAULT_CODEC_NAME
+        if codec_name != "auto" and codec_name != "json" and kwargs.keys() <= {"sort_keys"}:
+            _dumps = cls.get_codec(codec_name)[2]
+            if _dumps is not None:
+                try:
+                    return _dumps(obj, **kwargs)
+                except (TypeError, ValueError, OverflowError):
+                    pass
+        return json.dumps(obj, default=json_defaults, **kwargs)
+
+
+def json_dumps(_dict:Dict[str,Any], codec:str=None, **kwargs)->str:
+    return JsonCodec.dumps(_dict, codec_name=codec, **kwargs)
+
+
+def json_loads(s:Union[str,bytes], codec:str=None)->Any:
+    return JsonCodec.loads(s, codec_name=codec)
+
+
+def get_deep_size(obj:Any, seen:set=None)->int:
+    """returns approximate size, in bytes, of an object and the objects it refers by containers (dict, list, tuple, set).
+    objects which id is in seen are not counted, seen is updated with the counted objects"""
+    seen = set() if seen is None else seen
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            stack.extend(o)
+    return size
 
 
 def timedelta_to_timespan(_timedelta:datetime.timedelta, minimal:bool=None)->str:
@@ -347,3 +448,9 @@ def tokenized_split(string:str, sep:Union[str,List[str]]=None, strip:bool=None,
             collection_depth -= 1
 
     return items
+
+
+async def run_in_executor(func:Callable, *args, **kwargs)->Any:
+    "runs a blocking function in the event loop default executor, and returns its result, without blocking the event loop"
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
@@ -833,9 +833,15 @@ class Parser(object):
         "autolimit": {"flag": "auto_limit", "type": "int", "allow_none": True},
         "dl": {"abbreviation": "displaylimit"},
         "displaylimit": {"flag": "display_limit", "type": "int", "allow_none": True},
+        "tps": {"abbreviation": "tablepagesize"},
+        "tablepagesize": {"flag": "table_page_size", "type": "int"},
         "wait": {"abbreviation": "timeout"},
         "to": {"abbreviation": "timeout"},
         "timeout": {"flag": "timeout", "type": "int", "allow_none": True},
+        "parallel": {"abbreviation": "parallelsections"},
+        "parallelsections": {"flag": "parallel_sections", "type": "bool"},
+        "psmw": {"abbreviation": "parallelsectionsmaxworkers"},
+        "parallelsectionsmaxworkers": {"flag": "parallel_sections_max_workers", "type": "int"},
         "ptst": {"abbreviation": "prettytablestyle"},
         "prettytablestyle": {"flag": "prettytable_style", "type": "str"},
         "var": {"abbreviation": "lastrawresultvar"},
@@ -916,6 +922,20 @@ class Parser(object):
         "maxage": {"abbreviation": "requestcachemaxage"},
         "requestcachemaxage": {"flag": "request_cache_max_age", "type": "int", "allow_none": True},
 
+        "retries": {"abbreviation": "requestmaxretries"},
+        "requestmaxretries": {"flag": "request_max_retries", "type": "int"},
+
+        "retrymaxdelay": {"abbreviation": "requestretrymaxdelay"},
+        "requestretrymaxdelay": {"flag": "request_retry_max_delay", "type": "int"},
+
+        "jsoncodec": {"flag": "json_codec", "type": "str"},
+
+        "cmcttl": {"abbreviation": "clustermetadatacachettl"},
+        "clustermetadatacachettl": {"flag": "cluster_metadata_cache_ttl", "type": "int"},
+
+        "cmcpersist": {"abbreviation": "clustermetadatacachepersist"},
+        "clustermetadatacachepersist": {"flag": "cluster_metadata_cache_persist", "type": "bool"},
+
         "dcln": {"abbreviation": "devicecodeloginnotification"},
         "devicecodeloginnotification": {"flag": "device_code_login_notification", "type": "str"},
 
@@ -953,6 +973,20 @@ class Parser(object):
         "dtd": {"abbreviation": "dynamictodataframe"},
         "dynamictodataframe": {"flag": "dynamic_to_dataframe", "type": "str"},
 
+        "dfp": {"abbreviation": "dataframepackage"},
+        "dataframepackage": {"flag": "dataframe_package", "type": "str"},
+
+        "mb": {"abbreviation": "memorybudget"},
+        "memorybudget": {"flag": "memory_budget", "type": "bool"},
+
+        "prog": {"abbreviation": "progressiveresults"},
+        "progressiveresults": {"flag": "progressive_results", "type": "bool"},
+
+        "stream": {"flag": "stream", "type": "bool"},
+
+        "krj": {"abbreviation": "keeprawjson"},
+        "keeprawjson": {"flag": "keep_raw_json", "type": "bool"},
+
         "tempfolderlocation": {"flag": "temp_folder_location", "type": "str"},
 
         "pl": {"abbreviation": "plotlylayout"},
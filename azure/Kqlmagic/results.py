@@ -6,15 +6,13 @@
 
 import functools
 import operator
-import csv
-import codecs
 import os.path
-import re
 import uuid
 import base64
-import json
 import io
-from typing import Any, Union, Dict
+import sys
+import collections
+from typing import Any, Union, Dict, List
 
 from traitlets.traitlets import Bool
 
@@ -28,9 +26,11 @@ from .log import logger
 
 from ._version import __version__ as kqlmagic_version
 from .constants import ExtendedPropertiesKeys, VisualizationKeys, VisualizationValues, VisualizationScales, VisualizationLegends
-from .my_utils import adjust_path, json_dumps
+from .my_utils import adjust_path, json_dumps, get_deep_size
 from .column_guesser import ColumnGuesserMixin
 from .display import Display
+from .html_table import HtmlTable
+from .csv_exporter import CsvExporter
 from .palette import Palette, Palettes
 from .ipython_api import IPythonAPI
 
@@ -48,38 +48,6 @@ def _unduplicate_field_names(field_names):
     return res
 
 
-class UnicodeWriter(object):
-    """
-    A CSV writer which will write rows to CSV file "f",
-    which is encoded in the given encoding.
-    """
-
-    # Object constructor
-    def __init__(self, f, dialect=csv.excel, encoding="utf-8", **kwds):
-        # Redirect output to a queue
-        self.queue = io.StringIO()
-        self.writer = csv.writer(self.queue, dialect=dialect, **kwds)
-        self.stream = f
-        self.encoder = codecs.getincrementalencoder(encoding)()
-
-
-    def writerow(self, row):
-        _row = row
-        self.writer.writerow(_row)
-        # Fetch UTF-8 output from the queue ...
-        data = self.queue.getvalue()
-        # write to the target stream
-        self.stream.write(data)
-        # empty queue
-        self.queue.truncate(0)
-        self.queue.seek(0)
-
-
-    def writerows(self, rows):
-        for row in rows:
-            self.writerow(row)
-
-
 class FileResultDescriptor(bytes):
     """Provides Notebook-friendly output for the feedback after a ``.csv`` called."""
 
@@ -181,55 +149,37 @@ class FileResultDescriptor(bytes):
             return self._get_data()
 
 
-def _nonbreaking_spaces(match_obj):
-    """
-    Make spaces visible in HTML by replacing all `` `` with ``&nbsp;``
+try:
+    collectionsAbc = collections.abc
+except AttributeError:
+    collectionsAbc = collections
 
-    Call with a ``re`` match object.  Retain group 1, replace group 2
-    with nonbreaking speaces.
-    """
-    spaces = "&nbsp;" * len(match_obj.group(2))
-    return f"{match_obj.group(1)}{spaces}"
 
+class ResultSetIndex(collectionsAbc.Mapping):
+    """ Read only mapping of the values of a result set column to the rows with that value.
+    Built once per column by the result set, and invalidated when the result set is refreshed """
 
-class DisplayRows(list):
+    def __init__(self, result_set, positions:Dict[Any,List[int]]):
+        self._result_set = result_set
+        # row positions by value
+        self._positions = positions
 
-    def __init__(self, rows:list, limit:int):
-        self.rows = [] if rows is None else rows
-        self.limit = len(self.rows) if limit is None else min(max(0, limit), len(self.rows))
-        self.row_index = 0
 
+    def __getitem__(self, key)->list:
+        positions = self._positions[key]
+        return [list.__getitem__(self._result_set, position) for position in positions]
 
-    def __getitem__(self, key):
-        if isinstance(key, slice):
-            if key.start and key.start >= self.limit:
-                return
-            key_start = key.start
-            if key.stop is None or key.stop >= self.limit:
-                key_stop = self.limit - 1
-            else:
-                key_stop = key.stop
-            key_slice = slice(key_start, key_stop, key.step)
-            return list.__getitem__(self.rows, key_slice)
-        if key < self.limit:
-            return list.__getitem__(self.rows, key)
 
-
-    def __len__(self):
-        return self.limit
+    def __iter__(self):
+        return iter(self._positions)
 
 
-    def __iter__(self):
-        self.row_index = 0
-        return self
+    def __len__(self):
+        return len(self._positions)
 
 
-    def __next__(self):
-        if self.row_index >= self.limit:
-            raise StopIteration
-        val = self.__getitem__(self.row_index)
-        self.row_index = self.row_index + 1
-        return val
+    def __contains__(self, key)->bool:
+        return key in self._positions
 
 
 class ResultSet(list, ColumnGuesserMixin):
@@ -380,18 +330,23 @@ class ResultSet(list, ColumnGuesserMixin):
 
     def _update_query_results(self, queryResult)->None:
         self._queryResult = queryResult
-        self._completion_query_info = queryResult.completion_query_info
-        self._completion_query_resource_consumption = queryResult.completion_query_resource_consumption
         self._dataSetCompletion = queryResult.dataSetCompletion
+        self._retry_info = queryResult.retry_info
         self._json_response = queryResult.json_response
         queryResultTable = queryResult.tables[self.fork_table_id]
         self._dataframe = None
+        self._arrow_table = None
+        self._polars_dataframe = None
+        # row positions by value, per column index, built on first lookup
+        self._columns_index:Dict[int,Dict[Any,List[int]]] = {}
+        # converted values per column, built on first access
+        self._columns_values:List[tuple] = None
         # schema
         self.columns_name = queryResultTable.keys()
         self.columns_type = queryResultTable.types()
         self.columns_datafarme_type = queryResultTable.datafarme_types
         self.field_names = _unduplicate_field_names(self.columns_name)
-        self.pretty = None
+        self._html_table = None
         self.records_count = queryResultTable.recordscount()
         self.is_partial_table = queryResultTable.ispartial()
         self.visualization_properties = queryResultTable.extended_properties.get(ExtendedPropertiesKeys.VISUALIZATION, {})
@@ -415,34 +370,37 @@ class ResultSet(list, ColumnGuesserMixin):
         self._update_query_results(queryResult)
 
 
-    def _create_fork_results(self)->None:
-        if self.fork_table_id == 0 and len(self._fork_table_resultSets) == 1:
-            for fork_table_id in range(1, len(self._queryResult.tables)):
-                r = ResultSet(self._metadata, self._queryResult, fork_table_id=fork_table_id, fork_table_resultSets=self._fork_table_resultSets)
-                if r.options.get("feedback"):
-                    if r.options.get("show_query_time"):
-                        minutes, seconds = divmod(self.elapsed_timespan, 60)
-                        r.feedback_info.append("Done ({:0>2}:{:06.3f}): {} records".format(int(minutes), seconds, r.records_count))
-
-
     def _update_fork_results(self)->None:
+        "updates fork results that were already created by fork_result()"
         if self.fork_table_id == 0:
             for r in self._fork_table_resultSets.values():
-                if r != self:
+                if r is not self:
                     r.update_obj(self._metadata, self._queryResult)
                     r.feedback_info = []
                     r.feedback_warning = []
                     r.display_info = True
                     r.suppress_result = False
-                    if r.options.get("feedback"):
-                        if r.options.get("show_query_time"):
-                            minutes, seconds = divmod(self.elapsed_timespan, 60)
-                            r.feedback_info.append("Done ({:0>2}:{:06.3f}): {} records".format(int(minutes), seconds, r.records_count))
+                    self._set_fork_feedback(r)
+
+
+    def _set_fork_feedback(self, r)->None:
+        if r.options.get("feedback"):
+            if r.options.get("show_query_time"):
+                minutes, seconds = divmod(self.elapsed_timespan, 60)
+                r.feedback_info.append("Done ({:0>2}:{:06.3f}): {} records".format(int(minutes), seconds, r.records_count))
 
 
     def fork_result(self, fork_table_id:int=0):
-        # return self._fork_table_resultSets.get(str(fork_table_id))
-        return self._fork_table_resultSets[str(fork_table_id)]
+        "returns the result set of table fork_table_id, created on first call"
+        r = self._fork_table_resultSets.get(str(fork_table_id))
+        if r is None:
+            primary = self._fork_table_resultSets.get("0", self)
+            if not (isinstance(fork_table_id, int) and 0 < fork_table_id < len(primary._queryResult.tables)):
+                raise KeyError(str(fork_table_id))
+            # registers itself in the shared forks dict
+            r = ResultSet(primary._metadata, primary._queryResult, fork_table_id=fork_table_id, fork_table_resultSets=self._fork_table_resultSets)
+            primary._set_fork_feedback(r)
+        return r
 
 
     @property
@@ -452,12 +410,12 @@ class ResultSet(list, ColumnGuesserMixin):
 
     @property
     def completion_query_info(self):
-        return Display.to_json_styled_class(self._completion_query_info, options=self.options)
+        return Display.to_json_styled_class(self._queryResult.completion_query_info, options=self.options)
 
 
     @property
     def completion_query_resource_consumption(self):
-        return Display.to_json_styled_class(self._completion_query_resource_consumption, options=self.options)
+        return Display.to_json_styled_class(self._queryResult.completion_query_resource_consumption, options=self.options)
 
 
     @property
@@ -465,6 +423,11 @@ class ResultSet(list, ColumnGuesserMixin):
         return Display.to_json_styled_class(self._dataSetCompletion, options=self.options)
 
 
+    @property
+    def retry_info(self):
+        return Display.to_json_styled_class(self._retry_info, options=self.options)
+
+
     # IPython html presentation of the object
     def _repr_html_(self)->str:
         self.show_result()
@@ -554,25 +517,14 @@ class ResultSet(list, ColumnGuesserMixin):
             display_limit = len(self)
 
         if display_limit >= 0:
-            table = DisplayRows(self, display_limit)
-            prettytable = Dependencies.get_module('prettytable', dont_throw=True)
-            if prettytable:
-                if self.pretty is None:
-                    # table printing style to any of prettytable's defined styles (currently DEFAULT, MSWORD_FRIENDLY, PLAIN_COLUMNS, RANDOM)
-                    prettytable_style = prettytable.__dict__[self.options.get("prettytable_style", "DEFAULT").upper()]
-                    self.pretty = PrettyTable(self.field_names, style=prettytable_style) if len(self.field_names) > 0 else None
-
-                self.pretty.add_rows(table)
-                result = self.pretty.get_html_string()
-                _cell_with_spaces_pattern = re.compile(r"(<td>)( {2,})")
-                result = _cell_with_spaces_pattern.sub(_nonbreaking_spaces, result)
-            else:
-                tabulate = Dependencies.get_module('tabulate', dont_throw=True)
-                if tabulate:
-                    result = tabulate.tabulate(table, self.field_names, tablefmt="html")
-                else:
-                    prettytable = Dependencies.get_module('prettytable')
-                    return {}
+            if len(self.field_names) == 0:
+                return {}
+            # kept by the result, so that its pages can be rendered on demand, reused if rendered again with the same layout
+            page_size = self.options.get("table_page_size")
+            style = self.options.get("prettytable_style")
+            if self._html_table is None or not self._html_table.is_same_layout(self, rows_count=display_limit, page_size=page_size, style=style):
+                self._html_table = HtmlTable(self.field_names, self, rows_count=display_limit, page_size=page_size, style=style)
+            result = self._html_table.get_html(options=self.options)
 
             if len(self) > display_limit:
                 result = f'{result}\n<span style="font-style:italic;text-align:center;">{len(self)} rows, truncated to display_limit of {display_limit}</span>'
@@ -611,12 +563,17 @@ class ResultSet(list, ColumnGuesserMixin):
                 else:
                     content = Display.toHtml(**{}, title='table')
 
+            elif options.get("table_package", "").lower() == "pandas" and options.get("dataframe_package") == "polars":
+                df = self._get_display_frame(display_limit, dataframe_package="polars")
+                if options.get("notebook_app") in ["azuredatastudiosaw"] and options.get("popup_window"):
+                    content = f"{df}"
+                else:
+                    content = Display.toHtml(body=df._repr_html_(), title='table')
+
             elif options.get("table_package", "").lower() in ["pandas", "pandas_html_table_schema"]:
                 pd = Dependencies.get_module("pandas")
 
-                df = self.to_dataframe()
-                if display_limit is not None:
-                    df = df.head(display_limit)
+                df = self._get_display_frame(display_limit)
 
                 pd.set_option('display.max_rows', display_limit)
                 pd.set_option('display.max_columns', None)
@@ -627,15 +584,12 @@ class ResultSet(list, ColumnGuesserMixin):
                 pd.set_option('display.large_repr', "truncate")
 
                 if options.get("table_package", "") == "pandas_html_table_schema" and not options.get("popup_window"):
-                    df_copied = False
-                    for idx, column_type in enumerate(self.columns_type):
-                        if column_type == "dynamic":
-                            if not df_copied:
-                                df_copied =  True
-                                df = df.copy()
-                            col_name = self.columns_name[idx]
-                            for item_idx, item in enumerate(df[col_name]):
-                                df.loc[item_idx, col_name] = f"{item}"
+                    dynamic_columns = [self.columns_name[idx] for idx, column_type in enumerate(self.columns_type) if column_type == "dynamic"]
+                    if len(dynamic_columns) > 0:
+                        # the displayed frame might be the result dataframe
+                        df = df.copy()
+                        for col_name in dynamic_columns:
+                            df[col_name] = df[col_name].astype(str)
 
                     pandas_display_html_table_schema = pd.options.display.html.table_schema
                     pd.options.display.html.table_schema = True
@@ -652,7 +606,7 @@ class ResultSet(list, ColumnGuesserMixin):
                     else:
                         t = df._repr_html_()
                         content = Display.toHtml(body=t, title='table')
-            # prettytable or tabulate in html format
+            # html table, rendered page by page
             else:
                 t = self._getPrettyTableHtml()
                 content = Display.toHtml(**t, title='table')
@@ -673,6 +627,19 @@ class ResultSet(list, ColumnGuesserMixin):
         return None
 
 
+    def _get_display_frame(self, display_limit:int=None, dataframe_package:str="pandas"):
+        """returns dataframe of the rows to display, of dataframe_package (pandas or polars).
+        If the result dataframe was not built yet, only the displayed rows are converted"""
+        is_polars = dataframe_package == "polars"
+        frame = self._polars_dataframe if is_polars else self._dataframe
+        if frame is None and display_limit is not None and display_limit < len(self):
+            window = self._queryResult.tables[self.fork_table_id].get_rows_window(0, display_limit)
+            return window.to_polars(options=self.options) if is_polars else window.to_dataframe(options=self.options)
+
+        frame = self.to_polars() if is_polars else self.to_dataframe()
+        return frame.head(display_limit) if display_limit is not None else frame
+
+
     def _patch_pandas__repr_data_resource_(self):
         "patch pandas' _repr_data_resource_ method. main modifications is to remove pandas primary key index"
         pd = Dependencies.get_module("pandas")
@@ -773,8 +740,8 @@ class ResultSet(list, ColumnGuesserMixin):
 
     # Printable pretty presentation of the object
     def __str__(self, *args, **kwargs)->str:
-        j_table = [[json.loads(json_dumps(row[col])) for col in self.columns_name] for row in self]
-        return json_dumps(j_table)
+        j_table = [[row[col] for col in self.columns_name] for row in self]
+        return json_dumps(j_table, codec=self.options.get("json_codec"))
 
 
     # For iterator self[key]
@@ -786,12 +753,16 @@ class ResultSet(list, ColumnGuesserMixin):
         try:
             item = list.__getitem__(self, key)
         except TypeError:
-            result = [row for row in self if row[0] == key]
-            if not result or len(result) == 0:
+            positions = self._get_column_index(0)
+            if positions is not None:
+                result = positions.get(key) or []
+            else:
+                result = [position for position, row in enumerate(self) if row[0] == key]
+            if len(result) == 0:
                 raise KeyError(key)
             if len(result) > 1:
                 raise KeyError(f"{len(result)} results for '{key}'")
-            item = result[0]
+            item = list.__getitem__(self, result[0])
 
         if isinstance(key, slice):
             if key.start is None and key.stop is None and key.step is None:
@@ -802,26 +773,85 @@ class ResultSet(list, ColumnGuesserMixin):
         return Display.to_json_styled_class(item, options=self.options)
 
 
+    def _get_column_index(self, col_index:int)->Dict[Any,List[int]]:
+        "returns row positions by value of the column, None if the column has unhashable values"
+        positions = self._columns_index.get(col_index)
+        if positions is None and col_index not in self._columns_index:
+            positions = {}
+            if self._columns_values is not None:
+                values = self._columns_values[col_index]
+            else:
+                # only the indexed column is converted
+                values = self._queryResult.tables[self.fork_table_id].data_table.get_column(col_index)[:len(self)]
+            try:
+                for position, value in enumerate(values):
+                    positions.setdefault(value, []).append(position)
+            except TypeError:
+                # unhashable values (dynamic objects or arrays)
+                positions = None
+            self._columns_index[col_index] = positions
+        return positions
+
+
+    # Public API   
+    def index_by(self, column:Union[str,int])->ResultSetIndex:
+        """Returns a read only mapping of the values of the column (name or index) to the list of rows with that value.
+        The index is built once, on first call, raises TypeError if the column has unhashable values"""
+        col_index = column if isinstance(column, int) else list(self.columns_name).index(column)
+        positions = self._get_column_index(col_index)
+        if positions is None:
+            raise TypeError(f"column '{self.columns_name[col_index]}' has unhashable values, it can't be indexed")
+        return ResultSetIndex(self, positions)
+
+
+    def _get_columns_values(self)->List[tuple]:
+        "returns a tuple of converted values per column, kept by the result set, unless memory_budget is set"
+        columns_values = self._columns_values
+        if columns_values is None:
+            data_table = self._queryResult.tables[self.fork_table_id].data_table
+            rows_count = len(self)
+            columns_values = [tuple(data_table.get_column(idx)[:rows_count]) for idx in range(len(self.columns_name))] if rows_count > 0 else [() for c in self.columns_name]
+            if not self.options.get("memory_budget"):
+                self._columns_values = columns_values
+        return columns_values
+
+
     def to_dict(self)->Dict[str,Any]:
         """Returns a single dict built from the result set
         Keys are column names; values are a tuple"""
-        if len(self):
-            return dict(zip(self.columns_name, zip(*self)))
-        else:
-            return dict(zip(self.columns_name, [() for c in self.columns_name]))
+        return dict(zip(self.columns_name, self._get_columns_values()))
 
 
     def dicts_iterator(self):
         "Iterator yielding a dict for each row"
-        for row in self:
-            yield dict(zip(self.columns_name, row))
+        columns_name = self.columns_name
+        for values in zip(*self._get_columns_values()):
+            yield dict(zip(columns_name, values))
+
+
+    # Public API   
+    def to_arrow(self):
+        "Returns a pyarrow Table instance built from the result set columns."
+        if self._arrow_table is None:
+            arrow_table = self._queryResult.tables[self.fork_table_id].to_arrow(options=self.options)
+            if self.options.get("memory_budget"):
+                return arrow_table
+            self._arrow_table = arrow_table
+        return self._arrow_table
 
 
     # Public API   
-    def to_dataframe(self):
-        "Returns a Pandas DataFrame instance built from the result set."
+    def to_dataframe(self, types_mapper=None):
+        """Returns a Pandas DataFrame instance built from the result set.
+        types_mapper is passed to pyarrow.Table.to_pandas(), for example pandas.ArrowDtype to get arrow backed columns"""
+        if types_mapper is not None:
+            return self._queryResult.tables[self.fork_table_id].to_dataframe(options=self.options, types_mapper=types_mapper)
+
         if self._dataframe is None:
-            self._dataframe = self._queryResult.tables[self.fork_table_id].to_dataframe(options=self.options)
+            dataframe = self._queryResult.tables[self.fork_table_id].to_dataframe(options=self.options)
+            if self.options.get("memory_budget"):
+                return dataframe
+            self._dataframe = dataframe
 
             # pd = Dependencies.get_module("pandas")
             # frame = pd.DataFrame(self, columns=(self and self.columns_name) or [])
@@ -829,6 +859,72 @@ class ResultSet(list, ColumnGuesserMixin):
         return self._dataframe
 
 
+    # Public API   
+    def to_polars(self):
+        "Returns a Polars DataFrame instance built from the result set columns."
+        if self._polars_dataframe is None:
+            polars_dataframe = self._queryResult.tables[self.fork_table_id].to_polars(options=self.options)
+            if self.options.get("memory_budget"):
+                return polars_dataframe
+            self._polars_dataframe = polars_dataframe
+        return self._polars_dataframe
+
+
+    # Public API   
+    def iter_batches(self, batch_size:int=10000, arrow:bool=False):
+        """Iterator yielding batches of the result set rows, converted batch by batch, converted values are not kept.
+        A batch is a list of rows, each row a tuple, or a pyarrow.RecordBatch if arrow is True"""
+        return self._queryResult.tables[self.fork_table_id].iter_batches(batch_size, arrow=arrow, options=self.options)
+
+
+    # Public API   
+    def memory_usage(self)->Dict[str,int]:
+        """Returns approximate memory, in bytes, held by the result set, by component.
+        Objects shared by components are counted once, by the first component"""
+        seen = set()
+        usage = self._queryResult.tables[self.fork_table_id].data_table.get_memory_usage(seen)
+        usage["row_views"] = list.__sizeof__(self) + sum(sys.getsizeof(row) for row in list.__iter__(self))
+        usage["raw_json"] = get_deep_size(self._json_response, seen)
+        usage["dataframe"] = int(self._dataframe.memory_usage(deep=True).sum()) if self._dataframe is not None else 0
+        usage["arrow_table"] = self._arrow_table.nbytes if self._arrow_table is not None else 0
+        usage["polars_dataframe"] = self._polars_dataframe.estimated_size() if self._polars_dataframe is not None else 0
+        usage["total"] = sum(usage.values())
+        return usage
+
+
+    def _release_memory(self)->None:
+        "releases memory not needed in memory budget mode, of the result set and its forks"
+        if not self.options.get("keep_raw_json"):
+            self._queryResult.json_response = None
+            for r in self._fork_table_resultSets.values():
+                r._json_response = None
+
+
+    # Public API   
+    def to_frame(self, dataframe_package:str=None):
+        """Returns the result set as a dataframe of the package specified by dataframe_package option (pandas, polars or arrow).
+        dataframe_package parameter overrides the option"""
+        dataframe_package = dataframe_package or self.options.get("dataframe_package") or "pandas"
+        if dataframe_package == "polars":
+            return self.to_polars()
+        elif dataframe_package == "arrow":
+            return self.to_arrow()
+        else:
+            return self.to_dataframe()
+
+
+    def _to_columns_dict(self)->Dict[str,Any]:
+        "Returns a dict of columns, by column names. Columns are tuples, or series of the dataframe_package if not pandas"
+        dataframe_package = self.options.get("dataframe_package") or "pandas"
+        if dataframe_package == "pandas":
+            return self.to_dict()
+        frame = self.to_frame(dataframe_package)
+        if dataframe_package == "arrow":
+            return {col_name: frame.column(idx) for idx, col_name in enumerate(self.columns_name)}
+        else:
+            return {col_name: frame.to_series(idx) for idx, col_name in enumerate(self.columns_name)}
+
+
     # Public API   
     def submit(self, override_vars:Dict[str,str]=None, override_options:Dict[str,Any]=None, override_query_properties:Dict[str,Any]=None, override_connection:str=None)->None:
         "execute the query again"
@@ -1195,27 +1291,24 @@ class ResultSet(list, ColumnGuesserMixin):
         return plot
 
 
-    def to_csv(self, filename:str=None, **kwargs):
+    def to_csv(self, filename:str=None, compression:str=None, chunk_size:int=None, **kwargs):
         """Generate results in comma-separated form.  Write to ``filename`` if given.
+           Rows are written in chunks of chunk_size rows. The file is gzip compressed if compression is 'gzip',
+           or if compression is not specified and filename ends with '.gz'.
            Any other parameters will be passed on to csv.writer."""
         if len(self) == 0:
             return None  # no results
+        encoding = kwargs.pop("encoding", "utf-8")
+        exporter = CsvExporter(self._queryResult.tables[self.fork_table_id].data_table, self.field_names, rows_count=len(self), chunk_size=chunk_size)
         if filename:
             filename = adjust_path(filename)
-            encoding = kwargs.get("encoding", "utf-8")
-            outfile = open(filename, "w", newline="", encoding=encoding)
-        else:
-            outfile = io.StringIO()
-        writer = UnicodeWriter(outfile, **kwargs)
-        writer.writerow(self.field_names)
-        for row in self:
-            j_row = [json.loads(json_dumps(row[col])) for col in self.columns_name]
-            writer.writerow(j_row)
-        if filename:
-            outfile.close()
+            with CsvExporter.open_file(filename, encoding=encoding, compression=compression) as outfile:
+                exporter.write(outfile, **kwargs)
             message = "csv results"
-            return FileResultDescriptor(filename, message=message, format="csv", **kwargs)
+            return FileResultDescriptor(filename, message=message, format="csv")
         else:
+            outfile = io.StringIO(newline="")
+            exporter.write(outfile, **kwargs)
             return outfile.getvalue()
 
 
@@ -1811,24 +1904,3 @@ class ResultSet(list, ColumnGuesserMixin):
             ),
         )
         return {"data": data, "layout": layout}
-
-
-prettytable = Dependencies.get_module('prettytable', dont_throw=True)
-if prettytable:
-    class PrettyTable(prettytable.PrettyTable):
-
-        # Object constructor
-        def __init__(self, *args, **kwargs):
-            self.row_count = 0
-            super(PrettyTable, self).__init__(*args, **kwargs)
-
-
-        def add_rows(self, data):
-            if self.row_count == len(data):
-                return  # correct number of rows already present
-            self.clear_rows()
-            self.row_count = len(data)
-
-            for row in data:
-                r = [list(c) if isinstance(c, list) else dict(c) if isinstance(c, dict) else c for c in row]
-                self.add_row(r)
@@ -0,0 +1,191 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+
+"""Retry of throttled (429), unavailable (503) and transient failed requests.
+
+Delays honor the Retry-After response header, otherwise a jittered exponential backoff is used.
+Only idempotent requests (queries and read-only control commands) are retried.
+A per cluster circuit breaker fails fast, while a cluster is unhealthy.
+"""
+
+from typing import Any, Dict
+import time
+import random
+import threading
+import datetime
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+from .kql_response import KqlError
+from .log import logger
+
+
+class CircuitBreaker(object):
+    """Process wide circuit breaker, per cluster.
+
+    After FAILURE_THRESHOLD consecutive failed requests (server unavailable, or network error) the circuit opens,
+    and requests to the cluster fail fast for RESET_TIMEOUT_IN_SECS. Then one trial request is let through (half-open),
+    if it succeeds the circuit closes, otherwise it opens again.
+    """
+
+    FAILURE_THRESHOLD = 5
+    RESET_TIMEOUT_IN_SECS = 30.0
+
+    _lock = threading.Lock()
+    _states: Dict[str,Dict[str,Any]] = {}
+
+
+    @classmethod
+    def get_key(cls, url:str)->str:
+        return (urlsplit(url).hostname or url).lower()
+
+
+    @classmethod
+    def check(cls, key:str)->None:
+        "raises KqlError if the circuit of the cluster is open"
+        with cls._lock:
+            state = cls._states.get(key)
+            if state is None or state["opened_at"] is None:
+                return
+            remaining = state["opened_at"] + cls.RESET_TIMEOUT_IN_SECS - time.time()
+            # a trial that didn't complete, is replaced after another reset timeout
+            if remaining <= 0 and (not state["is_trial_pending"] or remaining <= -cls.RESET_TIMEOUT_IN_SECS):
+                # half-open, let one trial request through
+                state["is_trial_pending"] = True
+                return
+        raise KqlError(f"cluster {key} is unhealthy, requests are suspended for {max(remaining, 0):.0f} more seconds, after {state['failures']} consecutive failures", None)
+
+
+    @classmethod
+    def record_success(cls, key:str)->None:
+        with cls._lock:
+            cls._states.pop(key, None)
+
+
+    @classmethod
+    def record_failure(cls, key:str)->None:
+        with cls._lock:
+            state = cls._states.setdefault(key, {"failures": 0, "opened_at": None, "is_trial_pending": False})
+            state["failures"] += 1
+            if state["is_trial_pending"] or state["failures"] >= cls.FAILURE_THRESHOLD:
+                if state["opened_at"] is None or state["is_trial_pending"]:
+                    logger().debug(f"CircuitBreaker::record_failure - circuit opened for cluster {key}")
+                state["opened_at"] = time.time()
+                state["is_trial_pending"] = False
+
+
+    @classmethod
+    def clear(cls)->None:
+        with cls._lock:
+            cls._states = {}
+
+
+class RetryContext(object):
+    """State of the retries of one request.
+
+    Usage: call check_circuit() before each attempt, on success call on_success(),
+    on failure call on_failure(error), it returns the delay before the next attempt, or None if the error should be raised.
+    """
+
+    RETRYABLE_STATUS_CODES = [429, 502, 503, 504]
+    THROTTLED_STATUS_CODE = 429
+    BASE_DELAY_IN_SECS = 1.0
+
+
+    def __init__(self, url:str, client_request_id:str, is_idempotent:bool=True, **options)->None:
+        self.circuit_key = CircuitBreaker.get_key(url)
+        self.client_request_id_prefix = client_request_id
+        # non idempotent requests (e.g. control commands that modify state) are not retried, they might have been executed
+        self.is_idempotent = is_idempotent
+        self.max_retries = max(0, options.get("request_max_retries") or 0)
+        self.max_delay = max(0, options.get("request_retry_max_delay") or 0)
+        self.retries = 0
+        self.throttled = 0
+        self.total_delay = 0.0
+        self.last_error:str = None
+
+
+    @property
+    def client_request_id(self)->str:
+        "same prefix for all attempts, retries are suffixed with the retry number"
+        if self.retries == 0:
+            return self.client_request_id_prefix
+        return f"{self.client_request_id_prefix};retry:{self.retries}"
+
+
+    @property
+    def info(self)->Dict[str,Any]:
+        return {
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "retry_delay_in_secs": round(self.total_delay, 3),
+            "last_error": self.last_error,
+        }
+
+
+    def check_circuit(self)->None:
+        CircuitBreaker.check(self.circuit_key)
+
+
+    def on_success(self)->None:
+        CircuitBreaker.record_success(self.circuit_key)
+
+
+    def on_failure(self, error:Exception)->float:
+        status_code = None
+        retry_after = None
+        if isinstance(error, KqlError):
+            http_response = error.http_response
+            if http_response is None:
+                # circuit breaker error
+                return None
+            status_code = http_response.status_code
+            if status_code not in self.RETRYABLE_STATUS_CODES:
+                # cluster is responsive
+                CircuitBreaker.record_success(self.circuit_key)
+                return None
+            retry_after = self._parse_retry_after(http_response.headers.get("Retry-After"))
+            self.last_error = f"http status {status_code}"
+        elif isinstance(error, OSError):
+            # network errors, including timeouts and connection resets
+            self.last_error = f"{type(error).__name__}: {error}"
+        else:
+            return None
+
+        if status_code == self.THROTTLED_STATUS_CODE:
+            self.throttled += 1
+        else:
+            CircuitBreaker.record_failure(self.circuit_key)
+
+        if not self.is_idempotent or self.retries >= self.max_retries:
+            return None
+
+        backoff = min(self.max_delay, self.BASE_DELAY_IN_SECS * (2 ** self.retries))
+        if retry_after is not None:
+            delay = min(self.max_delay, retry_after) + random.uniform(0, self.BASE_DELAY_IN_SECS)
+        else:
+            # full jitter
+            delay = random.uniform(0, backoff)
+
+        self.retries += 1
+        self.total_delay += delay
+        logger().debug(f"RetryContext::on_failure - {self.last_error}, retry {self.retries} of {self.max_retries} in {delay:.3f} seconds, client request id: {self.client_request_id_prefix}")
+        return delay
+
+
+    def _parse_retry_after(self, value:str)->float:
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+        except:  # pylint: disable=bare-except
+            return None
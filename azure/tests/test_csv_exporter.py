@@ -0,0 +1,119 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests and benchmark of the chunked csv exporter. """
+
+import io
+import csv
+import gzip
+import time
+
+
+import pytest
+
+
+from Kqlmagic.kql_response import KqlResponseTable
+from Kqlmagic.kql_proxy import KqlTableResponse
+from Kqlmagic.csv_exporter import CsvExporter
+from Kqlmagic.my_utils import json_dumps, json_loads
+
+
+COLUMNS = [
+    {"ColumnName": "n", "ColumnType": "long"},
+    {"ColumnName": "name", "ColumnType": "string"},
+    {"ColumnName": "t", "ColumnType": "datetime"},
+    {"ColumnName": "d", "ColumnType": "timespan"},
+    {"ColumnName": "x", "ColumnType": "real"},
+    {"ColumnName": "m", "ColumnType": "decimal"},
+    {"ColumnName": "b", "ColumnType": "bool"},
+    {"ColumnName": "j", "ColumnType": "dynamic"},
+]
+
+
+def _rows(count:int)->list:
+    return [
+        [
+            i,
+            f"name, \"{i}\"" if i % 7 else None,
+            f"2020-01-02T03:{(i // 60) % 60:02}:00.{i % 10}000000Z" if i % 5 else None,
+            f"{i % 3}.01:02:03.1234567" if i % 4 else "00:00:01",
+            "NaN" if i % 11 == 0 else i / 3,
+            "1.10" if i % 2 else None,
+            i % 2 == 0,
+            {"k": [i, "v"]} if i % 3 else None,
+        ]
+        for i in range(count)
+    ]
+
+
+def _row_by_row_csv(rows:list)->str:
+    "reference, the previous row by row export, with a json round trip per row"
+    table = KqlTableResponse(KqlResponseTable(0, {"Columns": COLUMNS, "Rows": rows}), {})
+    outfile = io.StringIO()
+    writer = csv.writer(outfile)
+    writer.writerow([c["ColumnName"] for c in COLUMNS])
+    for row in table.fetchall():
+        writer.writerow(json_loads(json_dumps(list(row))))
+    return outfile.getvalue()
+
+
+def _chunked_csv(rows:list, chunk_size:int=None)->str:
+    exporter = CsvExporter(KqlResponseTable(0, {"Columns": COLUMNS, "Rows": rows}), [c["ColumnName"] for c in COLUMNS], chunk_size=chunk_size)
+    outfile = io.StringIO()
+    exporter.write(outfile)
+    return outfile.getvalue()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, None])
+def test_same_as_row_by_row(chunk_size):
+    rows = _rows(100)
+    assert _chunked_csv(rows, chunk_size) == _row_by_row_csv(rows)
+
+
+def test_rows_count_limit():
+    rows = _rows(10)
+    exporter = CsvExporter(KqlResponseTable(0, {"Columns": COLUMNS, "Rows": rows}), [c["ColumnName"] for c in COLUMNS], rows_count=4, chunk_size=3)
+    outfile = io.StringIO()
+    assert exporter.write(outfile) == 4
+    assert len(outfile.getvalue().splitlines()) == 5
+
+
+def test_gzip_file(tmp_path):
+    rows = _rows(50)
+    exporter = CsvExporter(KqlResponseTable(0, {"Columns": COLUMNS, "Rows": rows}), [c["ColumnName"] for c in COLUMNS])
+    filename = str(tmp_path / "result.csv.gz")
+    with CsvExporter.open_file(filename) as outfile:
+        exporter.write(outfile)
+    with gzip.open(filename, "rt", newline="", encoding="utf-8") as infile:
+        assert infile.read() == _row_by_row_csv(rows)
+
+
+class _NullStream(object):
+    "counts written characters, keeps nothing"
+
+    def __init__(self):
+        self.size = 0
+
+
+    def write(self, s):
+        self.size += len(s)
+
+
+@pytest.mark.benchmark
+def test_export_throughput():
+    rows = _rows(100000)
+
+    start = time.perf_counter()
+    _row_by_row_csv(rows)
+    row_by_row_rate = len(rows) / (time.perf_counter() - start)
+
+    exporter = CsvExporter(KqlResponseTable(0, {"Columns": COLUMNS, "Rows": rows}), [c["ColumnName"] for c in COLUMNS])
+    start = time.perf_counter()
+    exporter.write(_NullStream())
+    chunked_rate = len(rows) / (time.perf_counter() - start)
+
+    print(f"row by row: {row_by_row_rate:,.0f} rows/sec")
+    print(f"chunked: {chunked_rate:,.0f} rows/sec")
@@ -0,0 +1,105 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests of the paged html table renderer. """
+
+import io
+import contextlib
+
+
+from Kqlmagic.html_table import HtmlTable
+from Kqlmagic.display import Display
+from Kqlmagic.my_utils import json_dumps
+
+
+ROWS = [(i, f"  <{i}>") for i in range(10)]
+
+
+def test_renders_first_page_only():
+    table = HtmlTable(["n", "s"], ROWS, page_size=4)
+    body = table.get_html(pages_source="kernel")
+    assert table.pages_count == 3
+    assert body.count("<tr><td>") == 4
+    assert "<td>&nbsp;&nbsp;&lt;3&gt;</td>" in body
+    assert "rows 1-4 of 10" in body
+
+
+def test_inline_pages():
+    table = HtmlTable(["n", "s"], ROWS, rows_count=7, page_size=4)
+    body = table.get_html(pages_source="inline")
+    assert f'<template id="{table.id}_page_1">' in body
+    assert body.count("<tr><td>") == 7
+
+
+def test_single_page_has_no_pager():
+    body = HtmlTable(["n", "s"], ROWS).get_html(options={})
+    assert body.count("<tr><td>") == 10
+    assert "<script>" not in body
+
+
+def test_kernel_page():
+    table = HtmlTable(["n", "s"], ROWS, page_size=4)
+    table.get_html(pages_source="kernel")
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        HtmlTable.print_page(table.id, 2)
+    assert output.getvalue() == table.get_page_html(2)
+    assert output.getvalue().count("<tr>") == 2
+
+
+def test_inline_pages_are_bounded():
+    rows = [(i, "x") for i in range(5000)]
+    table = HtmlTable(["n", "s"], rows, page_size=100)
+    body = table.get_html(pages_source="inline")
+    assert body.count("<template ") == HtmlTable.INLINE_MAX_ROWS // 100 - 1
+    assert body.count("<tr><td>") == HtmlTable.INLINE_MAX_ROWS
+    assert f"only the first {HtmlTable.INLINE_MAX_ROWS} rows" in body
+
+
+def test_styles():
+    assert "<table>" in HtmlTable(["n", "s"], ROWS, style="PLAIN_COLUMNS").get_html(options={})
+    assert '<table border="1" frame="vsides" rules="cols">' in HtmlTable(["n", "s"], ROWS, style="msword_friendly").get_html(options={})
+    assert '<table border="1">' in HtmlTable(["n", "s"], ROWS).get_html(options={})
+
+
+def test_rendered_again_keeps_previous_pages():
+    table = HtmlTable(["n", "s"], ROWS, page_size=4)
+    table.get_html(pages_source="kernel")
+    first_id = table.id
+    table.get_html(pages_source="kernel")
+    assert table.id != first_id
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        HtmlTable.print_page(first_id, 1)
+    assert output.getvalue() == table.get_page_html(1)
+
+
+def test_is_same_layout():
+    table = HtmlTable(["n", "s"], ROWS, rows_count=20, page_size=4, style="default")
+    assert table.is_same_layout(ROWS, rows_count=None, page_size=4)
+    assert not table.is_same_layout(ROWS, rows_count=5, page_size=4)
+    assert not table.is_same_layout(ROWS, page_size=5)
+    assert not table.is_same_layout(ROWS, page_size=4, style="PLAIN_COLUMNS")
+    assert not table.is_same_layout(list(ROWS), page_size=4)
+
+
+def test_files_pages_are_bounded(tmp_path, monkeypatch):
+    (tmp_path / "files").mkdir()
+    monkeypatch.setattr(Display, "showfiles_file_base_path", str(tmp_path))
+    monkeypatch.setattr(Display, "showfiles_folder_name", "files")
+    monkeypatch.setattr(Display, "showfiles_url_base_path", "http://localhost:5000/files")
+    options = {"temp_files_server_address": "localhost:5000", "kernel_id": "k"}
+    rows = [(i, "x") for i in range(5000)]
+    table = HtmlTable(["n", "s"], rows, page_size=100)
+    assert HtmlTable.get_pages_source(options) == "files"
+    body = table.get_html(options=options)
+    files = sorted((tmp_path / "files").iterdir())
+    # first page is rendered in the output, next pages of the first INLINE_MAX_ROWS rows are written to files
+    assert len(files) == HtmlTable.INLINE_MAX_ROWS // 100 - 1
+    assert f"{table.id}_1.js" in body
+    assert f"{table.id}_{HtmlTable.INLINE_MAX_ROWS // 100}.js" not in body
+    assert json_dumps(table.get_page_html(1)) in (tmp_path / "files" / f"{table.id}_1.js").read_text(encoding="utf-8")
+    assert f"only the first {HtmlTable.INLINE_MAX_ROWS} rows" in body
@@ -0,0 +1,87 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests of http client requests sessions, served by a local http server. """
+
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+import pytest
+
+
+from Kqlmagic.http_client import HttpClient, HttpConnectionPool
+
+
+BODY = b"x" * 100000
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.send_header("Set-Cookie", f"client={self.path.strip('/')}")
+        self.end_headers()
+        self.wfile.write(BODY)
+
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+    HttpConnectionPool.clear()
+
+
+@pytest.fixture
+def http_client():
+    client = HttpClient()
+    if client._requests is None:
+        pytest.skip("requests is not installed")
+    return client
+
+
+def test_cookies_are_not_shared(server_url, http_client):
+    other_client = HttpClient()
+    http_client.get(f"{server_url}/a")
+    other_client.get(f"{server_url}/b")
+    assert http_client._requests_session is not other_client._requests_session
+    assert http_client._requests_session.cookies.get("client") == "a"
+    assert other_client._requests_session.cookies.get("client") == "b"
+
+
+def test_session_kept_while_streamed_response_is_read(server_url, http_client, monkeypatch):
+    response = http_client.get(f"{server_url}/a", stream=True)
+    session = http_client._requests_session
+    chunks = response.iter_content(chunk_size=1000)
+    next(chunks)
+    # idle timeout passed, while the streamed response is still read
+    monkeypatch.setattr(HttpConnectionPool, "IDLE_TIMEOUT_IN_SECS", -1.0)
+    http_client.get(f"{server_url}/a")
+    assert http_client._requests_session is session
+    assert len(b"".join(chunks)) == len(BODY) - 1000
+
+    # streamed response was fully read, idle session is recreated
+    http_client.get(f"{server_url}/a")
+    assert http_client._requests_session is not session
+
+
+def test_clear_closes_sessions(server_url, http_client):
+    http_client.get(f"{server_url}/a")
+    session = http_client._requests_session
+    assert session in HttpConnectionPool._requests_sessions
+    HttpConnectionPool.clear()
+    assert session not in HttpConnectionPool._requests_sessions
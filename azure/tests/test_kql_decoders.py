@@ -0,0 +1,98 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests and micro-benchmark of datetime and timespan decoders. """
+
+import time
+from datetime import timedelta
+
+
+import pytest
+import dateutil.parser
+
+
+from Kqlmagic.kql_decoders import KqlValueDecoder
+
+
+DATETIME_VALUES = [
+    "2020-01-02T03:04:05Z",
+    "2020-01-02T03:04:05.1234567Z",
+    "2020-01-02T03:04:05.1Z",
+    "2020-01-02T03:04:05.123+02:00",
+    "2020-01-02",
+    "0001-01-01T00:00:00Z",
+]
+
+TIMESPAN_VALUES = {
+    "00:00:01": timedelta(seconds=1),
+    "1.02:03:04.5": timedelta(days=1, hours=2, minutes=3, seconds=4.5),
+    "-3.00:00:01.1234567": -timedelta(days=3, seconds=1.1234567),
+    "12:00:00": timedelta(hours=12),
+    100: timedelta(microseconds=10),
+    None: None,
+}
+
+
+@pytest.mark.parametrize("value", DATETIME_VALUES)
+def test_datetime_same_as_dateutil(value):
+    decoded = KqlValueDecoder.parse_datetime(value)
+    expected = dateutil.parser.isoparse(value)
+    assert decoded == expected
+    assert decoded.tzinfo == expected.tzinfo
+
+
+@pytest.mark.parametrize("value, expected", TIMESPAN_VALUES.items())
+def test_timespan(value, expected):
+    assert KqlValueDecoder.parse_timespan(value) == expected
+
+
+def test_timespan_invalid():
+    with pytest.raises(ValueError):
+        KqlValueDecoder.parse_timespan("abc")
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("00:00:01", 1000000000),
+    ("1.02:03:04.5", 93784500000000),
+    ("-3.00:00:01.1234567", -259201123456700),
+    ("00:00:00.0000001", 100),
+    (100, 10000),
+    (None, None),
+])
+def test_timespan_ns_keeps_ticks(value, expected):
+    assert KqlValueDecoder.parse_timespan_ns(value) == expected
+
+
+def test_memo_is_bounded():
+    decoder = KqlValueDecoder(memo_max_size=2)
+    values = [f"2020-01-0{day}T00:00:00Z" for day in range(1, 6)]
+    decoded = [decoder.decode_datetime(v) for v in values + values]
+    assert decoded[:5] == decoded[5:]
+    assert len(decoder._datetime_memo) == 2
+
+
+def _decode_rate(decode, values)->float:
+    start = time.perf_counter()
+    for value in values:
+        decode(value)
+    return len(values) / (time.perf_counter() - start)
+
+
+@pytest.mark.benchmark
+def test_decode_throughput():
+    # telemetry like column, 100K cells, timestamps binned to 1 minute
+    datetime_values = [f"2020-01-02T03:{(i // 60) % 60:02}:00.0000000Z" for i in range(100000)]
+    timespan_values = [f"00:{(i // 60) % 60:02}:{i % 60:02}.1234567" for i in range(100000)]
+
+    rates = {
+        "datetime dateutil": _decode_rate(dateutil.parser.isoparse, datetime_values),
+        "datetime parse": _decode_rate(KqlValueDecoder.parse_datetime, datetime_values),
+        "datetime decode": _decode_rate(KqlValueDecoder().decode_datetime, datetime_values),
+        "timespan parse": _decode_rate(KqlValueDecoder.parse_timespan, timespan_values),
+        "timespan decode": _decode_rate(KqlValueDecoder().decode_timespan, timespan_values),
+    }
+    for name, rate in rates.items():
+        print(f"{name}: {rate:,.0f} values/sec")
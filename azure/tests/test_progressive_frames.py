@@ -0,0 +1,231 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests of progressive and streamed v2 frames, served by a local frame emitter. """
+
+import json
+
+
+import pytest
+
+
+from Kqlmagic.kql_frames_parser import KqlFramesParser
+from Kqlmagic.kql_response import KqlQueryResponse
+from Kqlmagic.kql_proxy import KqlResponse
+from Kqlmagic.display import ProgressiveDisplay
+from Kqlmagic.kusto_client import KustoClient
+from Kqlmagic.kql_engine import KqlEngine
+from Kqlmagic.constants import ConnStrKeys
+from Kqlmagic.my_utils import JsonCodec
+
+
+COLUMNS = [{"ColumnName": "n", "ColumnType": "long"}, {"ColumnName": "name", "ColumnType": "string"}]
+
+
+class FrameEmitter(object):
+    """Emits a v2 response body, as a kusto query endpoint does, in chunks of chunk_size bytes.
+    Rows are sent in TableFragment frames if progressive, otherwise in a single DataTable frame."""
+
+    def __init__(self, rows:list, progressive:bool=True, fragment_size:int=3, chunk_size:int=40, replace_at:int=None, columns:list=None):
+        self.rows = rows
+        self.columns = columns or COLUMNS
+        self.progressive = progressive
+        self.fragment_size = fragment_size
+        self.chunk_size = chunk_size
+        # index of fragment that replaces all previous rows
+        self.replace_at = replace_at
+
+
+    def frames(self)->list:
+        frames = [
+            {"FrameType": "DataSetHeader", "IsProgressive": self.progressive, "Version": "v2.0"},
+            {"FrameType": "DataTable", "TableId": 0, "TableKind": "QueryProperties", "TableName": "@ExtendedProperties",
+             "Columns": [{"ColumnName": "TableId", "ColumnType": "int"}, {"ColumnName": "Key", "ColumnType": "string"}, {"ColumnName": "Value", "ColumnType": "dynamic"}],
+             "Rows": [[1, "Visualization", {"Visualization": None}]]},
+        ]
+        if self.progressive:
+            frames.append({"FrameType": "TableHeader", "TableId": 1, "TableKind": "PrimaryResult", "TableName": "PrimaryResult", "Columns": self.columns})
+            fragments = [self.rows[i:i + self.fragment_size] for i in range(0, len(self.rows), self.fragment_size)]
+            for idx, fragment in enumerate(fragments):
+                fragment_type = "DataReplace" if idx == self.replace_at else "DataAppend"
+                frames.append({"FrameType": "TableFragment", "TableFragmentType": fragment_type, "TableId": 1, "Rows": fragment})
+                frames.append({"FrameType": "TableProgress", "TableId": 1, "TableProgress": 100.0 * (idx + 1) / len(fragments)})
+            frames.append({"FrameType": "TableCompletion", "TableId": 1, "RowCount": len(self.rows)})
+        else:
+            frames.append({"FrameType": "DataTable", "TableId": 1, "TableKind": "PrimaryResult", "TableName": "PrimaryResult", "Columns": self.columns, "Rows": self.rows})
+        frames.append({"FrameType": "DataSetCompletion", "HasErrors": False, "Cancelled": False})
+        return frames
+
+
+    def __iter__(self):
+        body = json.dumps(self.frames()).encode("utf-8")
+        for i in range(0, len(body), self.chunk_size):
+            yield body[i:i + self.chunk_size]
+
+
+class FakeHttpResponse(object):
+    """Http response of a query request, its body is served by a frame emitter."""
+
+    def __init__(self, emitter:FrameEmitter):
+        self.emitter = emitter
+        self.status_code = 200
+        self.headers = {}
+        self.closed = False
+
+
+    def iter_content(self, chunk_size:int=None):
+        return iter(self.emitter)
+
+
+    def close(self):
+        self.closed = True
+
+
+class FakeHttpClient(object):
+    """Http client that responds to each post with a fake http response, and keeps the posted requests."""
+
+    def __init__(self, emitter:FrameEmitter):
+        self.emitter = emitter
+        self.requests = []
+
+
+    def post(self, endpoint:str, headers:dict=None, json:dict=None, timeout:float=None, stream:bool=False):
+        self.requests.append({"endpoint": endpoint, "json": json})
+        return FakeHttpResponse(self.emitter)
+
+
+@pytest.fixture
+def rows():
+    return [[i, f"name_{i}"] for i in range(10)]
+
+
+def test_progressive_same_as_data_table(rows):
+    progressive_frames = KqlFramesParser(FrameEmitter(rows, progressive=True)).parse()
+    frames = KqlFramesParser(FrameEmitter(rows, progressive=False)).parse()
+    # same frames, but the header
+    assert progressive_frames[1:] == frames[1:]
+
+    response = KqlQueryResponse(progressive_frames, "v2")
+    assert len(response.primary_results) == 1
+    assert response.primary_results[0].rows == rows
+    assert response.primary_results[0].columns_name == ["n", "name"]
+
+
+def test_frames_stored_as_parsed(rows):
+    frames = KqlFramesParser(FrameEmitter(rows, progressive=True)).iter_parse()
+    assert not isinstance(frames, list)
+    response = KqlQueryResponse(frames, "v2")
+    assert response.json_response == KqlFramesParser(FrameEmitter(rows, progressive=True)).parse()
+    assert response.primary_results[0].rows == rows
+    assert len(response.dataSetCompletion) == 1
+
+
+def test_on_progress_called_while_received(rows):
+    received = []
+    KqlFramesParser(FrameEmitter(rows, fragment_size=4)).parse(on_progress=lambda table, progress: received.append((len(table["Rows"]), progress)))
+    # after each fragment, and after each progress frame
+    assert received == [(4, None), (4, pytest.approx(100 / 3)), (8, None), (8, pytest.approx(200 / 3)), (10, None), (10, 100.0)]
+
+
+def test_data_replace(rows):
+    frames = KqlFramesParser(FrameEmitter(rows, fragment_size=4, replace_at=2)).parse()
+    table = [f for f in frames if f.get("TableKind") == "PrimaryResult"][0]
+    assert table["Rows"] == rows[8:]
+
+
+def test_progressive_display_html(rows):
+    table = {"TableName": "PrimaryResult", "Columns": COLUMNS, "Rows": rows}
+    body = ProgressiveDisplay.get_html_body(table, 50.0, preview_rows_count=2)
+    assert "10&nbsp;records&nbsp;received" in body
+    assert "progress:&nbsp;50%" in body
+    assert "name_9" in body and "name_8" in body and "name_7" not in body
+
+
+def _engine(emitter:FrameEmitter)->KqlEngine:
+    client = KustoClient("https://fake.kusto.windows.net", {ConnStrKeys.ANONYMOUS: "anonymous"})
+    client._http_client = FakeHttpClient(emitter)
+    engine = KqlEngine()
+    engine.client = client
+    engine.client_database_name = "db"
+    return engine
+
+
+def test_engine_execute_stream(rows):
+    engine = _engine(FrameEmitter(rows, progressive=False))
+    client = engine.client
+    # options of a %kql -stream cell, include the stream option
+    response = engine.execute_stream("T | take 10", stream=True, progressive_results=True)
+    batches = list(response.iter_batches(batch_size=4))
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert [list(row) for batch in batches for row in batch] == rows
+    assert response.columns_name == ["n", "name"]
+    assert response.records_count == 10
+    # progressive results are not requested for a streamed response
+    assert "results_progressive_enabled" not in (client._http_client.requests[0]["json"].get("properties") or "")
+
+
+def test_response_metadata_computed_on_first_access(rows):
+    frames = KqlFramesParser(FrameEmitter(rows, progressive=False)).parse()
+    frames.insert(-1, {"FrameType": "DataTable", "TableId": 2, "TableKind": "QueryCompletionInformation", "TableName": "QueryCompletionInformation",
+                       "Columns": [{"ColumnName": "EventTypeName", "ColumnType": "string"}, {"ColumnName": "Payload", "ColumnType": "string"}],
+                       "Rows": [["QueryInfo", '{"Count": 1}'], ["QueryResourceConsumption", '{"ExecutionTime": 0.1}']]})
+    query_response = KqlQueryResponse(frames, "v2")
+    response = KqlResponse(query_response)
+    assert query_response._extended_properties is None
+    assert query_response._completion_query_info is None
+    assert query_response._completion_query_resource_consumption is None
+
+    assert response.tables[0].extended_properties == {"Visualization": {"Visualization": None}}
+    assert response.completion_query_info == {"Count": 1}
+    assert response.completion_query_resource_consumption == {"ExecutionTime": 0.1}
+    # computed once
+    assert response.completion_query_info is query_response._completion_query_info
+    assert response.extended_properties is query_response._extended_properties
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_dynamic_values_decoded_by_json_codec(monkeypatch, stream):
+    decoded = []
+
+    def fake_loads(s):
+        decoded.append(s)
+        return {"decoded_by": "fake"}
+
+    # 'auto' resolves to a fake fast codec, 'json' to json (stdlib)
+    monkeypatch.setitem(JsonCodec._codecs, "auto", ("fake", fake_loads, None))
+    rows = [[i, f'{{"k": {i}}}'] for i in range(3)]
+    columns = [{"ColumnName": "n", "ColumnType": "long"}, {"ColumnName": "j", "ColumnType": "dynamic"}]
+    for json_codec, expected in [("json", [{"k": 0}, {"k": 1}, {"k": 2}]), ("auto", [{"decoded_by": "fake"}] * 3)]:
+        engine = _engine(FrameEmitter(rows, progressive=False, columns=columns))
+        if stream:
+            response = engine.execute_stream("T | take 3", stream=True, json_codec=json_codec)
+            values = [row[1] for row in response]
+        else:
+            response = engine.execute("T | take 3", json_codec=json_codec)
+            values = response.tables[0].data_table.get_column(1)
+        assert values == expected
+    assert len(decoded) == 3
+
+
+def test_v1_response_with_data_type_columns():
+    data_type_columns = [{"ColumnName": "n", "DataType": "Int64"}, {"ColumnName": "name", "DataType": "String"}]
+    json_response = {"Tables": [
+        {"TableName": "Table_0", "Columns": data_type_columns, "Rows": [[1, "a"], [2, "b"]]},
+        {"TableName": "Table_1", "Columns": [{"ColumnName": "Value", "DataType": "String"}], "Rows": [['{"Visualization": "table"}']]},
+        {"TableName": "Table_2", "Columns": [{"ColumnName": "Timestamp", "DataType": "DateTime"}, {"ColumnName": "Severity", "DataType": "Int32"},
+                                             {"ColumnName": "SeverityName", "DataType": "String"}, {"ColumnName": "StatusCode", "DataType": "Int32"},
+                                             {"ColumnName": "StatusDescription", "DataType": "String"}, {"ColumnName": "Count", "DataType": "Int32"}],
+         "Rows": [["2020-01-01T00:00:00Z", 4, "Info", 0, "Query completed successfully", 1]]},
+        {"TableName": "Table_3", "Columns": [{"ColumnName": "Ordinal", "DataType": "Int64"}, {"ColumnName": "Kind", "DataType": "String"},
+                                             {"ColumnName": "Name", "DataType": "String"}, {"ColumnName": "Id", "DataType": "String"},
+                                             {"ColumnName": "PrettyName", "DataType": "String"}],
+         "Rows": [[0, "QueryResult", "PrimaryResult", "id0", ""], [1, "QueryProperties", "@ExtendedProperties", "id1", ""], [2, "QueryStatus", "QueryStatus", "id2", ""]]},
+    ]}
+    response = KqlResponse(KqlQueryResponse(json_response))
+    assert len(response.tables) == 1
+    assert response.tables[0].data_table.rows == [[1, "a"], [2, "b"]]
+    assert response.tables[0].extended_properties == {"Visualization": {"Visualization": "table"}}
+    assert response.completion_query_info == {"StatusCode": 0, "StatusDescription": "Query completed successfully", "Count": 1}
@@ -0,0 +1,131 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests of result set key lookup, column index and columns access. """
+
+import gc
+
+
+import pytest
+
+
+from Kqlmagic.kql_response import KqlQueryResponse, _NOT_CONVERTED
+from Kqlmagic.kql_proxy import KqlResponse
+from Kqlmagic.results import ResultSet
+from Kqlmagic.html_table import HtmlTable
+
+
+COLUMNS = [
+    {"ColumnName": "key", "ColumnType": "string"},
+    {"ColumnName": "n", "ColumnType": "long"},
+    {"ColumnName": "t", "ColumnType": "datetime"},
+    {"ColumnName": "j", "ColumnType": "dynamic"},
+]
+
+ROWS = [
+    ["a", 1, "2020-01-01T00:00:00Z", {"k": 1}],
+    ["b", 2, "2020-01-02T00:00:00Z", [1, 2]],
+    ["c", 1, None, None],
+    ["c", 3, "2020-01-03T00:00:00Z", {"k": 3}],
+]
+
+
+def _result_set(rows:list=ROWS, **options)->ResultSet:
+    frames = [
+        {"FrameType": "DataSetHeader", "IsProgressive": False, "Version": "v2.0"},
+        {"FrameType": "DataTable", "TableId": 1, "TableKind": "PrimaryResult", "TableName": "PrimaryResult", "Columns": COLUMNS, "Rows": rows},
+        {"FrameType": "DataSetCompletion", "HasErrors": False, "Cancelled": False},
+    ]
+    return ResultSet({"parsed": {"options": options}}, KqlResponse(KqlQueryResponse(frames, "v2"), **options))
+
+
+def _data_table(result_set:ResultSet):
+    return result_set._queryResult.tables[result_set.fork_table_id].data_table
+
+
+def _converted_count(result_set:ResultSet, col_index:int)->int:
+    column = _data_table(result_set)._converted_columns[col_index]
+    return 0 if column is None else sum(1 for value in column if value is not _NOT_CONVERTED)
+
+
+def test_key_lookup():
+    result_set = _result_set()
+    assert result_set["a"]["n"] == 1
+    assert result_set["b"]["n"] == 2
+    # more than one row with the key
+    with pytest.raises(KeyError):
+        result_set["c"]
+    with pytest.raises(KeyError):
+        result_set["d"]
+    # by position
+    assert result_set[1]["key"] == "b"
+
+
+def test_key_lookup_converts_only_key_column():
+    result_set = _result_set()
+    result_set["a"]
+    # datetime and dynamic columns are converted only for the returned row
+    assert _converted_count(result_set, 2) <= 1
+    assert _converted_count(result_set, 3) <= 1
+    assert result_set._columns_values is None
+
+
+def test_index_by():
+    result_set = _result_set()
+    index = result_set.index_by("n")
+    assert len(index) == 3
+    assert set(index) == {1, 2, 3}
+    assert "n" not in index and 1 in index
+    assert [row["key"] for row in index[1]] == ["a", "c"]
+    assert [row["key"] for row in index[3]] == ["c"]
+    # same index by column position
+    assert dict(result_set.index_by(1)) == dict(index)
+    assert _converted_count(result_set, 2) == 0
+
+
+def test_index_by_unhashable_column():
+    result_set = _result_set()
+    with pytest.raises(TypeError):
+        result_set.index_by("j")
+
+
+def test_index_by_rows_limited_by_auto_limit():
+    result_set = _result_set(auto_limit=2)
+    assert len(result_set) == 2
+    assert set(result_set.index_by("key")) == {"a", "b"}
+
+
+def test_to_dict():
+    result_set = _result_set()
+    columns = result_set.to_dict()
+    assert list(columns) == ["key", "n", "t", "j"]
+    assert columns["key"] == ("a", "b", "c", "c")
+    assert columns["n"] == (1, 2, 1, 3)
+    assert columns["t"][0].year == 2020 and columns["t"][2] is None
+    assert columns["j"][1] == [1, 2]
+    # index built after the columns values, uses them
+    assert [row["n"] for row in result_set.index_by("key")["c"]] == [1, 3]
+
+
+def test_to_dict_empty():
+    assert _result_set(rows=[]).to_dict() == {"key": (), "n": (), "t": (), "j": ()}
+
+
+def test_table_rendered_again_keeps_previous_pages():
+    result_set = _result_set(rows=[[f"k{i}", i, None, None] for i in range(10)], table_page_size=4, notebook_app="jupyternotebook")
+    first_body = result_set._getPrettyTableHtml()["body"]
+    first_table = result_set._html_table
+    first_id = first_table.id
+    result_set._getPrettyTableHtml()
+    assert result_set._html_table is first_table
+    gc.collect()
+    assert HtmlTable._tables.get(first_id) is first_table
+    assert f"HtmlTable.print_page('{first_id}'" in first_body
+
+    # other layout, new table
+    result_set.options["display_limit"] = 5
+    result_set._getPrettyTableHtml()
+    assert result_set._html_table is not first_table
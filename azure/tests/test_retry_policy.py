@@ -0,0 +1,73 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests of request retries, of idempotent and non idempotent requests. """
+
+import pytest
+
+
+from Kqlmagic.retry_policy import RetryContext, CircuitBreaker
+from Kqlmagic.kql_response import KqlError
+from Kqlmagic.kusto_client import KustoClient
+
+
+URL = "https://fake.kusto.windows.net"
+
+
+class FakeHttpResponse(object):
+
+    def __init__(self, status_code:int, headers:dict=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.fixture(autouse=True)
+def clear_circuits():
+    yield
+    CircuitBreaker.clear()
+
+
+@pytest.mark.parametrize("error", [
+    KqlError("throttled", FakeHttpResponse(429, {"Retry-After": "0"})),
+    KqlError("unavailable", FakeHttpResponse(503)),
+    KqlError("gateway timeout", FakeHttpResponse(504)),
+    ConnectionResetError("reset"),
+])
+def test_only_idempotent_requests_retried(error):
+    retry = RetryContext(URL, "id", is_idempotent=True, request_max_retries=3, request_retry_max_delay=0)
+    assert retry.on_failure(error) is not None
+    assert retry.retries == 1
+
+    retry = RetryContext(URL, "id", is_idempotent=False, request_max_retries=3, request_retry_max_delay=0)
+    assert retry.on_failure(error) is None
+    assert retry.retries == 0
+
+
+def test_not_retryable_error():
+    retry = RetryContext(URL, "id", is_idempotent=True, request_max_retries=3, request_retry_max_delay=0)
+    assert retry.on_failure(KqlError("bad request", FakeHttpResponse(400))) is None
+
+
+def test_max_retries():
+    retry = RetryContext(URL, "id", is_idempotent=True, request_max_retries=2, request_retry_max_delay=0)
+    error = KqlError("unavailable", FakeHttpResponse(503))
+    assert retry.on_failure(error) is not None
+    assert retry.on_failure(error) is not None
+    assert retry.on_failure(error) is None
+    assert retry.client_request_id == "id;retry:2"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("StormEvents | take 10", True),
+    (".show tables", True),
+    (".SHOW database schema", True),
+    (".show", True),
+    (".set-or-append T <| StormEvents", False),
+    (".drop table T", False),
+    (".showx", False),
+])
+def test_is_idempotent(query, expected):
+    assert KustoClient._is_idempotent(query) == expected
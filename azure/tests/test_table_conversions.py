@@ -0,0 +1,185 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests of table response conversions, with and without pyarrow. """
+
+import pytest
+
+
+from Kqlmagic.kql_response import KqlResponseTable
+from Kqlmagic.kql_proxy import KqlTableResponse
+from Kqlmagic.dependencies import Dependencies
+
+
+COLUMNS = [
+    {"ColumnName": "n", "ColumnType": "long"},
+    {"ColumnName": "t", "ColumnType": "datetime"},
+    {"ColumnName": "d", "ColumnType": "timespan"},
+    {"ColumnName": "x", "ColumnType": "real"},
+]
+
+ROWS = [
+    [1, "2020-01-02T03:04:05.1234567Z", "1.02:03:04.1234567", 1.5],
+    [2, "0001-01-01T00:00:00Z", "-1.00:00:01", "NaN"],
+    [3, None, None, None],
+]
+
+
+@pytest.fixture
+def table_response():
+    return KqlTableResponse(KqlResponseTable(0, {"Columns": COLUMNS, "Rows": ROWS}), {})
+
+
+@pytest.fixture
+def no_pyarrow(monkeypatch):
+    "pyarrow is reported as not installed"
+    monkeypatch.setitem(Dependencies.installed_modules, "pyarrow", False)
+
+
+def test_to_polars_without_arrow(table_response, no_pyarrow):
+    polars = pytest.importorskip("polars")
+    frame = table_response.to_polars()
+    assert frame.schema["t"] == polars.Datetime("ns", "UTC")
+    assert frame.schema["d"] == polars.Duration("ns")
+    assert frame["n"].to_list() == [1, 2, 3]
+    # full precision, out of range datetime is null
+    assert frame["t"].cast(polars.Int64).to_list() == [1577934245123456700, None, None]
+    # ticks are kept
+    assert frame["d"].cast(polars.Int64).to_list() == [93784123456700, -86401000000000, None]
+    assert frame["x"][0] == 1.5 and frame["x"][1] != frame["x"][1] and frame["x"][2] is None
+
+
+def test_to_polars_same_with_and_without_arrow(table_response, monkeypatch):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("polars")
+    frame = table_response.to_polars()
+    monkeypatch.setitem(Dependencies.installed_modules, "pyarrow", False)
+    assert frame.select(["n", "t", "d"]).equals(table_response.to_polars().select(["n", "t", "d"]))
+
+
+
+@pytest.mark.parametrize("values", [
+    ["1.02:03:04.1234567", "-00:00:01", "00:00:01.5"],
+    ["-3.00:00:01.1234567", "12:00:00", None],
+    [None, None, None],
+])
+def test_to_dataframe_timespan_without_arrow(values, no_pyarrow):
+    pandas = pytest.importorskip("pandas")
+    table_response = KqlTableResponse(KqlResponseTable(0, {"Columns": [{"ColumnName": "d", "ColumnType": "timespan"}], "Rows": [[value] for value in values]}), {})
+    column = table_response.to_dataframe()["d"]
+    decoder = table_response.data_table.decoder
+    assert str(column.dtype).startswith("timedelta64")
+    assert [None if pandas.isna(value) else value.value for value in column] == [decoder.decode_timespan_ns(value) for value in values]
+
+
+@pytest.mark.parametrize("values", [
+    ["1.02:03:04.1234567", "-1.00:00:01", None, "00:00:01.5", "-00:00:00.0000001", "00:00:01.123456789"],
+    # not in kql format, converted one by one
+    [123, "00:00:01", None],
+    ["10675199.02:48:05.4775807", "00:00:01"],
+    [],
+])
+def test_vectorized_timespan_same_as_decoder(values):
+    decoder = KqlResponseTable(0, {"Columns": [], "Rows": []}).decoder
+    expected = KqlTableResponse._to_timespan_ns_list(decoder, values)
+    pandas = Dependencies.get_module("pandas", dont_throw=True)
+    if pandas is not None:
+        series = KqlTableResponse._to_timespan_ns_series(pandas, values)
+        assert series is None or [None if pandas.isna(value) else int(value) for value in series] == expected
+    polars = Dependencies.get_module("polars", dont_throw=True)
+    if polars is not None:
+        series = KqlTableResponse._to_timespan_ns_polars_series(polars, "d", values)
+        assert series is None or series.to_list() == expected
+    table_response = KqlTableResponse(KqlResponseTable(0, {"Columns": [{"ColumnName": "d", "ColumnType": "timespan"}], "Rows": [[value] for value in values]}), {})
+    if Dependencies.get_module("pyarrow", dont_throw=True) is not None:
+        assert table_response.to_arrow().column("d").cast("int64").to_pylist() == expected
+
+
+def test_to_dataframe_without_arrow(table_response, no_pyarrow):
+    pandas = pytest.importorskip("pandas")
+    frame = table_response.to_dataframe()
+    assert frame["n"].tolist() == [1, 2, 3]
+    # out of range datetime is NaT
+    assert frame["t"][0] == pandas.Timestamp("2020-01-02T03:04:05.1234567Z")
+    assert frame["t"][1:].isna().all()
+    assert frame["d"][0] == pandas.Timedelta(days=1, hours=2, minutes=3, seconds=4, nanoseconds=123456700)
+    assert frame["d"][1] == -pandas.Timedelta(days=1, seconds=1)
+    assert pandas.isna(frame["d"][2])
+    assert frame["x"].dtype == "float64" and frame["x"][0] == 1.5 and frame["x"][1:].isna().all()
+
+
+def test_to_dataframe_same_with_and_without_arrow(table_response, monkeypatch):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    frame = table_response.to_dataframe()
+    monkeypatch.setitem(Dependencies.installed_modules, "pyarrow", False)
+    rows_frame = table_response.to_dataframe()
+    for col_name in ["n", "t", "d", "x"]:
+        assert frame[col_name].isna().tolist() == rows_frame[col_name].isna().tolist()
+        assert frame[col_name].dropna().tolist() == rows_frame[col_name].dropna().tolist()
+
+
+def test_to_dataframe_fallback_to_rows_on_arrow_error(table_response, monkeypatch):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+
+    def _raise(*args, **kwargs):
+        raise ValueError("conversion error")
+
+    monkeypatch.setattr(table_response, "to_arrow", _raise)
+    frame = table_response.to_dataframe()
+    assert frame["n"].tolist() == [1, 2, 3]
+    assert frame["t"][1:].isna().all()
+
+
+@pytest.mark.parametrize("col_type, values", [
+    ("ulong", [2**64 - 1, 1]),
+    ("string", ["a", 1]),
+    ("real", ["abc", 1.5]),
+])
+def test_to_dataframe_fallback_to_rows_on_invalid_values(col_type, values):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+    table_response = KqlTableResponse(KqlResponseTable(0, {"Columns": [{"ColumnName": "c", "ColumnType": col_type}], "Rows": [[value] for value in values]}), {})
+    assert len(table_response.to_dataframe(raise_errors=False)) == len(values)
+
+
+@pytest.mark.parametrize("error", [TypeError, KeyError, AttributeError])
+def test_to_dataframe_unexpected_arrow_error_raised(table_response, monkeypatch, error):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("pandas")
+
+    def _raise(*args, **kwargs):
+        raise error("bug")
+
+    monkeypatch.setattr(table_response, "to_arrow", _raise)
+    with pytest.raises(error):
+        table_response.to_dataframe()
+
+
+def test_arrow_datetime_fallback():
+    pyarrow = pytest.importorskip("pyarrow")
+    # values without zone and out of range can't be cast by arrow, converted one by one
+    rows = [["2020-01-02T03:04:05.1234567"], ["0001-01-01T00:00:00Z"], ["invalid"], [None]]
+    table_response = KqlTableResponse(KqlResponseTable(0, {"Columns": [{"ColumnName": "t", "ColumnType": "datetime"}], "Rows": rows}), {})
+    column = table_response.to_arrow().column("t")
+    assert column.type == pyarrow.timestamp("ns", tz="UTC")
+    assert column.cast(pyarrow.int64()).to_pylist() == [1577934245123456700, None, None, None]
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2020-01-02T03:04:05Z", 1577934245000000000),
+    ("2020-01-02T03:04:05.1234567Z", 1577934245123456700),
+    ("2020-01-02T05:04:05+02:00", 1577934245000000000),
+    ("2020-01-02T03:04:05", 1577934245000000000),
+    ("0001-01-01T00:00:00Z", None),
+    ("9999-12-31T23:59:59Z", None),
+    ("invalid", None),
+    (None, None),
+])
+def test_to_ns_datetime(value, expected):
+    table = KqlResponseTable(0, {"Columns": [], "Rows": []})
+    assert KqlTableResponse._to_ns_datetime(table.decoder, value) == expected
@@ -0,0 +1,80 @@
+#-------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+#--------------------------------------------------------------------------
+
+""" Tests of token slots, shared by aad helpers of same identity. """
+
+import time
+import threading
+
+
+import pytest
+
+
+from Kqlmagic.my_aad_helper_msal import _MyAadHelper, _TokenSlot, ConnKeysKCSB
+from Kqlmagic.constants import ConnStrKeys
+
+
+CLUSTER = "https://fake.kusto.windows.net"
+
+
+@pytest.fixture(autouse=True)
+def clear_slots():
+    yield
+    for slot in _TokenSlot._slots.values():
+        slot.clear()
+    _TokenSlot._slots.clear()
+
+
+def _helper(data_source:str=CLUSTER, **conn_kv)->_MyAadHelper:
+    conn_kv = {ConnStrKeys.CLIENTID: "client", ConnStrKeys.CLIENTSECRET: "secret", ConnStrKeys.TENANT: "tenant", **conn_kv}
+    return _MyAadHelper(ConnKeysKCSB(conn_kv, data_source), "default-client")
+
+
+def _fake_acquire_token(helper:_MyAadHelper, calls:list, delay:float=0.0):
+    "acquires a fake token, valid for an hour, without aad"
+
+    def _acquire_token():
+        calls.append(helper)
+        time.sleep(delay)
+        header = f"Bearer token-{len(calls)}"
+        helper._token_slot.set(header, time.time() + 3600, helper._refresh_token_slot)
+        return header
+
+    helper._acquire_token = _acquire_token
+
+
+def test_slot_shared_by_same_identity():
+    helper = _helper()
+    assert _helper(f"{CLUSTER}/database")._token_slot is helper._token_slot
+    assert _helper()._acquire_token_lock is helper._acquire_token_lock
+    # other identity
+    assert _helper(**{ConnStrKeys.CLIENTID: "other"})._token_slot is not helper._token_slot
+    assert _helper(**{ConnStrKeys.TENANT: "other"})._token_slot is not helper._token_slot
+    assert _helper("https://other.kusto.windows.net")._token_slot is not helper._token_slot
+
+
+def test_token_fetched_once_by_helpers_of_same_identity():
+    calls = []
+    helpers = [_helper() for _ in range(4)]
+    for helper in helpers:
+        _fake_acquire_token(helper, calls, delay=0.05)
+
+    headers = []
+    threads = [threading.Thread(target=lambda helper=helper: headers.append(helper.acquire_token())) for helper in helpers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert headers == ["Bearer token-1"] * len(helpers)
+
+
+def test_slot_refreshed_by_helper_that_set_it():
+    first_helper = _helper()
+    second_helper = _helper()
+    first_helper._token_slot.set("Bearer token", time.time() + 3600, second_helper._refresh_token_slot)
+    assert first_helper._token_slot._refresh_callback == second_helper._refresh_token_slot